@@ -1,21 +1,40 @@
 
-from typing import Optional
+from typing import Optional, Dict, Any, Union
+from uuid import UUID
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import get_db, get_async_db
 from app.core.security import decode_token
+from app.core.cache import user_cache
 from app.core.enums import UserRole
 from app.models.user import User
+from app.services.revocation_service import RevocationService
 
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    token = credentials.credentials
-    payload = decode_token(token)
+def _load_user(db: Session, user_id: str) -> Optional[User]:
+    """Carrega o usuário pelo id, usando o cache de usuários autenticados."""
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        # Reanexa à sessão da requisição sem ir ao banco (relacionamentos seguem lazy)
+        cached = User(**snapshot)
+        make_transient_to_detached(cached)
+        return db.merge(cached, load=False)
+    
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and user.ativo:
+        user_cache.set(user_id, {
+            attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs
+        })
+    return user
+
+def _get_access_payload(credentials: HTTPAuthorizationCredentials) -> Dict[str, Any]:
+    """Valida o access token (assinatura, tipo e revogação) e retorna suas claims."""
+    payload = decode_token(credentials.credentials)
     
     if payload is None or payload.get("type") != "access":
         raise HTTPException(
@@ -23,29 +42,92 @@ def get_current_user(
             detail="Token inválido ou expirado"
         )
     
-    user_id = payload.get("sub")
-    if user_id is None:
+    if payload.get("sub") is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    if RevocationService.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revogado"
+        )
+    
+    return payload
+
+def _get_active_user(db: Session, user_id: str) -> User:
+    user = _load_user(db, user_id)
     if user is None or not user.ativo:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário não encontrado ou inativo"
         )
-    
     return user
 
-def require_role(*allowed_roles: UserRole):
-    def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
+class ClaimsUser:
+    """
+    Usuário autenticado apenas pelas claims verificadas do access token.
+    `id` e `role` vêm do token; qualquer outro atributo (nome, perfis, ...)
+    carrega a linha de User na primeira leitura, com a mesma checagem de `ativo`.
+    """
+    
+    def __init__(self, db: Session, user_id: str, role: str):
+        try:
+            self.id = UUID(user_id)
+            self.role = UserRole(role)
+        except (TypeError, ValueError):
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acesso negado: permissão insuficiente"
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token inválido"
             )
+        self._db = db
+        self._user: Optional[User] = None
+    
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._user is None:
+            self._user = _get_active_user(self._db, str(self.id))
+        return getattr(self._user, name)
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> User:
+    payload = _get_access_payload(credentials)
+    return _get_active_user(db, payload["sub"])
+
+def get_access_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
+    """Claims do access token válido e não revogado (ex.: para logout)."""
+    return _get_access_payload(credentials)
+
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db)
+) -> Union[User, ClaimsUser]:
+    """
+    Usuário autenticado para checagens de papel.
+    Com AUTH_CLAIMS_ONLY, autoriza só pelas claims (sem consulta ao banco);
+    caso contrário, equivale a get_current_user.
+    """
+    payload = _get_access_payload(credentials)
+    if settings.AUTH_CLAIMS_ONLY:
+        return ClaimsUser(db, payload["sub"], payload.get("role"))
+    return _get_active_user(db, payload["sub"])
+
+def _check_role(current_user: Union[User, ClaimsUser], allowed_roles) -> None:
+    if current_user.role not in allowed_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado: permissão insuficiente"
+        )
+
+def require_role(*allowed_roles: UserRole):
+    def role_checker(current_user: User = Depends(get_current_principal)) -> User:
+        _check_role(current_user, allowed_roles)
         return current_user
     return role_checker
 
@@ -63,3 +145,39 @@ def get_current_admin_or_doctor(
     current_user: User = Depends(require_role(UserRole.ADMIN, UserRole.MEDICO))
 ) -> User:
     return current_user
+
+# Variantes assíncronas (DATABASE_MODE=async). Reaproveitam a lógica síncrona via
+# AsyncSession.run_sync, que executa no event loop com I/O não bloqueante do asyncpg.
+# Os objetos retornados não suportam lazy load: as rotas async usam só colunas.
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    payload = _get_access_payload(credentials)
+    return await db.run_sync(_get_active_user, payload["sub"])
+
+async def get_access_token_payload_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> Dict[str, Any]:
+    return _get_access_payload(credentials)
+
+async def get_current_principal_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> Union[User, ClaimsUser]:
+    payload = _get_access_payload(credentials)
+    if settings.AUTH_CLAIMS_ONLY:
+        return ClaimsUser(db.sync_session, payload["sub"], payload.get("role"))
+    return await db.run_sync(_get_active_user, payload["sub"])
+
+def require_role_async(*allowed_roles: UserRole):
+    async def role_checker(current_user: User = Depends(get_current_principal_async)) -> User:
+        _check_role(current_user, allowed_roles)
+        return current_user
+    return role_checker
+
+async def get_current_admin_or_doctor_async(
+    current_user: User = Depends(require_role_async(UserRole.ADMIN, UserRole.MEDICO))
+) -> User:
+    return current_user
@@ -9,7 +9,9 @@ from app.api.v1 import (
     appointments,
     payments,
     reports,
-    dashboard
+    dashboard,
+    metrics,
+    audit
 )
 
 __all__ = [
@@ -21,7 +23,9 @@ __all__ = [
     "appointments",
     "payments",
     "reports",
-    "dashboard"
+    "dashboard",
+    "metrics",
+    "audit"
 ]
 
 
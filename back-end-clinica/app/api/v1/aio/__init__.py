@@ -0,0 +1,14 @@
+"""Rotas assíncronas dos caminhos quentes (DATABASE_MODE=async)"""
+from app.api.v1.aio import (
+    auth,
+    schedule,
+    appointments,
+    payments
+)
+
+__all__ = [
+    "auth",
+    "schedule",
+    "appointments",
+    "payments"
+]
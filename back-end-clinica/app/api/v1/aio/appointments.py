@@ -0,0 +1,63 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from app.database import get_async_db
+from app.schemas.appointment import AppointmentCreate, AppointmentResponse, AppointmentUpdate
+from app.services.appointment_service import AsyncAppointmentService
+from app.services.idempotency_service import AsyncIdempotencyService, request_fingerprint
+from app.api.deps import get_current_user_async, get_current_admin_or_doctor_async
+from app.models.user import User
+from app.core.enums import UserRole
+from app.core.pagination import PageParams, set_next_cursor
+
+router = APIRouter(prefix="/appointments", tags=["Consultas"])
+
+@router.post("", response_model=AppointmentResponse, status_code=201)
+async def create_appointment(
+    data: AppointmentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cria uma nova consulta (reserva um slot). Com Idempotency-Key, retries recebem a primeira resposta."""
+    return await AsyncIdempotencyService.run(
+        db, current_user.id, idempotency_key, request_fingerprint("POST /appointments", data),
+        201, AppointmentResponse, lambda: AsyncAppointmentService.create_appointment(db, current_user.id, data)
+    )
+
+@router.get("", response_model=List[AppointmentResponse])
+async def list_appointments(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Lista consultas conforme o papel:
+    - PACIENTE: suas próprias consultas
+    - MEDICO: consultas com ele
+    - ADMIN: todas as consultas
+    
+    Mais recentes primeiro; a próxima página vem do cabeçalho X-Next-Cursor.
+    """
+    if current_user.role == UserRole.PACIENTE:
+        appointments, next_cursor = await AsyncAppointmentService.list_appointments(db, page, patient_id=current_user.id)
+    elif current_user.role == UserRole.MEDICO:
+        appointments, next_cursor = await AsyncAppointmentService.list_appointments(db, page, doctor_id=current_user.id)
+    else:
+        appointments, next_cursor = await AsyncAppointmentService.list_appointments(db, page)
+    set_next_cursor(response, next_cursor)
+    return appointments
+
+@router.patch("/{appointment_id}/status", response_model=AppointmentResponse)
+async def update_appointment_status(
+    appointment_id: UUID,
+    update_data: AppointmentUpdate,
+    current_user: User = Depends(get_current_admin_or_doctor_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Atualiza status da consulta (ADMIN ou MEDICO)."""
+    if update_data.status:
+        return await AsyncAppointmentService.update_appointment_status(db, appointment_id, update_data.status)
+    raise HTTPException(status_code=400, detail="Status é obrigatório")
@@ -0,0 +1,99 @@
+
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_async_db
+from app.schemas.auth import LoginRequest, TokenResponse, RefreshTokenRequest, LogoutRequest
+from app.schemas.user import UserCreate, UserResponse
+from app.services.auth_service import AuthService, AsyncAuthService
+from app.services.revocation_service import RevocationService
+from app.core.security import decode_token
+from app.api.deps import get_current_user_async, get_access_token_payload_async
+from app.models.user import User
+
+router = APIRouter(prefix="/auth", tags=["Autenticação"])
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register_patient(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """
+    Auto-cadastro público para PACIENTES.
+    Para criar MÉDICO ou ADMIN, usar /users (requer permissão ADMIN).
+    """
+    if user_data.role != "PACIENTE":
+        raise HTTPException(
+            status_code=403,
+            detail="Auto-cadastro permitido apenas para pacientes"
+        )
+    
+    user = await AsyncAuthService.register_patient(db, user_data)
+    return user
+
+@router.post("/login", response_model=TokenResponse)
+async def login(credentials: LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    """Login com email e senha."""
+    user = await AsyncAuthService.authenticate_user(db, credentials.email, credentials.password)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email ou senha incorretos"
+        )
+    
+    access_token, refresh_token = AuthService.create_tokens(str(user.id), user.role)
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_token(data: RefreshTokenRequest, db: AsyncSession = Depends(get_async_db)):
+    """Renova o access token usando refresh token (o refresh token usado é revogado)."""
+    payload = decode_token(data.refresh_token)
+    
+    if not payload or payload.get("type") != "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido"
+        )
+    
+    # Rotação: cada refresh token vale uma única vez
+    rotated = (
+        not RevocationService.is_revoked(payload.get("jti"))
+        and await db.run_sync(RevocationService.revoke, payload)
+    )
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revogado"
+        )
+    
+    access_token, refresh_token = AuthService.create_tokens(payload.get("sub"), payload.get("role"))
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    data: Optional[LogoutRequest] = None,
+    payload: Dict[str, Any] = Depends(get_access_token_payload_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoga o access token atual e, se informado, o refresh token da sessão."""
+    await db.run_sync(RevocationService.revoke, payload)
+    
+    if data and data.refresh_token:
+        refresh_payload = decode_token(data.refresh_token)
+        if (
+            refresh_payload
+            and refresh_payload.get("type") == "refresh"
+            and refresh_payload.get("sub") == payload.get("sub")
+        ):
+            await db.run_sync(RevocationService.revoke, refresh_payload)
+    return None
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user_info(current_user: User = Depends(get_current_user_async)):
+    """Retorna informações do usuário autenticado."""
+    return current_user
@@ -0,0 +1,64 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from app.database import get_async_db
+from app.schemas.payment import PaymentCreate, PaymentResponse
+from app.services.payment_service import AsyncPaymentService
+from app.services.idempotency_service import AsyncIdempotencyService, request_fingerprint
+from app.api.deps import get_current_principal_async
+from app.models.user import User
+from app.models.payment import Payment
+from app.core.enums import UserRole
+from app.core.pagination import PageParams, set_next_cursor
+
+router = APIRouter(prefix="/payments", tags=["Pagamentos"])
+
+@router.post("", response_model=PaymentResponse, status_code=201)
+async def create_payment(
+    data: PaymentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: User = Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cria pagamento simulado (sempre aprovado). Com Idempotency-Key, retries recebem a primeira resposta."""
+    return await AsyncIdempotencyService.run(
+        db, current_user.id, idempotency_key, request_fingerprint("POST /payments", data),
+        201, PaymentResponse, lambda: AsyncPaymentService.create_payment(db, current_user.id, data)
+    )
+
+@router.get("", response_model=List[PaymentResponse])
+async def list_payments(
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Lista pagamentos:
+    - PACIENTE: seus próprios pagamentos
+    - ADMIN: todos os pagamentos
+    
+    Mais recentes primeiro; a próxima página vem do cabeçalho X-Next-Cursor.
+    """
+    patient_id = current_user.id if current_user.role == UserRole.PACIENTE else None
+    payments, next_cursor = await AsyncPaymentService.list_payments(db, page, patient_id)
+    set_next_cursor(response, next_cursor)
+    return payments
+
+@router.get("/{payment_id}", response_model=PaymentResponse)
+async def get_payment(
+    payment_id: UUID,
+    current_user: User = Depends(get_current_principal_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Consulta detalhes de um pagamento."""
+    payment = await db.get(Payment, payment_id)
+    if not payment:
+        raise HTTPException(status_code=404, detail="Pagamento não encontrado")
+    
+    # Verifica permissão
+    if current_user.role == UserRole.PACIENTE and payment.patient_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    return payment
@@ -0,0 +1,85 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+from datetime import time
+from decimal import Decimal
+from app.database import get_async_db
+from app.schemas.schedule import (
+    ScheduleSlotCreate, ScheduleSlotResponse, AvailabilityTemplate, BulkSlotsResponse, AvailableSlotResponse
+)
+from app.services.schedule_service import ScheduleService, AsyncScheduleService
+from app.api.deps import get_current_user_async, get_current_admin_or_doctor_async
+from app.api.v1.schedule import _parse_datetime_param
+from app.models.user import User
+from app.core.enums import UserRole
+from app.core.periods import clinic_now
+
+router = APIRouter(tags=["Agenda"])
+
+@router.get("/doctors/{doctor_id}/agenda", response_model=List[ScheduleSlotResponse])
+async def get_doctor_agenda(
+    doctor_id: UUID,
+    start: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS)"),
+    end: Optional[str] = Query(None, description="Data final (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS)"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    start_dt = _parse_datetime_param(start, "start", time.min)
+    end_dt = _parse_datetime_param(end, "end", time.max)
+    
+    slots = await AsyncScheduleService.get_doctor_agenda(db, doctor_id, start_dt, end_dt)
+    return slots
+
+@router.get("/agenda/available", response_model=List[AvailableSlotResponse])
+async def find_available_slots(
+    especialidade: Optional[str] = Query(None, description="Especialidade do médico (sem diferenciar maiúsculas)"),
+    valor_max: Optional[Decimal] = Query(None, ge=0, description="Valor máximo da consulta"),
+    start: Optional[str] = Query(None, description="A partir de (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS); padrão: agora"),
+    end: Optional[str] = Query(None, description="Até (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Próximos horários livres entre todos os médicos ativos, do mais cedo ao mais tarde (público)."""
+    start_dt = _parse_datetime_param(start, "start", time.min) or clinic_now()
+    end_dt = _parse_datetime_param(end, "end", time.max)
+    return await AsyncScheduleService.find_available(db, start_dt, end_dt, especialidade, valor_max, limit)
+
+@router.post("/doctors/{doctor_id}/agenda/slots", response_model=ScheduleSlotResponse, status_code=201)
+async def create_schedule_slot(
+    doctor_id: UUID,
+    data: ScheduleSlotCreate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    if current_user.role == UserRole.MEDICO and current_user.id != doctor_id:
+        raise HTTPException(status_code=403, detail="Você só pode criar slots na sua própria agenda")
+    elif current_user.role == UserRole.PACIENTE:
+        raise HTTPException(status_code=403, detail="Pacientes não podem criar slots")
+    
+    slot = await AsyncScheduleService.create_slot(db, doctor_id, data, current_user.id)
+    return slot
+
+@router.post("/doctors/{doctor_id}/agenda/templates", response_model=BulkSlotsResponse, status_code=201)
+async def create_slots_from_template(
+    doctor_id: UUID,
+    template: AvailabilityTemplate,
+    current_user: User = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Gera os slots de um modelo semanal de disponibilidade; horários em conflito são ignorados."""
+    if current_user.role == UserRole.MEDICO and current_user.id != doctor_id:
+        raise HTTPException(status_code=403, detail="Você só pode criar slots na sua própria agenda")
+    elif current_user.role == UserRole.PACIENTE:
+        raise HTTPException(status_code=403, detail="Pacientes não podem criar slots")
+    
+    # Operação em lote rara: reaproveita o serviço síncrono na conexão async
+    return await db.run_sync(ScheduleService.create_slots_from_template, doctor_id, template, current_user.id)
+
+@router.delete("/agenda/slots/{slot_id}", status_code=204)
+async def delete_schedule_slot(
+    slot_id: UUID,
+    current_user: User = Depends(get_current_admin_or_doctor_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    await AsyncScheduleService.delete_slot(db, slot_id)
+    return None
@@ -1,20 +1,22 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.database import get_db
 from app.schemas.appointment import AppointmentCreate, AppointmentResponse, AppointmentUpdate
 from app.services.appointment_service import AppointmentService
+from app.services.idempotency_service import IdempotencyService, request_fingerprint
 from app.api.deps import get_current_user, get_current_admin_or_doctor
 from app.models.user import User
-from app.models.appointment import Appointment 
 from app.core.enums import UserRole, AppointmentStatus
+from app.core.pagination import PageParams, set_next_cursor
 
 router = APIRouter(prefix="/appointments", tags=["Consultas"])
 
 @router.post("", response_model=AppointmentResponse, status_code=201)
 def create_appointment(
     data: AppointmentCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -22,15 +24,19 @@ def create_appointment(
     Cria uma nova consulta (reserva um slot).
     PACIENTE: cria para si mesmo.
     ADMIN/MEDICO: pode criar para qualquer paciente (implementar patient_id no body se necessário).
+    
+    Com Idempotency-Key, retries com a mesma chave recebem a primeira resposta.
     """
     patient_id = current_user.id
-    appointment = AppointmentService.create_appointment(db, patient_id, data)
-    return appointment
+    return IdempotencyService.run(
+        db, current_user.id, idempotency_key, request_fingerprint("POST /appointments", data),
+        201, AppointmentResponse, lambda: AppointmentService.create_appointment(db, patient_id, data)
+    )
 
 @router.get("", response_model=List[AppointmentResponse])
 def list_appointments(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    response: Response,
+    page: PageParams = Depends(),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -39,14 +45,17 @@ def list_appointments(
     - PACIENTE: suas próprias consultas
     - MEDICO: consultas com ele
     - ADMIN: todas as consultas
+    
+    Mais recentes primeiro; a próxima página vem do cabeçalho X-Next-Cursor.
     """
     if current_user.role == UserRole.PACIENTE:
-        appointments = AppointmentService.get_appointments_by_patient(db, current_user.id, skip, limit)
+        appointments, next_cursor = AppointmentService.get_appointments_by_patient(db, current_user.id, page)
     elif current_user.role == UserRole.MEDICO:
-        appointments = AppointmentService.get_appointments_by_doctor(db, current_user.id, skip, limit)
+        appointments, next_cursor = AppointmentService.get_appointments_by_doctor(db, current_user.id, page)
     else:  # ADMIN
-        appointments = db.query(Appointment).offset(skip).limit(limit).all()
+        appointments, next_cursor = AppointmentService.list_appointments(db, page)
     
+    set_next_cursor(response, next_cursor)
     return appointments
 
 @router.patch("/{appointment_id}/status", response_model=AppointmentResponse)
@@ -0,0 +1,54 @@
+import json
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from uuid import UUID
+from app.database import get_read_db
+from app.api.deps import get_current_admin
+from app.models.user import User
+from app.schemas.audit import AuditLogResponse
+from app.services.audit_service import AuditService
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, set_next_cursor
+from app.core.periods import Period
+
+router = APIRouter(prefix="/audit", tags=["Auditoria"])
+
+@router.get("", response_model=List[AuditLogResponse])
+def list_audit_logs(
+    response: Response,
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    user_id: Optional[UUID] = Query(None),
+    acao: Optional[str] = Query(None),
+    alvo: Optional[str] = Query(None),
+    payload: Optional[str] = Query(None, description='Objeto JSON contido em payload_json, ex.: {"doctor_id": "..."}'),
+    arquivados: bool = Query(False, description="Inclui os meses já arquivados (mais lento)"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description=f"Valor do cabeçalho {NEXT_CURSOR_HEADER} da página anterior"),
+    current_admin: User = Depends(get_current_admin),
+    db: Session = Depends(get_read_db)
+):
+    """Log de auditoria (apenas ADMIN), mais recentes primeiro; próxima página em X-Next-Cursor."""
+    filtro_payload = None
+    if payload is not None:
+        try:
+            filtro_payload = json.loads(payload)
+        except ValueError:
+            filtro_payload = None
+        if not isinstance(filtro_payload, dict):
+            raise HTTPException(status_code=400, detail="payload deve ser um objeto JSON")
+
+    eventos, next_cursor = AuditService.list_events(
+        db,
+        Period.days(start_date, end_date),
+        user_id=user_id,
+        acao=acao,
+        alvo=alvo,
+        payload=filtro_payload,
+        after=decode_cursor(cursor) if cursor else None,
+        limit=limit,
+        include_archived=arquivados
+    )
+    set_next_cursor(response, next_cursor)
+    return eventos
@@ -1,12 +1,14 @@
 
+from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.auth import LoginRequest, TokenResponse, RefreshTokenRequest
+from app.schemas.auth import LoginRequest, TokenResponse, RefreshTokenRequest, LogoutRequest
 from app.schemas.user import UserCreate, UserResponse
 from app.services.auth_service import AuthService
+from app.services.revocation_service import RevocationService
 from app.core.security import decode_token
-from app.api.deps import get_current_user, get_current_admin
+from app.api.deps import get_current_user, get_current_admin, get_access_token_payload
 from app.models.user import User
 
 router = APIRouter(prefix="/auth", tags=["Autenticação"])
@@ -45,7 +47,7 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 
 @router.post("/refresh", response_model=TokenResponse)
 def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
-    """Renova o access token usando refresh token."""
+    """Renova o access token usando refresh token (o refresh token usado é revogado)."""
     payload = decode_token(data.refresh_token)
     
     if not payload or payload.get("type") != "refresh":
@@ -54,6 +56,13 @@ def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
             detail="Refresh token inválido"
         )
     
+    # Rotação: cada refresh token vale uma única vez
+    if RevocationService.is_revoked(payload.get("jti")) or not RevocationService.revoke(db, payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token revogado"
+        )
+    
     user_id = payload.get("sub")
     role = payload.get("role")
     
@@ -64,6 +73,25 @@ def refresh_token(data: RefreshTokenRequest, db: Session = Depends(get_db)):
         "token_type": "bearer"
     }
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    data: Optional[LogoutRequest] = None,
+    payload: Dict[str, Any] = Depends(get_access_token_payload),
+    db: Session = Depends(get_db)
+):
+    """Revoga o access token atual e, se informado, o refresh token da sessão."""
+    RevocationService.revoke(db, payload)
+    
+    if data and data.refresh_token:
+        refresh_payload = decode_token(data.refresh_token)
+        if (
+            refresh_payload
+            and refresh_payload.get("type") == "refresh"
+            and refresh_payload.get("sub") == payload.get("sub")
+        ):
+            RevocationService.revoke(db, refresh_payload)
+    return None
+
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Retorna informações do usuário autenticado."""
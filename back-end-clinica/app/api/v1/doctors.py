@@ -1,35 +1,71 @@
 
 from typing import List
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.database import get_db
 from app.schemas.user import UserResponse
 from app.schemas.profile import DoctorProfileResponse
 from app.models.user import User
+from app.models.profile import DoctorProfile
 from app.core.enums import UserRole
+from app.core.http_cache import has_validators, is_not_modified, make_etag, not_modified, set_cache_headers
+from app.core.pagination import PageParams, paginate, set_next_cursor, split_page
 
 router = APIRouter(prefix="/doctors", tags=["Médicos"])
 
-@router.get("", response_model=List[UserResponse])
+# Rotas públicas com ETag/Last-Modified derivados de updated_at: uma requisição condicional
+# que bate com a versão atual recebe 304 depois de uma consulta só do validador.
+NOT_MODIFIED = {304: {"description": "Não modificado (ETag/Last-Modified ainda válidos)"}}
+
+@router.get("", response_model=List[UserResponse], responses=NOT_MODIFIED)
 def list_doctors(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db)
 ):
-    """Lista todos os médicos (público)."""
-    doctors = db.query(User).filter(
+    """Lista todos os médicos (público), mais recentes primeiro; próxima página em X-Next-Cursor."""
+    # Versão da listagem: muda com qualquer alteração, inclusão, desativação ou remoção de médico.
+    # Sem Last-Modified: remover um médico que não é o mais recente não muda max(updated_at),
+    # então If-Modified-Since daria 304 desatualizado; a validação é só pelo ETag
+    ativos, mais_recente = db.execute(
+        select(func.count().filter(User.ativo == True), func.max(User.updated_at))
+        .where(User.role == UserRole.MEDICO)
+    ).one()
+    etag = make_etag("doctors", ativos, mais_recente)
+    if is_not_modified(request, etag, None):
+        return not_modified(etag, None)
+
+    query = db.query(User).filter(
         User.role == UserRole.MEDICO,
         User.ativo == True
-    ).offset(skip).limit(limit).all()
+    )
+    doctors, next_cursor = split_page(paginate(query, User, page).all(), page)
+    set_next_cursor(response, next_cursor)
+    set_cache_headers(response, etag, None)
     return doctors
 
-@router.get("/{doctor_id}", response_model=UserResponse)
+@router.get("/{doctor_id}", response_model=UserResponse, responses=NOT_MODIFIED)
 def get_doctor(
     doctor_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Consulta médico por ID (público)."""
+    if has_validators(request):
+        updated_at = db.scalar(select(User.updated_at).where(
+            User.id == doctor_id,
+            User.role == UserRole.MEDICO
+        ))
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Médico não encontrado")
+        etag = make_etag("doctor", doctor_id, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified(etag, updated_at)
+
     doctor = db.query(User).filter(
         User.id == doctor_id,
         User.role == UserRole.MEDICO
@@ -38,14 +74,29 @@ def get_doctor(
     if not doctor:
         raise HTTPException(status_code=404, detail="Médico não encontrado")
     
+    set_cache_headers(response, make_etag("doctor", doctor_id, doctor.updated_at), doctor.updated_at)
     return doctor
 
-@router.get("/{doctor_id}/profile", response_model=DoctorProfileResponse)
+@router.get("/{doctor_id}/profile", response_model=DoctorProfileResponse, responses=NOT_MODIFIED)
 def get_doctor_profile(
     doctor_id: UUID,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Consulta perfil do médico (público)."""
+    if has_validators(request):
+        updated_at = db.scalar(
+            select(DoctorProfile.updated_at)
+            .join(User, User.id == DoctorProfile.user_id)
+            .where(User.id == doctor_id, User.role == UserRole.MEDICO)
+        )
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Perfil de médico não encontrado")
+        etag = make_etag("doctor-profile", doctor_id, updated_at)
+        if is_not_modified(request, etag, updated_at):
+            return not_modified(etag, updated_at)
+
     doctor = db.query(User).filter(
         User.id == doctor_id,
         User.role == UserRole.MEDICO
@@ -54,7 +105,9 @@ def get_doctor_profile(
     if not doctor or not doctor.doctor_profile:
         raise HTTPException(status_code=404, detail="Perfil de médico não encontrado")
     
-    return doctor.doctor_profile
+    profile = doctor.doctor_profile
+    set_cache_headers(response, make_etag("doctor-profile", doctor_id, profile.updated_at), profile.updated_at)
+    return profile
 
 
 # README.md
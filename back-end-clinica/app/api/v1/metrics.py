@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_admin
+from app.models.user import User
+from app.core.cache import user_cache, token_cache
+from app.core.hashing import hash_executor
+from app.core.pool import pool_stats
+from app.database import engine, replica_engine, replica_health
+from app.services.revocation_service import revocation_list
+from app.services.audit_service import audit_writer
+
+router = APIRouter(prefix="/metrics", tags=["Métricas"])
+
+@router.get("")
+def get_metrics(current_admin: User = Depends(get_current_admin)):
+    """Métricas internas do processo (caches, filas, pools) — apenas ADMIN."""
+    return {
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "hash_executor": hash_executor.stats(),
+        "revocation_list": revocation_list.stats(),
+        "audit_writer": audit_writer.stats(),
+        "db_pool": pool_stats(engine),
+        "db_replica": {
+            **replica_health.stats(),
+            "pool": pool_stats(replica_engine)
+        } if replica_health is not None else None
+    }
@@ -1,51 +1,59 @@
-from typing import List
-from fastapi import APIRouter, Depends, Query, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.database import get_db
 from app.schemas.payment import PaymentCreate, PaymentResponse
 from app.services.payment_service import PaymentService
-from app.api.deps import get_current_user
+from app.services.idempotency_service import IdempotencyService, request_fingerprint
+from app.api.deps import get_current_principal
 from app.models.user import User
 from app.models.payment import Payment
 from app.core.enums import UserRole
+from app.core.pagination import PageParams, paginate, set_next_cursor, split_page
 
 router = APIRouter(prefix="/payments", tags=["Pagamentos"])
 
 @router.post("", response_model=PaymentResponse, status_code=201)
 def create_payment(
     data: PaymentCreate,
-    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255),
+    current_user: User = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
-    """Cria pagamento simulado (sempre aprovado)."""
-    payment = PaymentService.create_payment(db, current_user.id, data)
-    return payment
+    """Cria pagamento simulado (sempre aprovado). Com Idempotency-Key, retries recebem a primeira resposta."""
+    return IdempotencyService.run(
+        db, current_user.id, idempotency_key, request_fingerprint("POST /payments", data),
+        201, PaymentResponse, lambda: PaymentService.create_payment(db, current_user.id, data)
+    )
 
 @router.get("", response_model=List[PaymentResponse])
 def list_payments(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    page: PageParams = Depends(),
+    current_user: User = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """
     Lista pagamentos:
     - PACIENTE: seus próprios pagamentos
     - ADMIN: todos os pagamentos
+    
+    Mais recentes primeiro; a próxima página vem do cabeçalho X-Next-Cursor.
     """
     query = db.query(Payment)
     
     if current_user.role == UserRole.PACIENTE:
         query = query.filter(Payment.patient_id == current_user.id)
     
-    payments = query.offset(skip).limit(limit).all()
+    payments, next_cursor = split_page(paginate(query, Payment, page).all(), page)
+    set_next_cursor(response, next_cursor)
     return payments
 
 @router.get("/{payment_id}", response_model=PaymentResponse)
 def get_payment(
     payment_id: UUID,
-    current_user: User = Depends(get_current_user),
+    current_user: User = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     """Consulta detalhes de um pagamento."""
@@ -3,15 +3,34 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 from uuid import UUID
 from datetime import datetime, date, time
+from decimal import Decimal
 from app.database import get_db
-from app.schemas.schedule import ScheduleSlotCreate, ScheduleSlotResponse, ScheduleSlotUpdate
+from app.schemas.schedule import (
+    ScheduleSlotCreate, ScheduleSlotResponse, ScheduleSlotUpdate, AvailabilityTemplate, BulkSlotsResponse,
+    AvailableSlotResponse
+)
 from app.services.schedule_service import ScheduleService
 from app.api.deps import get_current_user, get_current_admin_or_doctor
 from app.models.user import User
 from app.core.enums import UserRole
+from app.core.periods import clinic_now
 
 router = APIRouter(tags=["Agenda"])
 
+def _parse_datetime_param(value: Optional[str], name: str, default_time: time) -> Optional[datetime]:
+    """Converte YYYY-MM-DD (completado com default_time) ou YYYY-MM-DDTHH:MM:SS."""
+    if not value:
+        return None
+    try:
+        if 'T' in value:
+            return datetime.fromisoformat(value.rstrip('Z'))
+        return datetime.combine(datetime.strptime(value, '%Y-%m-%d').date(), default_time)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Formato inválido para '{name}'. Use YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS. Erro: {str(e)}"
+        )
+
 @router.get("/doctors/{doctor_id}/agenda", response_model=List[ScheduleSlotResponse])
 def get_doctor_agenda(
     doctor_id: UUID,
@@ -19,40 +38,26 @@ def get_doctor_agenda(
     end: Optional[str] = Query(None, description="Data final (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS)"),
     db: Session = Depends(get_db)
 ):
-    start_dt = None
-    end_dt = None
-    
-    if start:
-        try:
-            if 'T' in start:
-                start = start.rstrip('Z')
-                start_dt = datetime.fromisoformat(start)
-            else:
-                start_date = datetime.strptime(start, '%Y-%m-%d').date()
-                start_dt = datetime.combine(start_date, time.min)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Formato inválido para 'start'. Use YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS. Erro: {str(e)}"
-            )
-    
-    if end:
-        try:
-            if 'T' in end:
-                end = end.rstrip('Z')
-                end_dt = datetime.fromisoformat(end)
-            else:
-                end_date = datetime.strptime(end, '%Y-%m-%d').date()
-                end_dt = datetime.combine(end_date, time.max)
-        except ValueError as e:
-            raise HTTPException(
-                status_code=422,
-                detail=f"Formato inválido para 'end'. Use YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS. Erro: {str(e)}"
-            )
+    start_dt = _parse_datetime_param(start, "start", time.min)
+    end_dt = _parse_datetime_param(end, "end", time.max)
     
     slots = ScheduleService.get_doctor_agenda(db, doctor_id, start_dt, end_dt)
     return slots
 
+@router.get("/agenda/available", response_model=List[AvailableSlotResponse])
+def find_available_slots(
+    especialidade: Optional[str] = Query(None, description="Especialidade do médico (sem diferenciar maiúsculas)"),
+    valor_max: Optional[Decimal] = Query(None, ge=0, description="Valor máximo da consulta"),
+    start: Optional[str] = Query(None, description="A partir de (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS); padrão: agora"),
+    end: Optional[str] = Query(None, description="Até (YYYY-MM-DD ou YYYY-MM-DDTHH:MM:SS)"),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    """Próximos horários livres entre todos os médicos ativos, do mais cedo ao mais tarde (público)."""
+    start_dt = _parse_datetime_param(start, "start", time.min) or clinic_now()
+    end_dt = _parse_datetime_param(end, "end", time.max)
+    return ScheduleService.find_available(db, start_dt, end_dt, especialidade, valor_max, limit)
+
 @router.post("/doctors/{doctor_id}/agenda/slots", response_model=ScheduleSlotResponse, status_code=201)
 def create_schedule_slot(
     doctor_id: UUID,
@@ -68,6 +73,21 @@ def create_schedule_slot(
     slot = ScheduleService.create_slot(db, doctor_id, data, current_user.id)
     return slot
 
+@router.post("/doctors/{doctor_id}/agenda/templates", response_model=BulkSlotsResponse, status_code=201)
+def create_slots_from_template(
+    doctor_id: UUID,
+    template: AvailabilityTemplate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Gera os slots de um modelo semanal de disponibilidade; horários em conflito são ignorados."""
+    if current_user.role == UserRole.MEDICO and current_user.id != doctor_id:
+        raise HTTPException(status_code=403, detail="Você só pode criar slots na sua própria agenda")
+    elif current_user.role == UserRole.PACIENTE:
+        raise HTTPException(status_code=403, detail="Pacientes não podem criar slots")
+    
+    return ScheduleService.create_slots_from_template(db, doctor_id, template, current_user.id)
+
 @router.delete("/agenda/slots/{slot_id}", status_code=204)
 def delete_schedule_slot(
     slot_id: UUID,
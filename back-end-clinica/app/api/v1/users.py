@@ -1,13 +1,15 @@
 
 from typing import List
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.database import get_db
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, UserPasswordUpdate
 from app.services.user_service import UserService
+from app.services.audit_service import AuditService
 from app.api.deps import get_current_admin, get_current_user
 from app.models.user import User
+from app.core.pagination import PageParams, set_next_cursor
 
 router = APIRouter(prefix="/users", tags=["Usuários"])
 
@@ -19,17 +21,19 @@ def create_user(
 ):
     """Cria usuário (apenas ADMIN). Pode criar qualquer role."""
     user = UserService.create_user(db, user_data, current_admin.role)
+    AuditService.log_user_created(current_admin.id, user.id, user.role.value)
     return user
 
 @router.get("", response_model=List[UserResponse])
 def list_users(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(20, ge=1, le=100),
+    response: Response,
+    page: PageParams = Depends(),
     current_admin: User = Depends(get_current_admin),
     db: Session = Depends(get_db)
 ):
-    """Lista todos os usuários (apenas ADMIN)."""
-    users = UserService.list_users(db, skip, limit)
+    """Lista todos os usuários (apenas ADMIN), mais recentes primeiro; próxima página em X-Next-Cursor."""
+    users, next_cursor = UserService.list_users(db, page)
+    set_next_cursor(response, next_cursor)
     return users
 
 @router.get("/{user_id}", response_model=UserResponse)
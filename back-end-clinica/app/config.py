@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,7 +7,102 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
-    
+
+    # "sync": engine psycopg2 + rotas síncronas (threadpool).
+    # "async": AsyncEngine (asyncpg) + rotas async para auth, agenda, consultas e pagamentos.
+    DATABASE_MODE: Literal["sync", "async"] = "sync"
+    # Opcional; por padrão deriva de DATABASE_URL trocando o driver para asyncpg
+    DATABASE_ASYNC_URL: Optional[str] = None
+
+    # Pool de conexões (por worker). PRE_PING: "always" (a cada checkout),
+    # "idle" (só conexões ociosas há mais de PRE_PING_IDLE_SECONDS) ou "never"
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: Literal["always", "idle", "never"] = "idle"
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30
+
+    # Réplica de leitura opcional para relatórios e dashboard. Se indisponível ou
+    # atrasada mais que MAX_LAG_SECONDS, as leituras voltam ao primário
+    DATABASE_REPLICA_URL: Optional[str] = None
+    REPLICA_MAX_LAG_SECONDS: float = 10
+    REPLICA_CHECK_SECONDS: float = 5
+
+    # Contagem de SQL por requisição: cabeçalhos X-DB-Queries/X-DB-Time-Ms e aviso
+    # no log quando o mesmo statement roda mais que REPEAT_THRESHOLD vezes (N+1)
+    QUERY_STATS_ENABLED: bool = False
+    QUERY_STATS_REPEAT_THRESHOLD: int = 10
+
+    # Log de queries lentas (0 desativa): SQL normalizado, parâmetros sem dados
+    # pessoais e rota de origem. EXPLAIN só no Postgres, em segundo plano
+    SLOW_QUERY_MS: float = 500
+    SLOW_QUERY_EXPLAIN: bool = False
+
+    # Fuso da clínica (nome IANA): define dia, mês e ano dos relatórios, do dashboard
+    # e dos totais mensais. Ao alterar, recalcule com `python -m scripts.rebuild_rollups`
+    CLINIC_TIMEZONE: str = "America/Sao_Paulo"
+
+    # Cache de usuários autenticados (por processo/worker)
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: int = 60
+
+    # Autorização por papel apenas pelas claims do token (sem SELECT em users).
+    # Usuários desativados seguem aceitos nessas rotas até o token expirar.
+    AUTH_CLAIMS_ONLY: bool = False
+
+    # Executor dedicado de bcrypt. WORKERS + MAX_QUEUE deve ficar bem abaixo
+    # das 40 threads do threadpool do Starlette para não esgotá-lo em picos de login.
+    HASH_EXECUTOR_WORKERS: int = 4
+    HASH_EXECUTOR_MAX_QUEUE: int = 16
+
+    # Custo do bcrypt (log2 das iterações). Calibre com `python -m scripts.calibrar_bcrypt`.
+    # Hashes com custo diferente são refeitos no próximo login bem-sucedido.
+    BCRYPT_ROUNDS: int = 12
+
+    # Revogação de tokens (logout/rotação de refresh): lista em memória carregada na
+    # inicialização e sincronizada em segundo plano com a tabela revoked_tokens a cada
+    # SYNC (incremental, 0 desativa) / REBUILD (completa, com limpeza dos expirados) segundos
+    REVOCATION_SYNC_SECONDS: int = 5
+    REVOCATION_REBUILD_SECONDS: int = 600
+    REVOCATION_BLOOM_CAPACITY: int = 100000
+
+    # Idempotency-Key em POST /appointments e /payments: respostas guardadas por TTL_HOURS.
+    # Duplicatas concorrentes esperam a primeira até WAIT_SECONDS; uma chave em andamento
+    # há mais de LOCK_SECONDS (processo caiu) pode ser retomada. SWEEP_SECONDS=0 desliga a limpeza
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_WAIT_SECONDS: float = 10
+    IDEMPOTENCY_LOCK_SECONDS: int = 60
+    IDEMPOTENCY_SWEEP_SECONDS: int = 300
+    IDEMPOTENCY_SWEEP_BATCH: int = 1000
+
+    # Auditoria em segundo plano: eventos numa fila limitada, gravados em lote a cada
+    # FLUSH_MS ou BATCH_SIZE eventos. Fila cheia: "block" espera até BLOCK_SECONDS (e descarta),
+    # "drop" descarta, "spill" grava em SPILL_PATH (JSON lines) para regravar depois
+    AUDIT_QUEUE_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_MS: float = 200
+    AUDIT_OVERFLOW: Literal["block", "drop", "spill"] = "block"
+    AUDIT_BLOCK_SECONDS: float = 1.0
+    AUDIT_SPILL_PATH: Optional[str] = "audit_spill.jsonl"
+
+    # Retenção da auditoria (partições mensais): `python -m scripts.audit_retention` mantém
+    # RETENTION_MONTHS meses no banco (incluindo o atual), arquiva os anteriores em ARCHIVE_DIR
+    # (NDJSON gzip) e cria as partições dos próximos PARTITIONS_AHEAD meses
+    AUDIT_RETENTION_MONTHS: int = 12
+    AUDIT_PARTITIONS_AHEAD: int = 3
+    AUDIT_ARCHIVE_DIR: str = "arquivo_auditoria"
+
+    # Cache HTTP das rotas públicas de médicos (ETag/Last-Modified): navegadores e CDNs
+    # reaproveitam a resposta por MAX_AGE segundos e depois revalidam (304 sem carregar as linhas).
+    # 0 = sempre revalidar
+    DOCTORS_CACHE_MAX_AGE_SECONDS: int = 60
+
+    # Cache de tokens já decodificados (evita refazer HMAC + JSON a cada requisição)
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+
     class Config:
         env_file = ".env"
         case_sensitive = True
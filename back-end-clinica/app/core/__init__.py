@@ -2,6 +2,9 @@
 from app.core.security import (
     verify_password,
     get_password_hash,
+    averify_password,
+    aget_password_hash,
+    needs_rehash,
     create_access_token,
     create_refresh_token,
     decode_token
@@ -11,6 +14,9 @@ from app.core.enums import UserRole, SlotStatus, AppointmentStatus, PaymentStatu
 __all__ = [
     "verify_password",
     "get_password_hash",
+    "averify_password",
+    "aget_password_hash",
+    "needs_rehash",
     "create_access_token",
     "create_refresh_token",
     "decode_token",
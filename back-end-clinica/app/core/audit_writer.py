@@ -0,0 +1,325 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+from app.core.metrics import percentiles
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+
+class AuditWriter:
+    """
+    Fila limitada de eventos de auditoria, gravada em lote por uma thread própria.
+
+    `submit` só enfileira (sem I/O na requisição); a thread grava com um INSERT de
+    várias linhas a cada `flush_ms` ou `batch_size` eventos. Com a fila cheia, o
+    `overflow` decide: "block" espera até `block_seconds` (e descarta se não abrir
+    espaço), "drop" descarta e "spill" anexa o evento em `spill_path` (JSON lines),
+    regravado no banco quando a fila esvazia. Lotes que falham também vão para o
+    arquivo, se configurado. `stop` grava tudo o que está pendente.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Dict[str, Any]]], None],
+        max_queue: int,
+        batch_size: int,
+        flush_ms: float,
+        overflow: str,
+        block_seconds: float = 1.0,
+        spill_path: Optional[str] = None,
+    ):
+        self.write_batch = write_batch
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.overflow = overflow
+        self.block_seconds = block_seconds
+        self.spill_path = spill_path
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._pending = 0
+        self._enqueued = 0
+        self._written = 0
+        self._dropped = 0
+        self._spilled = 0
+        self._failed_batches = 0
+        self._flushes = 0
+        self._lag_ms: deque = deque(maxlen=1000)
+        self._flush_ms: deque = deque(maxlen=1000)
+        self._atexit_registered = False
+
+    # --- produtores -------------------------------------------------------
+
+    def submit(self, event: Dict[str, Any], block: bool = True) -> None:
+        """
+        Enfileira um evento (colunas de audit_logs). Nunca lança: auditoria não derruba a requisição.
+        Com `block=False` (código assíncrono, que não pode parar o event loop) o modo "block"
+        não espera: com a fila cheia o evento vai para o arquivo de transbordo, se houver.
+        """
+        self._ensure_started()
+        item = (time.monotonic(), event)
+        esperar = block and self.overflow == "block"
+        with self._lock:
+            self._pending += 1
+        try:
+            if esperar:
+                self._queue.put(item, timeout=self.block_seconds)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            with self._lock:
+                self._pending -= 1
+                self._idle.notify_all()
+            transbordar = self.overflow == "spill" or (self.overflow == "block" and not block)
+            if transbordar and self._spill([event]):
+                return
+            with self._lock:
+                self._dropped += 1
+            return
+        with self._lock:
+            self._enqueued += 1
+
+    # --- ciclo de vida ----------------------------------------------------
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            if not self._atexit_registered:
+                # Scripts e processos sem lifespan também gravam o que ficou na fila
+                atexit.register(self.stop)
+                self._atexit_registered = True
+
+    def _ensure_started(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Grava os eventos pendentes e encerra a thread."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join(timeout)
+        self._thread = None
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Aguarda a gravação de tudo o que já foi enfileirado (testes, encerramento)."""
+        limite = time.monotonic() + timeout
+        with self._lock:
+            while self._pending:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    return False
+                self._idle.wait(restante)
+        return True
+
+    # --- thread de gravação -----------------------------------------------
+
+    def _run(self) -> None:
+        self._guarded(self._replay_spill)
+        while True:
+            batch = self._guarded(self._next_batch)
+            if batch:
+                self._guarded(self._write, batch)
+            elif self._stopping.is_set():
+                return
+            if self._queue.empty():
+                self._guarded(self._replay_spill)
+
+    def _guarded(self, fn: Callable, *args: Any) -> Any:
+        """Um erro inesperado é registrado sem encerrar a thread (a fila seria perdida no stop)."""
+        try:
+            return fn(*args)
+        except Exception:
+            logger.exception("Erro inesperado na thread de gravação da auditoria")
+            # Evita laço apertado se o erro se repetir
+            time.sleep(self.flush_ms / 1000)
+            return None
+
+    def _next_batch(self) -> List[tuple]:
+        """Primeiro evento (espera até flush_ms), depois completa o lote até o prazo ou o tamanho."""
+        espera = self.flush_ms / 1000
+        try:
+            batch = [self._queue.get(timeout=espera)]
+        except queue.Empty:
+            return []
+        prazo = time.monotonic() + espera
+        while len(batch) < self.batch_size:
+            restante = 0 if self._stopping.is_set() else prazo - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=restante) if restante > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[tuple]) -> None:
+        try:
+            self._write_events(batch)
+        finally:
+            # Mesmo com erro inesperado, flush() não fica esperando por este lote
+            with self._lock:
+                self._pending -= len(batch)
+                self._idle.notify_all()
+
+    def _write_events(self, batch: List[tuple]) -> None:
+        inicio = time.perf_counter()
+        events = [event for _, event in batch]
+        try:
+            self.write_batch(events)
+            ok = True
+        except Exception:
+            logger.exception("Falha ao gravar lote de %d eventos de auditoria", len(events))
+            ok = False
+        agora = time.monotonic()
+        with self._lock:
+            self._flushes += 1
+            self._flush_ms.append((time.perf_counter() - inicio) * 1000)
+            if ok:
+                self._written += len(events)
+                self._lag_ms.extend((agora - enqueued_at) * 1000 for enqueued_at, _ in batch)
+        if not ok:
+            spilled = self._spill(events)
+            with self._lock:
+                self._failed_batches += 1
+                if not spilled:
+                    self._dropped += len(events)
+
+    # --- arquivo de transbordo --------------------------------------------
+
+    def _spill(self, events: List[Dict[str, Any]]) -> bool:
+        if not self.spill_path:
+            return False
+        try:
+            # O lock entre processos impede que a troca do arquivo por .replay pegue uma escrita pela metade
+            with self._spill_lock, _file_lock(self.spill_path + ".lock") as travado:
+                if not travado:
+                    return False
+                with open(self.spill_path, "a", encoding="utf-8") as spill:
+                    for event in events:
+                        spill.write(json.dumps(event, default=str) + "\n")
+        except OSError:
+            logger.exception("Falha ao gravar eventos de auditoria em %s", self.spill_path)
+            return False
+        with self._lock:
+            self._spilled += len(events)
+        return True
+
+    def _replay_spill(self) -> None:
+        """
+        Regrava no banco os eventos do arquivo de transbordo (se houver). Os workers
+        compartilham o arquivo: só um processo regrava por vez (os demais pulam). Após
+        cada lote gravado, o .replay é reescrito só com o restante, para que uma falha
+        no meio não regrave lotes que já foram para o banco.
+        """
+        if not self.spill_path:
+            return
+        replay_path = self.spill_path + ".replay"
+        if not os.path.exists(self.spill_path) and not os.path.exists(replay_path):
+            return
+        with _file_lock(replay_path + ".lock", blocking=False) as travado:
+            if not travado:
+                return
+            try:
+                with self._spill_lock, _file_lock(self.spill_path + ".lock") as travado_spill:
+                    # Um .replay remanescente (falha anterior) é regravado antes
+                    if travado_spill and not os.path.exists(replay_path) and os.path.exists(self.spill_path):
+                        os.replace(self.spill_path, replay_path)
+                if not os.path.exists(replay_path):
+                    return
+                with open(replay_path, encoding="utf-8") as spill:
+                    linhas = [line for line in spill if line.strip()]
+                for i in range(0, len(linhas), self.batch_size):
+                    lote = linhas[i:i + self.batch_size]
+                    self.write_batch([_from_json(json.loads(line)) for line in lote])
+                    _rewrite(replay_path, linhas[i + len(lote):])
+                    with self._lock:
+                        self._written += len(lote)
+                os.remove(replay_path)
+            except Exception:
+                logger.exception("Falha ao regravar eventos de auditoria de %s", replay_path)
+
+    # --- métricas ---------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        with self._queue.mutex:
+            oldest = self._queue.queue[0][0] if self._queue.queue else None
+        with self._lock:
+            return {
+                "overflow": self.overflow,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queue.qsize(),
+                "oldest_pending_ms": round((time.monotonic() - oldest) * 1000, 2) if oldest is not None else 0.0,
+                "enqueued": self._enqueued,
+                "written": self._written,
+                "dropped": self._dropped,
+                "spilled": self._spilled,
+                "failed_batches": self._failed_batches,
+                "flushes": self._flushes,
+                "lag_ms": percentiles(sorted(self._lag_ms)),
+                "flush_ms": percentiles(sorted(self._flush_ms)),
+            }
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """Lock exclusivo entre processos num arquivo auxiliar; True se obtido."""
+    with open(path, "a+b") as handle:
+        try:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _rewrite(path: str, linhas: List[str]) -> None:
+    """Substitui o arquivo pelo restante das linhas (temporário + rename, nunca pela metade)."""
+    temporario = path + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        arquivo.writelines(linhas)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, path)
+
+
+def _from_json(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Desfaz a serialização do transbordo (UUID e datetime viram texto no JSON)."""
+    return {
+        **event,
+        "user_id": UUID(event["user_id"]) if event.get("user_id") else None,
+        "created_at": datetime.fromisoformat(event["created_at"]),
+    }
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from app.config import settings
+
+
+class TTLCache:
+    """Cache em memória com limite de tamanho, expiração (TTL) e despejo LRU. Seguro entre threads."""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Retorna o valor em cache ou None se ausente/expirado."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Armazena um valor; o TTL padrão pode ser reduzido por entrada."""
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Cache de usuários autenticados, indexado pelo `sub` do JWT (id do usuário)
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE if settings.USER_CACHE_ENABLED else 0,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# Cache de claims de JWTs já validados, indexado pelo hash do token; cada
+# entrada expira no `exp` do próprio token
+token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE if settings.TOKEN_CACHE_ENABLED else 0,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
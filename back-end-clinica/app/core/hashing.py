@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from app.config import settings
+from app.core.metrics import percentiles
+
+
+class HashingOverloadedError(Exception):
+    """Fila do executor de hash cheia: a requisição deve ser recusada (503)."""
+
+
+class HashExecutor:
+    """
+    Executor dedicado e limitado para bcrypt.
+
+    O hash roda em um pool próprio (o bcrypt libera o GIL), fora do threadpool
+    compartilhado do Starlette. No máximo `max_workers + max_queue` tarefas ficam
+    pendentes; acima disso `submit` falha imediatamente com HashingOverloadedError.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._latencies_ms: deque = deque(maxlen=1000)
+        self._waits_ms: deque = deque(maxlen=1000)
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HashingOverloadedError()
+        with self._lock:
+            self._queued += 1
+        try:
+            return self._executor.submit(self._run, time.perf_counter(), fn, *args)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+
+    def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Executa no pool e aguarda o resultado (para código síncrono)."""
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Executa no pool sem bloquear o event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def _run(self, submitted_at: float, fn: Callable[..., Any], *args: Any) -> Any:
+        started_at = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        try:
+            return fn(*args)
+        finally:
+            finished_at = time.perf_counter()
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._waits_ms.append((started_at - submitted_at) * 1000)
+                self._latencies_ms.append((finished_at - started_at) * 1000)
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies_ms)
+            waits = sorted(self._waits_ms)
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "hash_latency_ms": percentiles(latencies),
+                "queue_wait_ms": percentiles(waits),
+            }
+
+
+hash_executor = HashExecutor(
+    max_workers=settings.HASH_EXECUTOR_WORKERS,
+    max_queue=settings.HASH_EXECUTOR_MAX_QUEUE,
+)
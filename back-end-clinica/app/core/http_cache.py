@@ -0,0 +1,59 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+from fastapi import Request, Response
+from app.config import settings
+
+def make_etag(*partes: Any) -> str:
+    """
+    ETag fraca derivada da versão dos dados (ex.: updated_at), não dos bytes da resposta:
+    dá para comparar com If-None-Match sem carregar nem serializar as linhas.
+    """
+    digest = hashlib.sha256("|".join(str(parte) for parte in partes).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+def has_validators(request: Request) -> bool:
+    """A requisição é condicional (If-None-Match ou If-Modified-Since)?"""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+def _utc(instante: datetime) -> datetime:
+    return (instante if instante.tzinfo else instante.replace(tzinfo=timezone.utc)).astimezone(timezone.utc)
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """
+    If-None-Match tem precedência (comparação fraca, aceita "*"); If-Modified-Since só vale
+    sem ele. Last-Modified tem resolução de segundos, por isso o truncamento.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        desde = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if desde.tzinfo is None:
+        return False
+    return _utc(last_modified).replace(microsecond=0) <= desde
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    max_age = settings.DOCTORS_CACHE_MAX_AGE_SECONDS
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}" if max_age > 0 else "public, no-cache",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_utc(last_modified), usegmt=True)
+    return headers
+
+def set_cache_headers(response: Response, etag: str, last_modified: Optional[datetime]) -> None:
+    response.headers.update(cache_headers(etag, last_modified))
+
+def not_modified(etag: str, last_modified: Optional[datetime]) -> Response:
+    """Resposta 304: sem corpo, com os mesmos validadores e Cache-Control da resposta 200."""
+    return Response(status_code=304, headers=cache_headers(etag, last_modified))
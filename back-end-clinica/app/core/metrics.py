@@ -0,0 +1,11 @@
+from typing import Dict, Sequence
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """p50, p95 e máximo de uma lista já ordenada (zeros se vazia), para as métricas internas."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "max": 0.0}
+    return {
+        "p50": round(values[len(values) // 2], 2),
+        "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 2),
+        "max": round(values[-1], 2),
+    }
@@ -0,0 +1,64 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import tuple_
+
+# Cabeçalho com o cursor da próxima página (ausente na última página)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, id_: UUID) -> str:
+    """Cursor opaco: posição (created_at, id) da última linha entregue."""
+    raw = json.dumps([created_at.isoformat(), str(id_)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id_ = json.loads(raw)
+        return datetime.fromisoformat(created_at), UUID(id_)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Cursor inválido") from exc
+
+class PageParams:
+    """
+    Parâmetros das listagens. Sem `cursor` a primeira página é igual nos dois modos;
+    `skip` (offset) continua aceito, mas páginas profundas ficam lentas.
+    """
+
+    def __init__(
+        self,
+        skip: int = Query(0, ge=0),
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description=f"Valor do cabeçalho {NEXT_CURSOR_HEADER} da página anterior")
+    ):
+        if cursor and skip:
+            raise HTTPException(status_code=400, detail="Use skip ou cursor, não ambos")
+        self.skip = skip
+        self.limit = limit
+        self.after = decode_cursor(cursor) if cursor else None
+
+def paginate(query: Any, model: Any, page: PageParams) -> Any:
+    """
+    Ordena por (created_at, id) decrescente e aplica o cursor (ou o offset).
+    Busca limit + 1 linhas para saber se há próxima página; ver `split_page`.
+    Serve para Query (sync) e Select (async).
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if page.after:
+        query = query.where(tuple_(model.created_at, model.id) < page.after)
+    elif page.skip:
+        query = query.offset(page.skip)
+    return query.limit(page.limit + 1)
+
+def split_page(rows: Sequence[Any], page: PageParams) -> Tuple[List[Any], Optional[str]]:
+    items = list(rows[:page.limit])
+    if len(rows) <= page.limit:
+        return items, None
+    return items, encode_cursor(items[-1].created_at, items[-1].id)
+
+def set_next_cursor(response: Response, next_cursor: Optional[str]) -> None:
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
@@ -0,0 +1,75 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Any, List, Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import Date, DateTime, cast, func
+from sqlalchemy.sql.elements import ClauseElement
+from app.config import settings
+
+def clinic_tz() -> ZoneInfo:
+    return ZoneInfo(settings.CLINIC_TIMEZONE)
+
+def clinic_now() -> datetime:
+    return datetime.now(clinic_tz())
+
+def _start_of(day: date) -> datetime:
+    """Meia-noite de `day` no fuso da clínica."""
+    return datetime.combine(day, time.min, tzinfo=clinic_tz())
+
+def local_month(ts: Any):
+    """
+    Expressão SQL do mês (DATE do dia 1) de um timestamp no fuso da clínica.
+    `ts` pode ser coluna, expressão (ex.: now()) ou valor Python.
+    """
+    if not isinstance(ts, ClauseElement):
+        ts = cast(ts, DateTime(timezone=True))
+    return cast(func.date_trunc("month", func.timezone(settings.CLINIC_TIMEZONE, ts)), Date)
+
+@dataclass(frozen=True)
+class Period:
+    """
+    Intervalo semiaberto [inicio, fim) de instantes no fuso da clínica (None = sem limite).
+    Os filtros comparam a coluna diretamente, sem função em volta, e usam os índices.
+    """
+    inicio: Optional[datetime] = None
+    fim: Optional[datetime] = None
+
+    @classmethod
+    def days(cls, start: Optional[date] = None, end: Optional[date] = None) -> "Period":
+        """Dias inteiros de `start` a `end`, ambos inclusivos."""
+        return cls(
+            _start_of(start) if start else None,
+            _start_of(end + timedelta(days=1)) if end else None
+        )
+
+    @classmethod
+    def month(cls, year: int, month: int) -> "Period":
+        return cls(_start_of(date(year, month, 1)), _start_of(date(year + month // 12, month % 12 + 1, 1)))
+
+    @classmethod
+    def year(cls, year: int) -> "Period":
+        return cls(_start_of(date(year, 1, 1)), _start_of(date(year + 1, 1, 1)))
+
+    @classmethod
+    def month_of(cls, instant: datetime) -> "Period":
+        """Mês (no fuso da clínica) que contém `instant`; sem tzinfo, já é hora local da clínica."""
+        local = instant.astimezone(clinic_tz()) if instant.tzinfo else instant
+        return cls.month(local.year, local.month)
+
+    def where(self, column: Any) -> List[Any]:
+        """Condições para uma coluna timestamptz: column >= inicio AND column < fim."""
+        conditions = []
+        if self.inicio is not None:
+            conditions.append(column >= self.inicio)
+        if self.fim is not None:
+            conditions.append(column < self.fim)
+        return conditions
+
+    def where_dates(self, column: Any) -> List[Any]:
+        """Mesmo filtro para uma coluna DATE de datas locais (ex.: monthly_rollups.mes)."""
+        conditions = []
+        if self.inicio is not None:
+            conditions.append(column >= self.inicio.date())
+        if self.fim is not None:
+            conditions.append(column < self.fim.date())
+        return conditions
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.config import settings
+from app.core.metrics import percentiles
+
+
+class PoolMetrics:
+    """Contadores de espera/timeout de checkout e de pings do pool de conexões."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.checkouts = 0
+            self.timeouts = 0
+            self.pings = 0
+            self.ping_failures = 0
+            self._waits_ms: deque = deque(maxlen=1000)
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._waits_ms.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_ping(self, ok: bool) -> None:
+        with self._lock:
+            self.pings += 1
+            self.ping_failures += not ok
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_ms": percentiles(sorted(self._waits_ms)),
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Mede o tempo de espera por uma conexão livre e conta os timeouts de checkout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout((time.perf_counter() - started_at) * 1000)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() e invalidações recriam o pool: preserva os contadores
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_options(async_: bool = False) -> Dict[str, Any]:
+    """Argumentos de create_engine/create_async_engine a partir das configurações DB_POOL_*."""
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if async_ else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING == "always",
+    }
+
+
+def install_idle_pre_ping(engine: Engine, idle_seconds: float) -> None:
+    """
+    Pre-ping apenas de conexões ociosas há mais de `idle_seconds`.
+    Uma conexão que falha no ping é descartada e o pool entrega outra.
+    """
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        # Conexões recém-abertas ainda não foram devolvidas: não precisam de ping
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics = getattr(engine.pool, "metrics", None)
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as exc:
+            if metrics is not None:
+                metrics.record_ping(False)
+            raise DisconnectionError("Conexão ociosa falhou no pre-ping") from exc
+        if metrics is not None:
+            metrics.record_ping(True)
+
+
+def configure_engine(engine: Engine) -> Engine:
+    if settings.DB_POOL_PRE_PING == "idle":
+        install_idle_pre_ping(engine, settings.DB_POOL_PRE_PING_IDLE_SECONDS)
+    return engine
+
+
+def pool_stats(engine: Engine) -> Dict[str, Any]:
+    """Estado atual do pool (conexões em uso, overflow) + métricas acumuladas."""
+    pool = engine.pool
+    stats: Dict[str, Any] = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # overflow() é negativo enquanto o pool não atingiu pool_size
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": getattr(pool, "_max_overflow", None),
+        "timeout_seconds": pool.timeout(),
+    }
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
@@ -0,0 +1,123 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.config import settings
+from app.core.slow_query import log_slow_query
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-DB-Queries"
+DB_TIME_HEADER = "X-DB-Time-Ms"
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class QueryStats:
+    """Statements SQL executados em um escopo (requisição ou bloco de teste)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        # Os parâmetros já vêm como placeholders: o texto do statement é o seu "formato"
+        shape = _WHITESPACE.sub(" ", statement).strip()
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> List[tuple]:
+        """Formatos executados mais de `threshold` vezes (suspeitas de N+1)."""
+        with self._lock:
+            return [(shape, n) for shape, n in self.shapes.most_common() if n > threshold]
+
+    def report(self) -> str:
+        with self._lock:
+            return "\n".join(f"{n:4d}x {shape}" for shape, n in self.shapes.most_common())
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+# Coletores globais (testes): recebem statements de qualquer thread/contexto
+_collectors: List[QueryStats] = []
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, elapsed_ms)
+    for collector in _collectors:
+        collector.record(statement, elapsed_ms)
+    if 0 < settings.SLOW_QUERY_MS <= elapsed_ms:
+        log_slow_query(conn, statement, parameters, elapsed_ms)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Conta os statements executados no contexto atual (requisição)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Conta todos os statements do processo enquanto ativo (ex.: em testes com TestClient)."""
+    stats = QueryStats()
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI: conta statements e tempo de banco por requisição, devolve
+    os totais nos cabeçalhos X-DB-Queries / X-DB-Time-Ms e registra um aviso
+    quando o mesmo statement se repete mais que QUERY_STATS_REPEAT_THRESHOLD vezes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_headers(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERIES_HEADER.lower().encode(), str(stats.count).encode()))
+                    headers.append((DB_TIME_HEADER.lower().encode(), f"{stats.total_ms:.2f}".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_headers)
+
+        for shape, n in stats.repeated(settings.QUERY_STATS_REPEAT_THRESHOLD):
+            logger.warning(
+                "Possível N+1 em %s %s: statement executado %d vezes: %s",
+                scope["method"], scope["path"], n, shape[:300]
+            )
@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Atraso de replicação em segundos; 0 quando a réplica já aplicou todo o WAL recebido
+# (sem isso, um primário ocioso faria a réplica parecer atrasada)
+_PG_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class ReplicaHealth:
+    """
+    Estado da réplica de leitura: disponível e com atraso abaixo de `max_lag_seconds`.
+    A checagem roda no máximo a cada `check_seconds`, por uma única thread;
+    as demais usam o último resultado.
+    """
+
+    def __init__(self, engine: Engine, max_lag_seconds: float, check_seconds: float):
+        self.engine = engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.last_check = float("-inf")
+        self.last_error: Optional[str] = None
+        self.fallbacks = 0
+
+    def measure_lag(self) -> float:
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name == "postgresql":
+                return float(conn.execute(_PG_LAG_SQL).scalar() or 0)
+            conn.execute(text("SELECT 1"))
+            return 0.0
+
+    def check(self) -> bool:
+        try:
+            lag = self.measure_lag()
+        except Exception as exc:
+            if self.healthy or self.last_error is None:
+                logger.warning("Réplica de leitura indisponível: %s", exc)
+            self.healthy, self.lag_seconds, self.last_error = False, None, str(exc)
+        else:
+            self.lag_seconds, self.last_error = lag, None
+            self.healthy = lag <= self.max_lag_seconds
+            if not self.healthy:
+                logger.warning("Réplica de leitura atrasada %.1fs; usando o primário", lag)
+        self.last_check = time.monotonic()
+        return self.healthy
+
+    def is_usable(self) -> bool:
+        if time.monotonic() - self.last_check >= self.check_seconds and self._lock.acquire(blocking=False):
+            try:
+                self.check()
+            finally:
+                self._lock.release()
+        if not self.healthy:
+            self.fallbacks += 1
+        return self.healthy
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "fallbacks": self.fallbacks,
+            "last_error": self.last_error,
+        }
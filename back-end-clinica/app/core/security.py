@@ -1,16 +1,25 @@
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
+from app.core.hashing import hash_executor
+from app.core.cache import token_cache
 
-# Configuração do bcrypt com parâmetros simplificados
+# Configuração do bcrypt: custo fixo em BCRYPT_ROUNDS; hashes fora dele
+# (ex.: gen_salt('bf') do pgcrypto, custo 6) são marcados para atualização
 pwd_context = CryptContext(
     schemes=["bcrypt"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
 )
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha fornecida corresponde ao hash."""
     try:
         # Trunca a senha para 72 bytes antes de verificar (limite do bcrypt)
@@ -23,7 +32,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         print(f"Erro ao verificar senha: {e}")
         return False
 
-def get_password_hash(password: str) -> str:
+def _get_password_hash(password: str) -> str:
     """Gera o hash da senha."""
     # Trunca a senha para 72 bytes antes de fazer hash (limite do bcrypt)
     password_bytes = password.encode('utf-8')
@@ -32,23 +41,56 @@ def get_password_hash(password: str) -> str:
     
     return pwd_context.hash(password)
 
+def needs_rehash(hashed_password: str) -> bool:
+    """Indica se o hash foi gerado com parâmetros diferentes dos atuais."""
+    try:
+        return pwd_context.needs_update(hashed_password)
+    except ValueError:
+        return False
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verifica se a senha fornecida corresponde ao hash (no executor dedicado de bcrypt)."""
+    return hash_executor.run(_verify_password, plain_password, hashed_password)
+
+def get_password_hash(password: str) -> str:
+    """Gera o hash da senha (no executor dedicado de bcrypt)."""
+    return hash_executor.run(_get_password_hash, password)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Versão assíncrona de verify_password."""
+    return await hash_executor.arun(_verify_password, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    """Versão assíncrona de get_password_hash."""
+    return await hash_executor.arun(_get_password_hash, password)
+
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """Cria um token de acesso JWT."""
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 def create_refresh_token(data: Dict[str, Any]) -> str:
     """Cria um token de refresh JWT."""
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 def decode_token(token: str) -> Optional[Dict[str, Any]]:
-    """Decodifica e valida um token JWT."""
+    """Decodifica e valida um token JWT (com cache até o `exp` do token)."""
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = token_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+    
     try:
-        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
-        return None 
\ No newline at end of file
+        return None
+    
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(key, payload, ttl_seconds=exp - time.time())
+    return dict(payload) 
\ No newline at end of file
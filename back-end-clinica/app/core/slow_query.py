@@ -0,0 +1,159 @@
+import atexit
+import logging
+import queue
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+from uuid import UUID
+from app.config import settings
+from app.core.cache import TTLCache
+from app.core.enums import AppointmentStatus, PaymentStatus, SlotStatus, UserRole
+
+# Rota da requisição corrente, preenchida pelo RouteContextMiddleware
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+# IN com parâmetros expandidos: IN (%(id_1_1)s, %(id_1_2)s, ...) -> IN (...)
+_IN_LIST = re.compile(r"\bIN \((?:[^()]*?,)+[^()]*?\)", re.IGNORECASE)
+_EMAIL = re.compile(r"[^@\s]+@[^@\s]+\.[^@\s]+")
+_CPF = re.compile(r"\d{3}\.?\d{3}\.?\d{3}-?\d{2}")
+_PARAM_SUFFIX = re.compile(r"_\d+$")
+_SQL_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# Colunas com dados pessoais ou segredos: o valor nunca vai para o log
+SENSITIVE_PARAMS = {
+    "email", "cpf", "nome", "telefone", "password", "password_hash",
+    "token", "refresh_token", "endereco", "observacoes", "detalhes",
+}
+# Lista de permissão: só estes parâmetros de texto (e valores de enum) aparecem no log.
+# Qualquer outro texto, inclusive parâmetros posicionais (asyncpg) ou de nome genérico
+# (param_1 em VALUES, IN, CAST...), vira <str N>
+SAFE_TEXT_PARAMS = {"status", "role", "metodo", "acao", "especialidade"}
+_ENUM_VALUES = {
+    member.value for enum_cls in (UserRole, SlotStatus, AppointmentStatus, PaymentStatus) for member in enum_cls
+}
+
+
+def normalize_sql(statement: str) -> str:
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (...)", sql)
+
+
+def _redact_value(value: Any, safe_text: bool = False) -> Any:
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (UUID, datetime, date, Decimal)):
+        return str(value)
+    if isinstance(value, str):
+        if _EMAIL.fullmatch(value) or _CPF.fullmatch(value):
+            return "***"
+        if (safe_text or value in _ENUM_VALUES) and len(value) <= 64:
+            return value
+        return f"<str {len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """
+    Cópia dos parâmetros com dados pessoais mascarados. Texto só aparece se o nome do
+    parâmetro estiver em SAFE_TEXT_PARAMS ou se for valor de enum; nomes sensíveis viram ***.
+    """
+    if isinstance(parameters, dict):
+        redacted = {}
+        for key, value in parameters.items():
+            name = _PARAM_SUFFIX.sub("", str(key)).lower()
+            redacted[key] = "***" if name in SENSITIVE_PARAMS else _redact_value(value, name in SAFE_TEXT_PARAMS)
+        return redacted
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: basta uma amostra
+            return [redact_parameters(parameters[0]), f"... {len(parameters)} linhas"]
+        # Posicionais (asyncpg, sqlite): sem nome, nenhum texto livre vai para o log
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+# Log via fila: o hook só enfileira o registro; a escrita (I/O) roda na thread do listener
+logger = logging.getLogger("app.slow_query")
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_listener = QueueListener(_log_queue, _stream_handler)
+_listener.start()
+atexit.register(_listener.stop)
+
+# EXPLAIN em segundo plano, uma vez por formato de statement a cada 10 minutos
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+_explain_slots = threading.BoundedSemaphore(8)
+_explained = TTLCache(max_size=1024, ttl_seconds=600)
+
+
+def log_slow_query(conn, statement: str, parameters: Any, elapsed_ms: float) -> None:
+    sql = normalize_sql(statement)
+    logger.warning(
+        "Query lenta: %.1f ms | rota=%s | sql=%s | params=%s",
+        elapsed_ms, current_route.get(), sql, redact_parameters(parameters)
+    )
+    if settings.SLOW_QUERY_EXPLAIN:
+        _schedule_explain(conn.engine, statement, parameters, sql)
+
+
+def _schedule_explain(engine, statement: str, parameters: Any, sql: str) -> None:
+    if engine.dialect.name != "postgresql" or engine.dialect.is_async:
+        return
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (dict, list, tuple)):
+        return  # executemany
+    if _explained.get(sql) is not None or not _explain_slots.acquire(blocking=False):
+        return
+    _explained.set(sql, True)
+    try:
+        _explain_executor.submit(_explain, engine, statement, parameters, sql)
+    except RuntimeError:
+        _explain_slots.release()
+
+
+def _explain(engine, statement: str, parameters: Any, sql: str) -> None:
+    try:
+        raw = engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            # ANALYZE off: só o plano; o statement não é executado de novo
+            cursor.execute("EXPLAIN (ANALYZE off, VERBOSE off) " + statement, parameters)
+            # O plano traz os parâmetros como literais: mascara todos
+            plan = _SQL_LITERAL.sub("'***'", "\n".join(row[0] for row in cursor.fetchall()))
+            cursor.close()
+            raw.rollback()
+        finally:
+            raw.close()
+        logger.warning("Plano da query lenta | sql=%s\n%s", sql, plan)
+    except Exception as exc:
+        logger.warning("EXPLAIN da query lenta falhou (%s) | sql=%s", exc, sql)
+    finally:
+        _explain_slots.release()
+
+
+class RouteContextMiddleware:
+    """Middleware ASGI que registra método e caminho da requisição para o log de queries lentas."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_route.set(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
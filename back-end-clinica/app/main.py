@@ -1,9 +1,39 @@
 
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1 import auth, appointments, schedule, payments, users, profiles, doctors, reports, dashboard
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.core.hashing import HashingOverloadedError
+from app.core.query_stats import DB_TIME_HEADER, QUERIES_HEADER, QueryStatsMiddleware
+from app.core.slow_query import RouteContextMiddleware
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.services.idempotency_service import REPLAYED_HEADER, run_sweeper
+from app.services.audit_service import audit_writer
+from app.services.revocation_service import load_revocations, run_revocation_sync
+from app.api.v1 import auth, appointments, schedule, payments, users, profiles, doctors, reports, dashboard, metrics, audit
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Tarefas de manutenção em segundo plano (uma por worker)
+    audit_writer.start()
+    # Lista de revogação carregada antes da primeira requisição (que só lê a memória)
+    await run_in_threadpool(load_revocations)
+    tasks = []
+    if settings.REVOCATION_SYNC_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_revocation_sync()))
+    if settings.IDEMPOTENCY_SWEEP_SECONDS > 0:
+        tasks.append(asyncio.create_task(run_sweeper()))
+    yield
+    for task in tasks:
+        task.cancel()
+    # Grava os eventos de auditoria ainda na fila
+    await run_in_threadpool(audit_writer.stop)
 
 app = FastAPI(
+    lifespan=lifespan,
     title="API Clínica de Psicologia",
     description="Sistema completo de gestão para clínicas de psicologia",
     version="1.0.0",
@@ -11,6 +41,11 @@ app = FastAPI(
     redoc_url="/redoc"
 )
 
+# Cabeçalhos legíveis pelo front-end em requisições cross-origin
+expose_headers = [NEXT_CURSOR_HEADER, REPLAYED_HEADER, "ETag"]
+if settings.QUERY_STATS_ENABLED:
+    expose_headers += [QUERIES_HEADER, DB_TIME_HEADER]
+
 # CORS - IMPORTANTE: deve vir ANTES dos routers
 app.add_middleware(
     CORSMiddleware,
@@ -22,9 +57,27 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=expose_headers,
 )
 
-# Routers
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+if settings.SLOW_QUERY_MS > 0:
+    app.add_middleware(RouteContextMiddleware)
+
+@app.exception_handler(HashingOverloadedError)
+async def hashing_overloaded_handler(request: Request, exc: HashingOverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Servidor sobrecarregado, tente novamente em instantes"},
+        headers={"Retry-After": "1"}
+    )
+
+# Routers: com DATABASE_MODE=async, os caminhos quentes usam as rotas assíncronas
+if settings.DATABASE_MODE == "async":
+    from app.api.v1 import aio
+    auth, schedule, appointments, payments = aio.auth, aio.schedule, aio.appointments, aio.payments
+
 app.include_router(auth.router, prefix="/api/v1")
 app.include_router(users.router, prefix="/api/v1")
 app.include_router(profiles.router, prefix="/api/v1")
@@ -34,6 +87,8 @@ app.include_router(appointments.router, prefix="/api/v1")
 app.include_router(payments.router, prefix="/api/v1")
 app.include_router(reports.router, prefix="/api/v1")
 app.include_router(dashboard.router, prefix="/api/v1")
+app.include_router(metrics.router, prefix="/api/v1")
+app.include_router(audit.router, prefix="/api/v1")
 
 @app.get("/")
 def root():
@@ -5,6 +5,9 @@ from app.models.schedule import ScheduleSlot
 from app.models.appointment import Appointment
 from app.models.payment import Payment
 from app.models.audit import AuditLog
+from app.models.revoked_token import RevokedToken
+from app.models.rollup import MonthlyRollup
+from app.models.idempotency import IdempotencyKey
 
 __all__ = [
     "User",
@@ -14,7 +17,10 @@ __all__ = [
     "ScheduleSlot",
     "Appointment",
     "Payment",
-    "AuditLog"
+    "AuditLog",
+    "RevokedToken",
+    "MonthlyRollup",
+    "IdempotencyKey"
 ]
 
 
@@ -20,4 +20,7 @@ class Appointment(Base):
     patient = relationship("User", foreign_keys=[patient_id], back_populates="appointments")
     payment = relationship("Payment", back_populates="appointment", uselist=False)
     
-    __table_args__ = (Index('ix_appt_patient', 'patient_id', 'created_at'),)
+    __table_args__ = (
+        Index('ix_appt_patient', 'patient_id', 'created_at'),
+        Index('ix_appt_created_at', 'created_at'),
+    )
@@ -1,16 +1,39 @@
-from sqlalchemy import Column, String, ForeignKey, text, DateTime
+from sqlalchemy import Column, String, ForeignKey, text, DateTime, DDL, Index, event
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import relationship
 from app.database import Base
 
 class AuditLog(Base):
+    """
+    Particionada por mês (created_at, no fuso da clínica). As partições mensais são criadas
+    e arquivadas por `python -m scripts.audit_retention`; a DEFAULT recebe o que cair fora delas.
+    """
     __tablename__ = "audit_logs"
-    
+
     id = Column(UUID(as_uuid=True), primary_key=True, server_default=text("uuid_generate_v4()"))
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"))
     acao = Column(String, nullable=False)
     alvo = Column(String)
     payload_json = Column(JSONB)
-    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
-    
-    user = relationship("User", back_populates="audit_logs")
\ No newline at end of file
+    # Faz parte da PK: a chave de partição precisa estar em toda constraint única
+    created_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, server_default=text("now()"))
+
+    user = relationship("User", back_populates="audit_logs")
+
+    # Um índice por filtro de GET /audit, terminando em (created_at, id): a ordem da
+    # paginação por cursor, que assim lê só as linhas da página em qualquer profundidade
+    __table_args__ = (
+        Index('ix_audit_logs_created_id', 'created_at', 'id'),
+        Index('ix_audit_logs_user_created_id', 'user_id', 'created_at', 'id'),
+        Index('ix_audit_logs_acao_created_id', 'acao', 'created_at', 'id'),
+        Index('ix_audit_logs_alvo_created_id', 'alvo', 'created_at', 'id'),
+        # Filtro por conteúdo do payload (@>); jsonb_path_ops é menor e só serve a @>
+        Index('ix_audit_logs_payload', 'payload_json', postgresql_using='gin', postgresql_ops={'payload_json': 'jsonb_path_ops'}),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+event.listen(
+    AuditLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT").execute_if(dialect="postgresql")
+)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, LargeBinary, ForeignKey, text, Index, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class IdempotencyKey(Base):
+    """
+    Primeira resposta de cada Idempotency-Key (por usuário), repetida byte a byte nos retries.
+    status_code nulo = requisição ainda em andamento.
+    """
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    chave = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer)
+    response_body = Column(LargeBinary)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index('ix_idempotency_keys_expires_at', 'expires_at'),
+    )
@@ -19,4 +19,7 @@ class Payment(Base):
     appointment = relationship("Appointment", back_populates="payment")
     patient = relationship("User", back_populates="payments")
     
-    __table_args__ = (Index('ix_payments_patient_date', 'patient_id', 'created_at'),)
\ No newline at end of file
+    __table_args__ = (
+        Index('ix_payments_patient_date', 'patient_id', 'created_at'),
+        Index('ix_payments_created_at', 'created_at'),
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Date, Numeric, ForeignKey, text
+from sqlalchemy import Column, String, Date, DateTime, Numeric, ForeignKey, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -19,6 +19,8 @@ class DoctorProfile(Base):
     especialidade = Column(String)
     bio = Column(String)
     valor_padrao_consulta = Column(Numeric(10, 2), nullable=False, default=0)
+    # Versão do perfil público (ETag de GET /doctors/{id}/profile)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=func.now())
     
     user = relationship("User", back_populates="doctor_profile")
 
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, ForeignKey, text, Index, DateTime
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"))
+    token_type = Column(String, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+
+    __table_args__ = (
+        Index('ix_revoked_tokens_revoked_at', 'revoked_at'),
+        Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
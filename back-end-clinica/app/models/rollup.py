@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Date, ForeignKey, Integer, Numeric, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+class MonthlyRollup(Base):
+    """
+    Totais por (médico, mês), mantidos pelos serviços na mesma transação da escrita.
+    Slots contam pelo mês de `inicio`; consultas e pagamentos pelo mês de `created_at`.
+    """
+    __tablename__ = "monthly_rollups"
+
+    doctor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    mes = Column(Date, primary_key=True)
+    slots_livres = Column(Integer, nullable=False, server_default=text("0"))
+    slots_reservados = Column(Integer, nullable=False, server_default=text("0"))
+    slots_concluidos = Column(Integer, nullable=False, server_default=text("0"))
+    slots_cancelados = Column(Integer, nullable=False, server_default=text("0"))
+    consultas_agendadas = Column(Integer, nullable=False, server_default=text("0"))
+    consultas_realizadas = Column(Integer, nullable=False, server_default=text("0"))
+    consultas_canceladas = Column(Integer, nullable=False, server_default=text("0"))
+    pagamentos = Column(Integer, nullable=False, server_default=text("0"))
+    faturamento = Column(Numeric(12, 2), nullable=False, server_default=text("0"))
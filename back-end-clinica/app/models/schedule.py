@@ -1,5 +1,5 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Enum as SQLEnum, text, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Enum as SQLEnum, text, Index, DDL, event, func
+from sqlalchemy.dialects.postgresql import UUID, ExcludeConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 from app.core.enums import SlotStatus
@@ -20,4 +20,23 @@ class ScheduleSlot(Base):
     doctor = relationship("User", foreign_keys=[doctor_id], backref="schedule_slots")
     appointment = relationship("Appointment", back_populates="slot", uselist=False)
     
-    __table_args__ = (Index('ix_slots_doctor_inicio', 'doctor_id', 'inicio'),)
\ No newline at end of file
+    __table_args__ = (
+        Index('ix_slots_doctor_inicio', 'doctor_id', 'inicio'),
+        Index('ix_slots_inicio', 'inicio'),
+        # Busca de horários livres entre médicos (GET /agenda/available), em ordem de início
+        Index('ix_slots_livre_inicio', 'inicio', postgresql_where=text("status = 'LIVRE'")),
+        # Slots do mesmo médico não se sobrepõem ([inicio, fim) semiaberto): o serviço insere
+        # direto e trata a violação, sem SELECT prévio. Requer a extensão btree_gist (abaixo)
+        ExcludeConstraint(
+            (doctor_id, '='),
+            (func.tstzrange(inicio, fim), '&&'),
+            name='ex_slots_doctor_overlap',
+            using='gist'
+        ),
+    )
+
+event.listen(
+    ScheduleSlot.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum, text
+from sqlalchemy import Column, String, Boolean, DateTime, Enum as SQLEnum, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.database import Base
@@ -15,11 +15,18 @@ class User(Base):
     role = Column(SQLEnum(UserRole, name="user_role", native_enum=True), nullable=False)
     ativo = Column(Boolean, nullable=False, default=True)
     created_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
-    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"))
+    # O trigger trg_users_updated_at também atualiza; onupdate cobre bancos criados pelo ORM
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=text("now()"), onupdate=func.now())
     
     admin_profile = relationship("AdminProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
     doctor_profile = relationship("DoctorProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
     patient_profile = relationship("PatientProfile", back_populates="user", uselist=False, cascade="all, delete-orphan")
     appointments = relationship("Appointment", foreign_keys="Appointment.patient_id", back_populates="patient")
     payments = relationship("Payment", back_populates="patient")
-    audit_logs = relationship("AuditLog", back_populates="user")
\ No newline at end of file
+    audit_logs = relationship("AuditLog", back_populates="user")
+    
+    __table_args__ = (
+        # Listagens paginadas por (created_at, id): todos os usuários e por papel (médicos)
+        Index('ix_users_created_at', 'created_at'),
+        Index('ix_users_role_created_at', 'role', 'created_at'),
+    )
\ No newline at end of file
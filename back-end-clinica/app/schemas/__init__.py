@@ -7,13 +7,15 @@ from app.schemas.profile import (
     PatientProfileCreate, PatientProfileUpdate, PatientProfileResponse
 )
 from app.schemas.schedule import (
-    ScheduleSlotCreate, ScheduleSlotUpdate, ScheduleSlotResponse
+    ScheduleSlotCreate, ScheduleSlotUpdate, ScheduleSlotResponse,
+    AvailabilityBreak, AvailabilityTemplate, SlotInterval, BulkSlotsResponse, AvailableSlotResponse
 )
 from app.schemas.appointment import (
     AppointmentCreate, AppointmentUpdate, AppointmentResponse
 )
 from app.schemas.payment import PaymentCreate, PaymentResponse
-from app.schemas.auth import LoginRequest, TokenResponse, RefreshTokenRequest
+from app.schemas.auth import LoginRequest, TokenResponse, RefreshTokenRequest, LogoutRequest
+from app.schemas.audit import AuditLogResponse
 from app.schemas.common import PaginationParams, PaginatedResponse, ErrorResponse
 
 __all__ = [
@@ -21,9 +23,12 @@ __all__ = [
     "DoctorProfileCreate", "DoctorProfileUpdate", "DoctorProfileResponse",
     "PatientProfileCreate", "PatientProfileUpdate", "PatientProfileResponse",
     "ScheduleSlotCreate", "ScheduleSlotUpdate", "ScheduleSlotResponse",
+    "AvailabilityBreak", "AvailabilityTemplate", "SlotInterval", "BulkSlotsResponse",
+    "AvailableSlotResponse",
     "AppointmentCreate", "AppointmentUpdate", "AppointmentResponse",
     "PaymentCreate", "PaymentResponse",
-    "LoginRequest", "TokenResponse", "RefreshTokenRequest",
+    "LoginRequest", "TokenResponse", "RefreshTokenRequest", "LogoutRequest",
+    "AuditLogResponse",
     "PaginationParams", "PaginatedResponse", "ErrorResponse"
 ]
 
@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from datetime import datetime
+from uuid import UUID
+
+class AuditLogResponse(BaseModel):
+    id: UUID
+    user_id: Optional[UUID]
+    acao: str
+    alvo: Optional[str]
+    payload_json: Optional[Dict[str, Any]]
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,8 @@
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 from uuid import UUID
 from app.core.enums import SlotStatus
 
@@ -40,4 +41,66 @@ class ScheduleSlotResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class AvailabilityBreak(BaseModel):
+    inicio: time
+    fim: time
+    
+    @validator('fim')
+    def validate_fim(cls, v, values):
+        if 'inicio' in values and v <= values['inicio']:
+            raise ValueError('Fim da pausa deve ser maior que início')
+        return v
+
+class AvailabilityTemplate(BaseModel):
+    """Disponibilidade semanal; horários no fuso da clínica (CLINIC_TIMEZONE)."""
+    data_inicio: date
+    data_fim: date
+    # 0 = segunda ... 6 = domingo
+    dias_semana: List[int] = Field(..., min_items=1, max_items=7)
+    hora_inicio: time
+    hora_fim: time
+    duracao_minutos: int = Field(..., ge=5, le=480)
+    intervalo_minutos: int = Field(default=0, ge=0, le=240)
+    pausas: List[AvailabilityBreak] = Field(default_factory=list)
+    
+    @validator('data_fim')
+    def validate_data_fim(cls, v, values):
+        if 'data_inicio' in values:
+            if v < values['data_inicio']:
+                raise ValueError('Data final deve ser maior ou igual à inicial')
+            if v - values['data_inicio'] > timedelta(days=366):
+                raise ValueError('Período máximo de um ano')
+        return v
+    
+    @validator('dias_semana')
+    def validate_dias_semana(cls, v):
+        if any(dia < 0 or dia > 6 for dia in v):
+            raise ValueError('Dias da semana vão de 0 (segunda) a 6 (domingo)')
+        return sorted(set(v))
+    
+    @validator('hora_fim')
+    def validate_hora_fim(cls, v, values):
+        if 'hora_inicio' in values and v <= values['hora_inicio']:
+            raise ValueError('Hora final deve ser maior que a inicial')
+        return v
+
+class SlotInterval(BaseModel):
+    inicio: datetime
+    fim: datetime
+
+class BulkSlotsResponse(BaseModel):
+    total_criados: int
+    total_ignorados: int
+    criados: List[ScheduleSlotResponse]
+    # Horários que já se sobrepõem a slots existentes
+    ignorados: List[SlotInterval]
+
+class AvailableSlotResponse(BaseModel):
+    slot_id: UUID
+    inicio: datetime
+    fim: datetime
+    doctor_id: UUID
+    doctor_nome: str
+    especialidade: Optional[str]
+    valor_consulta: Decimal
 
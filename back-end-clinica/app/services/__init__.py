@@ -1,18 +1,30 @@
 
-from app.services.auth_service import AuthService
+from app.services.auth_service import AuthService, AsyncAuthService
 from app.services.user_service import UserService
-from app.services.schedule_service import ScheduleService
-from app.services.appointment_service import AppointmentService
-from app.services.payment_service import PaymentService
+from app.services.schedule_service import ScheduleService, AsyncScheduleService
+from app.services.appointment_service import AppointmentService, AsyncAppointmentService
+from app.services.payment_service import PaymentService, AsyncPaymentService
 from app.services.audit_service import AuditService
+from app.services.revocation_service import RevocationService
+from app.services.report_service import ReportService
+from app.services.dashboard_service import DashboardService
+from app.services.rollup_service import RollupService
 
 __all__ = [
     "AuthService",
+    "AsyncAuthService",
     "UserService",
     "ScheduleService",
+    "AsyncScheduleService",
     "AppointmentService",
+    "AsyncAppointmentService",
     "PaymentService",
-    "AuditService"
+    "AsyncPaymentService",
+    "AuditService",
+    "RevocationService",
+    "ReportService",
+    "DashboardService",
+    "RollupService"
 ]
 
 
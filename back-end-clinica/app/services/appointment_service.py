@@ -1,32 +1,51 @@
 
-from typing import List
+from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import bindparam, func, select, true, update
 from fastapi import HTTPException
 from datetime import datetime
 from app.models.schedule import ScheduleSlot
 from app.models.appointment import Appointment
 from app.core.enums import SlotStatus, AppointmentStatus
 from app.schemas.appointment import AppointmentCreate
+from app.core.pagination import PageParams, paginate, split_page
+from app.services.rollup_service import RollupService, SLOT_COLUMNS, APPOINTMENT_COLUMNS, transition
+from app.services.audit_service import AuditService
+
+def _reserve_statement():
+    """
+    Reserva condicional num único round trip: o UPDATE só pega o slot se estiver LIVRE e não
+    travado por outra reserva em andamento (SKIP LOCKED), então quem perde não espera o lock.
+    Retorna uma linha (id, doctor_id, inicio) se o slot existe; doctor_id vem nulo se não reservou.
+    """
+    slot_id = bindparam("slot_id")
+    livre = select(ScheduleSlot.id).where(
+        ScheduleSlot.id == slot_id,
+        ScheduleSlot.status == SlotStatus.LIVRE
+    ).with_for_update(skip_locked=True).scalar_subquery()
+    reserva = update(ScheduleSlot).where(ScheduleSlot.id == livre).values(
+        status=SlotStatus.RESERVADO
+    ).returning(ScheduleSlot.doctor_id, ScheduleSlot.inicio).cte("reserva")
+    return select(ScheduleSlot.id, reserva.c.doctor_id, reserva.c.inicio).outerjoin(
+        reserva, true()
+    ).where(ScheduleSlot.id == slot_id)
+
+# Montado uma vez: é o caminho mais disputado da API
+_RESERVE_SLOT = _reserve_statement()
 
 class AppointmentService:
     @staticmethod
     def create_appointment(db: Session, patient_id: UUID, data: AppointmentCreate) -> Appointment:
-        # Reserva atômica do slot
-        slot = db.query(ScheduleSlot).filter(
-            ScheduleSlot.id == data.slot_id
-        ).with_for_update().first()
+        slot = db.execute(_RESERVE_SLOT, {"slot_id": data.slot_id}).first()
         
         if not slot:
             raise HTTPException(status_code=404, detail="Slot não encontrado")
         
-        if slot.status != SlotStatus.LIVRE:
+        if slot.doctor_id is None:
             raise HTTPException(status_code=400, detail="Slot não está disponível")
         
-        # Atualiza status do slot
-        slot.status = SlotStatus.RESERVADO
-        
         # Cria consulta
         appointment = Appointment(
             slot_id=data.slot_id,
@@ -35,24 +54,37 @@ class AppointmentService:
             observacoes=data.observacoes
         )
         db.add(appointment)
+        
+        # Totais mensais: slot pelo mês de início, consulta pelo mês de criação (now() da transação)
+        RollupService.apply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, SlotStatus.LIVRE, SlotStatus.RESERVADO))
+        RollupService.apply(db, slot.doctor_id, func.now(), transition(APPOINTMENT_COLUMNS, None, AppointmentStatus.AGENDADA))
         db.commit()
         db.refresh(appointment)
+        AuditService.log_appointment_created(patient_id, appointment.id, slot.doctor_id)
         
         return appointment
     
     @staticmethod
-    def get_appointments_by_patient(db: Session, patient_id: UUID, skip: int = 0, limit: int = 20) -> List[Appointment]:
-        return db.query(Appointment).filter(
-            Appointment.patient_id == patient_id
-        ).offset(skip).limit(limit).all()
+    def get_appointments_by_patient(
+        db: Session, patient_id: UUID, page: PageParams
+    ) -> Tuple[List[Appointment], Optional[str]]:
+        query = db.query(Appointment).filter(Appointment.patient_id == patient_id)
+        return split_page(paginate(query, Appointment, page).all(), page)
     
     @staticmethod
-    def get_appointments_by_doctor(db: Session, doctor_id: UUID, skip: int = 0, limit: int = 20) -> List[Appointment]:
-        return db.query(Appointment).join(
+    def get_appointments_by_doctor(
+        db: Session, doctor_id: UUID, page: PageParams
+    ) -> Tuple[List[Appointment], Optional[str]]:
+        query = db.query(Appointment).join(
             ScheduleSlot, Appointment.slot_id == ScheduleSlot.id
         ).filter(
             ScheduleSlot.doctor_id == doctor_id
-        ).offset(skip).limit(limit).all()
+        )
+        return split_page(paginate(query, Appointment, page).all(), page)
+    
+    @staticmethod
+    def list_appointments(db: Session, page: PageParams) -> Tuple[List[Appointment], Optional[str]]:
+        return split_page(paginate(db.query(Appointment), Appointment, page).all(), page)
     
     @staticmethod
     def update_appointment_status(db: Session, appointment_id: UUID, status: AppointmentStatus) -> Appointment:
@@ -60,16 +92,87 @@ class AppointmentService:
         if not appointment:
             raise HTTPException(status_code=404, detail="Consulta não encontrada")
         
+        slot = appointment.slot
+        status_anterior, slot_status_anterior = appointment.status, slot.status
         appointment.status = status
         
         # Atualiza status do slot se necessário
         if status == AppointmentStatus.REALIZADA:
-            appointment.slot.status = SlotStatus.CONCLUIDO
+            slot.status = SlotStatus.CONCLUIDO
         elif status == AppointmentStatus.CANCELADA:
-            appointment.slot.status = SlotStatus.CANCELADO
+            slot.status = SlotStatus.CANCELADO
         
+        RollupService.apply(db, slot.doctor_id, appointment.created_at, transition(APPOINTMENT_COLUMNS, status_anterior, status))
+        RollupService.apply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, slot_status_anterior, slot.status))
         db.commit()
         db.refresh(appointment)
         return appointment
 
+class AsyncAppointmentService:
+    """Variante assíncrona de AppointmentService (DATABASE_MODE=async)."""
+    
+    @staticmethod
+    async def create_appointment(db: AsyncSession, patient_id: UUID, data: AppointmentCreate) -> Appointment:
+        slot = (await db.execute(_RESERVE_SLOT, {"slot_id": data.slot_id})).first()
+        
+        if not slot:
+            raise HTTPException(status_code=404, detail="Slot não encontrado")
+        
+        if slot.doctor_id is None:
+            raise HTTPException(status_code=400, detail="Slot não está disponível")
+        
+        appointment = Appointment(
+            slot_id=data.slot_id,
+            patient_id=patient_id,
+            status=AppointmentStatus.AGENDADA,
+            observacoes=data.observacoes
+        )
+        db.add(appointment)
+        
+        await RollupService.aapply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, SlotStatus.LIVRE, SlotStatus.RESERVADO))
+        await RollupService.aapply(db, slot.doctor_id, func.now(), transition(APPOINTMENT_COLUMNS, None, AppointmentStatus.AGENDADA))
+        await db.commit()
+        await db.refresh(appointment)
+        AuditService.log_appointment_created(patient_id, appointment.id, slot.doctor_id, block=False)
+        
+        return appointment
+    
+    @staticmethod
+    async def list_appointments(
+        db: AsyncSession,
+        page: PageParams,
+        patient_id: UUID = None,
+        doctor_id: UUID = None
+    ) -> Tuple[List[Appointment], Optional[str]]:
+        query = select(Appointment)
+        if patient_id:
+            query = query.where(Appointment.patient_id == patient_id)
+        if doctor_id:
+            query = query.join(ScheduleSlot, Appointment.slot_id == ScheduleSlot.id).where(
+                ScheduleSlot.doctor_id == doctor_id
+            )
+        result = await db.execute(paginate(query, Appointment, page))
+        return split_page(result.scalars().all(), page)
+    
+    @staticmethod
+    async def update_appointment_status(db: AsyncSession, appointment_id: UUID, status: AppointmentStatus) -> Appointment:
+        appointment = await db.get(Appointment, appointment_id)
+        if not appointment:
+            raise HTTPException(status_code=404, detail="Consulta não encontrada")
+        
+        slot = await db.get(ScheduleSlot, appointment.slot_id)
+        status_anterior, slot_status_anterior = appointment.status, slot.status
+        appointment.status = status
+        
+        # Atualiza status do slot se necessário
+        if status == AppointmentStatus.REALIZADA:
+            slot.status = SlotStatus.CONCLUIDO
+        elif status == AppointmentStatus.CANCELADA:
+            slot.status = SlotStatus.CANCELADO
+        
+        await RollupService.aapply(db, slot.doctor_id, appointment.created_at, transition(APPOINTMENT_COLUMNS, status_anterior, status))
+        await RollupService.aapply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, slot_status_anterior, slot.status))
+        await db.commit()
+        await db.refresh(appointment)
+        return appointment
 
@@ -0,0 +1,178 @@
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import DateTime, column, select, table, text
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.periods import Period, clinic_now, local_month
+
+_PARTITION_NAME = re.compile(r"^audit_logs_p(\d{4})(\d{2})$")
+_ARCHIVE_NAME = re.compile(r"^audit_logs_(\d{4})-(\d{2})(?:\.\d+)?\.ndjson\.gz$")
+_EXPORT_COLUMNS = ("id", "user_id", "acao", "alvo", "payload_json", "created_at")
+
+def partition_name(ano: int, mes: int) -> str:
+    return f"audit_logs_p{ano:04d}{mes:02d}"
+
+def _add_months(ano: int, mes: int, meses: int) -> Tuple[int, int]:
+    indice = ano * 12 + (mes - 1) + meses
+    return indice // 12, indice % 12 + 1
+
+def _archive_dir(directory: Optional[str]) -> Path:
+    return Path(directory or settings.AUDIT_ARCHIVE_DIR)
+
+def archive_files(ano: int, mes: int, directory: Optional[str] = None) -> List[Path]:
+    """Arquivos de um mês: audit_logs_AAAA-MM.ndjson.gz e, se o mês foi arquivado de novo, .2, .3..."""
+    pasta = _archive_dir(directory)
+    if not pasta.is_dir():
+        return []
+    return sorted(pasta.glob(f"audit_logs_{ano:04d}-{mes:02d}*.ndjson.gz"))
+
+def _new_archive_path(ano: int, mes: int, directory: Optional[str]) -> Path:
+    """Nunca sobrescreve um arquivo existente: linhas que chegarem depois ganham outro arquivo."""
+    pasta = _archive_dir(directory)
+    destino = pasta / f"audit_logs_{ano:04d}-{mes:02d}.ndjson.gz"
+    sequencia = 2
+    while destino.exists():
+        destino = pasta / f"audit_logs_{ano:04d}-{mes:02d}.{sequencia}.ndjson.gz"
+        sequencia += 1
+    return destino
+
+def archived_months(directory: Optional[str] = None) -> List[Tuple[int, int]]:
+    """Meses já arquivados, do mais recente para o mais antigo."""
+    pasta = _archive_dir(directory)
+    if not pasta.is_dir():
+        return []
+    meses = [_ARCHIVE_NAME.match(arquivo.name) for arquivo in pasta.iterdir()]
+    return sorted({(int(m.group(1)), int(m.group(2))) for m in meses if m}, reverse=True)
+
+def read_archive(ano: int, mes: int, directory: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Linhas de um mês arquivado. Um arquivamento interrompido entre a exportação e o DROP
+    e refeito depois gera um segundo arquivo com as mesmas linhas: repetidas são ignoradas.
+    """
+    vistos = set()
+    for caminho in archive_files(ano, mes, directory):
+        with gzip.open(caminho, "rt", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                row = json.loads(linha)
+                if row["id"] in vistos:
+                    continue
+                vistos.add(row["id"])
+                yield {
+                    **row,
+                    "id": UUID(row["id"]),
+                    "user_id": UUID(row["user_id"]) if row["user_id"] else None,
+                    "created_at": datetime.fromisoformat(row["created_at"]),
+                }
+
+class AuditRetentionService:
+    @staticmethod
+    def partitions(db: Session) -> List[Tuple[int, int, bool]]:
+        """Partições mensais existentes: (ano, mês, anexada). Desanexadas são restos de um arquivamento interrompido."""
+        rows = db.execute(text(
+            "SELECT relname, relispartition FROM pg_class "
+            "WHERE relkind = 'r' AND relname ~ '^audit_logs_p[0-9]{6}$'"
+        )).all()
+        return sorted(
+            (int(m.group(1)), int(m.group(2)), anexada)
+            for m, anexada in ((_PARTITION_NAME.match(nome), anexada) for nome, anexada in rows)
+        )
+
+    @staticmethod
+    def ensure_partitions(db: Session, meses_a_frente: Optional[int] = None) -> List[str]:
+        """
+        Cria as partições do mês atual até `meses_a_frente` meses adiante e as dos meses que
+        tenham linhas na DEFAULT (ex.: após a conversão da tabela antiga), movendo essas linhas.
+        """
+        if meses_a_frente is None:
+            meses_a_frente = settings.AUDIT_PARTITIONS_AHEAD
+        agora = clinic_now()
+        meses = {_add_months(agora.year, agora.month, i) for i in range(meses_a_frente + 1)}
+        default = table("audit_logs_default", column("created_at", DateTime(timezone=True)))
+        na_default = db.scalars(select(local_month(default.c.created_at)).distinct()).all()
+        meses |= {(mes.year, mes.month) for mes in na_default}
+        existentes = {(ano, mes) for ano, mes, _ in AuditRetentionService.partitions(db)}
+        db.rollback()
+
+        criadas = []
+        for ano, mes in sorted(meses - existentes):
+            AuditRetentionService.create_partition(db, ano, mes)
+            criadas.append(partition_name(ano, mes))
+        return criadas
+
+    @staticmethod
+    def create_partition(db: Session, ano: int, mes: int) -> None:
+        """
+        Cria a partição como tabela comum, move para ela as linhas do mês que estejam na DEFAULT
+        e a anexa. O lock na DEFAULT segura inserções do mês até o ATTACH validar o intervalo.
+        """
+        nome = partition_name(ano, mes)
+        periodo = Period.month(ano, mes)
+        db.execute(text("LOCK TABLE audit_logs_default IN EXCLUSIVE MODE"))
+        db.execute(text(f"CREATE TABLE {nome} (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        db.execute(text(
+            "WITH movidas AS ("
+            "  DELETE FROM audit_logs_default WHERE created_at >= :inicio AND created_at < :fim RETURNING *"
+            f") INSERT INTO {nome} SELECT * FROM movidas"
+        ), {"inicio": periodo.inicio, "fim": periodo.fim})
+        db.execute(text(
+            f"ALTER TABLE audit_logs ATTACH PARTITION {nome} "
+            f"FOR VALUES FROM ('{periodo.inicio.isoformat()}') TO ('{periodo.fim.isoformat()}')"
+        ))
+        db.commit()
+
+    @staticmethod
+    def archive(db: Session, manter_meses: Optional[int] = None, directory: Optional[str] = None) -> List[Tuple[str, int]]:
+        """
+        Arquiva as partições anteriores aos últimos `manter_meses` meses (incluindo o atual):
+        desanexa, exporta para NDJSON gzip, confere a contagem e remove a tabela.
+        Sem DELETE linha a linha. Retorna (partição, linhas) de cada mês arquivado.
+        """
+        if manter_meses is None:
+            manter_meses = settings.AUDIT_RETENTION_MONTHS
+        agora = clinic_now()
+        limite = _add_months(agora.year, agora.month, -(manter_meses - 1))
+
+        arquivadas = []
+        for ano, mes, anexada in AuditRetentionService.partitions(db):
+            if (ano, mes) >= limite:
+                continue
+            nome = partition_name(ano, mes)
+            if anexada:
+                db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {nome}"))
+                db.commit()
+            linhas = AuditRetentionService._export(db, nome, _new_archive_path(ano, mes, directory))
+            total = db.scalar(text(f"SELECT count(*) FROM {nome}"))
+            if linhas != total:
+                raise RuntimeError(f"{nome}: {linhas} linhas exportadas de {total}; partição mantida")
+            db.execute(text(f"DROP TABLE {nome}"))
+            db.commit()
+            arquivadas.append((nome, linhas))
+        return arquivadas
+
+    @staticmethod
+    def _export(db: Session, nome: str, destino: Path) -> int:
+        """Grava a partição em `destino` (via arquivo temporário + rename). Retorna o nº de linhas."""
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        temporario = destino.with_name(destino.name + ".tmp")
+        result = db.execute(
+            text(f"SELECT {', '.join(_EXPORT_COLUMNS)} FROM {nome} ORDER BY created_at DESC, id DESC")
+            .execution_options(yield_per=5000)
+        )
+        linhas = 0
+        with open(temporario, "wb") as bruto:
+            with gzip.open(bruto, "wt", encoding="utf-8") as arquivo:
+                for row in result:
+                    registro = dict(zip(_EXPORT_COLUMNS, row))
+                    registro["created_at"] = registro["created_at"].isoformat()
+                    arquivo.write(json.dumps(registro, default=str, ensure_ascii=False) + "\n")
+                    linhas += 1
+            bruto.flush()
+            os.fsync(bruto.fileno())
+        os.replace(temporario, destino)
+        return linhas
@@ -1,9 +1,76 @@
-
-from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+from functools import partial
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from uuid import UUID
+from sqlalchemy import DateTime, String, cast, column, insert, select, tuple_, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID as PG_UUID
 from sqlalchemy.orm import Session
+from app.config import settings
+from app.core.audit_writer import AuditWriter
+from app.core.pagination import encode_cursor
+from app.core.periods import Period
+from app.database import SessionLocal
 from app.models.audit import AuditLog
-import json
+from app.models.user import User
+from app.services.audit_retention_service import archived_months, read_archive
+
+_COLUMNS = ("user_id", "acao", "alvo", "payload_json", "created_at")
+
+def _batch_statement(events: List[Dict[str, Any]]):
+    """
+    Um INSERT ... SELECT para o lote inteiro. O LEFT JOIN em users zera o user_id de
+    usuários removidos antes da gravação (como o ON DELETE SET NULL), sem derrubar o lote.
+    """
+    linhas = values(
+        column("user_id", PG_UUID(as_uuid=True)),
+        column("acao", String),
+        column("alvo", String),
+        column("payload_json", JSONB),
+        column("created_at", DateTime(timezone=True)),
+        name="eventos"
+    ).data([tuple(event[key] for key in _COLUMNS) for event in events])
+    return insert(AuditLog).from_select(
+        list(_COLUMNS),
+        select(
+            User.id, linhas.c.acao, linhas.c.alvo,
+            # Parâmetros em VALUES chegam sem tipo: o cast evita "text" em colunas jsonb/timestamptz
+            cast(linhas.c.payload_json, JSONB), cast(linhas.c.created_at, DateTime(timezone=True))
+        )
+        # Um lote só com user_id None deixa a coluna sem tipo (text): o cast mantém uuid = uuid
+        .select_from(linhas.outerjoin(User, User.id == cast(linhas.c.user_id, PG_UUID(as_uuid=True))))
+    )
+
+def write_batch(session_factory: Callable[[], Session], events: List[Dict[str, Any]]) -> None:
+    """Grava um lote de eventos numa sessão própria (chamado pela thread do audit_writer)."""
+    db = session_factory()
+    try:
+        db.execute(_batch_statement(events))
+        db.commit()
+    finally:
+        db.close()
+
+def _contains(documento: Any, trecho: Any) -> bool:
+    """Mesma regra do operador jsonb @>, para as linhas lidas dos arquivos."""
+    if isinstance(trecho, dict):
+        return isinstance(documento, dict) and all(
+            chave in documento and _contains(documento[chave], valor) for chave, valor in trecho.items()
+        )
+    if isinstance(trecho, list):
+        if not isinstance(documento, list):
+            return False
+        return all(any(_contains(item, parte) for item in documento) for parte in trecho)
+    # Em jsonb, true não é igual a 1
+    return documento == trecho and isinstance(documento, bool) == isinstance(trecho, bool)
+
+audit_writer = AuditWriter(
+    partial(write_batch, SessionLocal),
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_ms=settings.AUDIT_FLUSH_MS,
+    overflow=settings.AUDIT_OVERFLOW,
+    block_seconds=settings.AUDIT_BLOCK_SECONDS,
+    spill_path=settings.AUDIT_SPILL_PATH,
+)
 
 class AuditService:
     @staticmethod
@@ -14,7 +81,7 @@ class AuditService:
         alvo: Optional[str] = None,
         payload: Optional[Dict[str, Any]] = None
     ) -> AuditLog:
-        """Registra uma ação no log de auditoria."""
+        """Registra uma ação no log de auditoria na hora, na sessão informada."""
         audit_log = AuditLog(
             user_id=user_id,
             acao=acao,
@@ -25,38 +92,136 @@ class AuditService:
         db.commit()
         db.refresh(audit_log)
         return audit_log
-    
+
+    @staticmethod
+    def search(
+        db: Session,
+        periodo: Period = Period(),
+        user_id: Optional[UUID] = None,
+        acao: Optional[str] = None,
+        alvo: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 100,
+        include_archived: bool = True,
+        directory: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Eventos mais recentes primeiro, ordenados por (created_at, id), das partições no banco
+        e (com `include_archived`) dos meses já arquivados. `after` é a posição da última linha
+        da página anterior. `payload` filtra por conteúdo (payload_json @> payload).
+        Os arquivos são lidos do mês mais recente para o mais antigo e só até completar `limit`.
+        """
+        query = select(*[getattr(AuditLog, key) for key in ("id", *_COLUMNS)]).where(*periodo.where(AuditLog.created_at))
+        if user_id is not None:
+            query = query.where(AuditLog.user_id == user_id)
+        if acao is not None:
+            query = query.where(AuditLog.acao == acao)
+        if alvo is not None:
+            query = query.where(AuditLog.alvo == alvo)
+        if payload is not None:
+            query = query.where(AuditLog.payload_json.contains(payload))
+        if after is not None:
+            query = query.where(tuple_(AuditLog.created_at, AuditLog.id) < after)
+        rows = [dict(row._mapping) for row in db.execute(
+            query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).limit(limit)
+        )]
+        if not include_archived:
+            return rows
+
+        arquivadas = []
+        for ano, mes in archived_months(directory):
+            if len(arquivadas) >= limit:
+                break
+            mes_arquivado = Period.month(ano, mes)
+            if (periodo.fim is not None and mes_arquivado.inicio >= periodo.fim) or \
+                    (periodo.inicio is not None and mes_arquivado.fim <= periodo.inicio) or \
+                    (after is not None and mes_arquivado.inicio > after[0]):
+                continue
+            arquivadas.extend(
+                row for row in read_archive(ano, mes, directory)
+                if (periodo.inicio is None or row["created_at"] >= periodo.inicio)
+                and (periodo.fim is None or row["created_at"] < periodo.fim)
+                and (user_id is None or row["user_id"] == user_id)
+                and (acao is None or row["acao"] == acao)
+                and (alvo is None or row["alvo"] == alvo)
+                and (payload is None or _contains(row["payload_json"], payload))
+                and (after is None or (row["created_at"], row["id"]) < after)
+            )
+
+        rows.extend(arquivadas)
+        rows.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+        return rows[:limit]
+
+    @staticmethod
+    def list_events(
+        db: Session,
+        periodo: Period = Period(),
+        user_id: Optional[UUID] = None,
+        acao: Optional[str] = None,
+        alvo: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        after: Optional[Tuple[datetime, UUID]] = None,
+        limit: int = 50,
+        include_archived: bool = False
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Uma página de `search` e o cursor da próxima (None na última)."""
+        rows = AuditService.search(
+            db, periodo, user_id, acao, alvo, payload, after, limit + 1, include_archived
+        )
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"])
+
     @staticmethod
-    def log_user_created(db: Session, admin_id: UUID, new_user_id: UUID, role: str):
+    def record(
+        user_id: Optional[UUID],
+        acao: str,
+        alvo: Optional[str] = None,
+        payload: Optional[Dict[str, Any]] = None,
+        block: bool = True
+    ) -> None:
+        """
+        Registra uma ação sem I/O na requisição: o evento vai para a fila do audit_writer
+        e é gravado em lote em segundo plano. Use nos caminhos quentes; nos serviços
+        assíncronos passe `block=False` (nunca espera por espaço na fila).
+        """
+        audit_writer.submit({
+            "user_id": user_id,
+            "acao": acao,
+            "alvo": alvo,
+            "payload_json": payload,
+            "created_at": datetime.now(timezone.utc)
+        }, block=block)
+
+    @staticmethod
+    def log_user_created(admin_id: Optional[UUID], new_user_id: UUID, role: str):
         """Log de criação de usuário."""
-        return AuditService.log_action(
-            db,
+        AuditService.record(
             user_id=admin_id,
             acao="USER_CREATED",
             alvo=str(new_user_id),
             payload={"role": role}
         )
-    
+
     @staticmethod
-    def log_appointment_created(db: Session, patient_id: UUID, appointment_id: UUID, doctor_id: UUID):
+    def log_appointment_created(patient_id: UUID, appointment_id: UUID, doctor_id: UUID, block: bool = True):
         """Log de criação de consulta."""
-        return AuditService.log_action(
-            db,
+        AuditService.record(
             user_id=patient_id,
             acao="APPOINTMENT_CREATED",
             alvo=str(appointment_id),
-            payload={"doctor_id": str(doctor_id)}
+            payload={"doctor_id": str(doctor_id)},
+            block=block
         )
-    
+
     @staticmethod
-    def log_payment_created(db: Session, patient_id: UUID, payment_id: UUID, valor: float):
+    def log_payment_created(patient_id: UUID, payment_id: UUID, valor: float, block: bool = True):
         """Log de criação de pagamento."""
-        return AuditService.log_action(
-            db,
+        AuditService.record(
             user_id=patient_id,
             acao="PAYMENT_CREATED",
             alvo=str(payment_id),
-            payload={"valor": float(valor)}
+            payload={"valor": float(valor)},
+            block=block
         )
-
-
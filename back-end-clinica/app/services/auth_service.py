@@ -1,10 +1,17 @@
 
 from typing import Tuple, Optional
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.models.profile import PatientProfile, DoctorProfile, AdminProfile
-from app.core.security import verify_password, get_password_hash, create_access_token, create_refresh_token
+from app.core.security import (
+    verify_password, get_password_hash, averify_password, aget_password_hash,
+    needs_rehash, create_access_token, create_refresh_token
+)
+from app.core.hashing import HashingOverloadedError
+from app.core.cache import user_cache
 from app.core.enums import UserRole
 from app.schemas.user import UserCreate
 
@@ -16,6 +23,17 @@ class AuthService:
             return None
         if not verify_password(password, user.password_hash):
             return None
+        
+        # Atualiza de forma transparente hashes com custo diferente do configurado
+        if needs_rehash(user.password_hash):
+            try:
+                user.password_hash = get_password_hash(password)
+            except HashingOverloadedError:
+                # Sem folga no executor: o rehash fica para o próximo login
+                return user
+            db.commit()
+            user_cache.invalidate(str(user.id))
+            db.refresh(user)
         return user
     
     @staticmethod
@@ -56,4 +74,49 @@ class AuthService:
         
         return user
 
+class AsyncAuthService:
+    """Variante assíncrona de AuthService (DATABASE_MODE=async)."""
+    
+    @staticmethod
+    async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
+        result = await db.execute(select(User).where(User.email == email))
+        user = result.scalar_one_or_none()
+        if not user or not user.ativo:
+            return None
+        if not await averify_password(password, user.password_hash):
+            return None
+        
+        if needs_rehash(user.password_hash):
+            try:
+                user.password_hash = await aget_password_hash(password)
+            except HashingOverloadedError:
+                return user
+            await db.commit()
+            user_cache.invalidate(str(user.id))
+        return user
+    
+    @staticmethod
+    async def register_patient(db: AsyncSession, user_data: UserCreate) -> User:
+        if (await db.execute(select(User.id).where(User.email == user_data.email))).first():
+            raise HTTPException(status_code=400, detail="Email já cadastrado")
+        
+        if (await db.execute(select(User.id).where(User.cpf == user_data.cpf))).first():
+            raise HTTPException(status_code=400, detail="CPF já cadastrado")
+        
+        user = User(
+            nome=user_data.nome,
+            email=user_data.email,
+            cpf=user_data.cpf,
+            password_hash=await aget_password_hash(user_data.password),
+            role=UserRole.PACIENTE,
+            ativo=True
+        )
+        db.add(user)
+        await db.flush()
+        
+        db.add(PatientProfile(user_id=user.id))
+        await db.commit()
+        await db.refresh(user)
+        
+        return user
 
@@ -0,0 +1,106 @@
+from typing import Any, Dict, List
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+from sqlalchemy import select, func, literal, true
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models.appointment import Appointment
+from app.models.payment import Payment
+from app.models.schedule import ScheduleSlot
+from app.models.rollup import MonthlyRollup
+from app.core.enums import UserRole, AppointmentStatus
+from app.core.periods import Period
+
+class DashboardService:
+    """KPIs do dashboard: uma única consulta (CTEs de uma linha cada) por papel."""
+
+    @staticmethod
+    def _kpi_statement(role: UserRole, user_id: UUID, mes: Period):
+        if role == UserRole.PACIENTE:
+            consultas = select(func.count().label("total_consultas_mes")).select_from(Appointment).where(
+                Appointment.patient_id == user_id,
+                *mes.where(Appointment.created_at)
+            )
+            faturamento = select(
+                func.coalesce(func.sum(Payment.valor), 0).label("faturamento_mes")
+            ).where(Payment.patient_id == user_id, *mes.where(Payment.created_at))
+            # Paciente não tem ocupação; "usuários ativos" é ele mesmo
+            ocupacao = select(literal(0.0).label("taxa_ocupacao"))
+            usuarios = select(literal(1).label("total_usuarios_ativos"))
+            partes = [consultas.cte("consultas"), faturamento.cte("faturamento"), ocupacao.cte("ocupacao")]
+        else:
+            # Médico e admin: contagens e faturamento vêm dos totais mensais (poucas linhas)
+            def soma(*colunas: str):
+                return func.coalesce(func.sum(sum(getattr(MonthlyRollup, c) for c in colunas)), 0)
+
+            slots_total = soma("slots_livres", "slots_reservados", "slots_concluidos", "slots_cancelados")
+            totais = select(
+                soma("consultas_agendadas", "consultas_realizadas", "consultas_canceladas").label("total_consultas_mes"),
+                soma("faturamento").label("faturamento_mes"),
+                func.coalesce(
+                    (slots_total - soma("slots_livres")) * 100.0 / func.nullif(slots_total, 0), 0.0
+                ).label("taxa_ocupacao")
+            ).where(*mes.where_dates(MonthlyRollup.mes))
+
+            if role == UserRole.MEDICO:
+                totais = totais.where(MonthlyRollup.doctor_id == user_id)
+                # Pacientes distintos já atendidos pelo médico
+                usuarios = select(
+                    func.count(func.distinct(Appointment.patient_id)).label("total_usuarios_ativos")
+                ).join(ScheduleSlot, Appointment.slot_id == ScheduleSlot.id).where(
+                    ScheduleSlot.doctor_id == user_id
+                )
+            else:
+                usuarios = select(func.count().label("total_usuarios_ativos")).select_from(User).where(
+                    User.ativo == True
+                )
+            partes = [totais.cte("totais")]
+
+        partes.append(usuarios.cte("usuarios"))
+        # Cada CTE devolve uma linha: juntá-las (ON true) dá a própria linha de KPIs
+        origem = partes[0]
+        for cte in partes[1:]:
+            origem = origem.join(cte, true())
+        return select(*[coluna for cte in partes for coluna in cte.c]).select_from(origem)
+
+    @staticmethod
+    def get_kpis(db: Session, role: UserRole, user_id: UUID, agora: datetime) -> Dict[str, Any]:
+        row = db.execute(DashboardService._kpi_statement(role, user_id, Period.month_of(agora))).one()
+
+        return {
+            "total_consultas_mes": row.total_consultas_mes,
+            "faturamento_mes": Decimal(str(row.faturamento_mes)),
+            "taxa_ocupacao": round(float(row.taxa_ocupacao), 2),
+            "total_usuarios_ativos": row.total_usuarios_ativos,
+            "proximos_atendimentos": DashboardService.get_next_appointments(db, role, user_id, agora),
+        }
+
+    @staticmethod
+    def get_next_appointments(
+        db: Session, role: UserRole, user_id: UUID, agora: datetime, limit: int = 5
+    ) -> List[Dict[str, Any]]:
+        # Nome da outra parte no mesmo SELECT (sem lazy load por linha)
+        contraparte = User.id == (ScheduleSlot.doctor_id if role == UserRole.PACIENTE else Appointment.patient_id)
+        query = select(Appointment.id, ScheduleSlot.inicio, User.nome).join(
+            ScheduleSlot, Appointment.slot_id == ScheduleSlot.id
+        ).join(User, contraparte).where(
+            ScheduleSlot.inicio >= agora,
+            Appointment.status == AppointmentStatus.AGENDADA
+        )
+
+        if role == UserRole.PACIENTE:
+            query = query.where(Appointment.patient_id == user_id)
+        elif role == UserRole.MEDICO:
+            query = query.where(ScheduleSlot.doctor_id == user_id)
+
+        rows = db.execute(query.order_by(ScheduleSlot.inicio).limit(limit)).all()
+        return [
+            {
+                "id": str(row.id),
+                "data_hora": row.inicio.isoformat(),
+                "paciente": row.nome if role != UserRole.PACIENTE else None,
+                "medico": row.nome if role == UserRole.PACIENTE else None
+            }
+            for row in rows
+        ]
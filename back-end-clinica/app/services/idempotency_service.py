@@ -0,0 +1,264 @@
+import asyncio
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Optional, Type
+from uuid import UUID
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+from sqlalchemy import and_, delete, func, or_, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+def request_fingerprint(rota: str, data: BaseModel) -> str:
+    """Hash de rota + corpo: a mesma chave com outra requisição é rejeitada."""
+    return hashlib.sha256(f"{rota}\n{data.model_dump_json()}".encode()).hexdigest()
+
+def _claim_statement(user_id: UUID, chave: str, request_hash: str):
+    """
+    Reserva a chave para esta requisição. Também retoma chaves expiradas (ainda não varridas)
+    e as da mesma requisição presas em andamento há mais de IDEMPOTENCY_LOCK_SECONDS.
+    Retorna uma linha só se a reserva foi feita.
+    """
+    stmt = pg_insert(IdempotencyKey).values(
+        user_id=user_id,
+        chave=chave,
+        request_hash=request_hash,
+        expires_at=func.now() + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+    )
+    atual = IdempotencyKey.__table__.c
+    return stmt.on_conflict_do_update(
+        index_elements=[atual.user_id, atual.chave],
+        set_={
+            "request_hash": stmt.excluded.request_hash,
+            "status_code": None,
+            "response_body": None,
+            "created_at": func.now(),
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            atual.expires_at < func.now(),
+            and_(
+                atual.status_code.is_(None),
+                atual.request_hash == stmt.excluded.request_hash,
+                atual.created_at < func.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+            )
+        )
+    ).returning(atual.chave)
+
+def _key_filter(user_id: UUID, chave: str):
+    return and_(IdempotencyKey.user_id == user_id, IdempotencyKey.chave == chave)
+
+def _lookup_statement(user_id: UUID, chave: str):
+    return select(
+        IdempotencyKey.request_hash, IdempotencyKey.status_code, IdempotencyKey.response_body
+    ).where(_key_filter(user_id, chave))
+
+def _store_statement(user_id: UUID, chave: str, response: Response):
+    return update(IdempotencyKey).where(_key_filter(user_id, chave)).values(
+        status_code=response.status_code, response_body=response.body
+    )
+
+def _release_statement(user_id: UUID, chave: str):
+    return delete(IdempotencyKey).where(_key_filter(user_id, chave), IdempotencyKey.status_code.is_(None))
+
+def _sweep_statement(batch_size: int):
+    lote = select(IdempotencyKey.user_id, IdempotencyKey.chave).where(
+        IdempotencyKey.expires_at < func.now()
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    return delete(IdempotencyKey).where(
+        tuple_(IdempotencyKey.user_id, IdempotencyKey.chave).in_(lote)
+    ).execution_options(synchronize_session=False)
+
+def _response_for(result: Any, status_code: int, response_model: Type[BaseModel]) -> JSONResponse:
+    return JSONResponse(jsonable_encoder(response_model.model_validate(result)), status_code=status_code)
+
+def _error_response(exc: HTTPException) -> JSONResponse:
+    # Mesmo corpo do handler padrão do FastAPI para HTTPException
+    return JSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers)
+
+def _replay_or_none(row, request_hash: str) -> Optional[Response]:
+    """Resposta guardada da chave; None se não existe ou a primeira requisição ainda está em andamento."""
+    if row is None:
+        return None
+    if row.request_hash != request_hash:
+        raise HTTPException(status_code=422, detail="Idempotency-Key já usada em outra requisição")
+    if row.status_code is None:
+        return None
+    return Response(
+        content=row.response_body,
+        status_code=row.status_code,
+        media_type="application/json",
+        headers={REPLAYED_HEADER: "true"}
+    )
+
+def _timeout() -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail="Requisição com esta Idempotency-Key ainda em andamento",
+        headers={"Retry-After": "1"}
+    )
+
+def _backoff(espera: float) -> float:
+    return min(espera * 2, 0.5)
+
+class IdempotencyService:
+    @staticmethod
+    def run(
+        db: Session,
+        user_id: UUID,
+        chave: Optional[str],
+        request_hash: str,
+        status_code: int,
+        response_model: Type[BaseModel],
+        action: Callable[[], Any]
+    ) -> Any:
+        """
+        Executa `action` uma única vez por (usuário, chave). Retries recebem a primeira
+        resposta (sucesso ou erro 4xx) byte a byte; duplicatas concorrentes aguardam a primeira.
+        Sem chave, apenas executa. Erros 5xx liberam a chave para uma nova tentativa.
+        """
+        if chave is None:
+            return action()
+
+        limite = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        espera = 0.05
+        while True:
+            claimed = db.execute(_claim_statement(user_id, chave, request_hash)).first()
+            db.commit()
+            if claimed:
+                return IdempotencyService._execute(db, user_id, chave, status_code, response_model, action)
+
+            row = db.execute(_lookup_statement(user_id, chave)).first()
+            db.rollback()
+            replay = _replay_or_none(row, request_hash)
+            if replay is not None:
+                return replay
+            if time.monotonic() >= limite:
+                raise _timeout()
+            time.sleep(espera)
+            espera = _backoff(espera)
+
+    @staticmethod
+    def _execute(db, user_id, chave, status_code, response_model, action) -> Response:
+        try:
+            response = _response_for(action(), status_code, response_model)
+        except HTTPException as exc:
+            db.rollback()
+            if exc.status_code >= 500:
+                IdempotencyService._release(db, user_id, chave)
+                raise
+            response = _error_response(exc)
+        except Exception:
+            db.rollback()
+            IdempotencyService._release(db, user_id, chave)
+            raise
+
+        db.execute(_store_statement(user_id, chave, response))
+        db.commit()
+        return response
+
+    @staticmethod
+    def _release(db: Session, user_id: UUID, chave: str) -> None:
+        db.execute(_release_statement(user_id, chave))
+        db.commit()
+
+    @staticmethod
+    def sweep(db: Session, batch_size: Optional[int] = None) -> int:
+        """Apaga chaves expiradas em lotes (uma transação curta por lote). Retorna o total."""
+        batch_size = batch_size or settings.IDEMPOTENCY_SWEEP_BATCH
+        total = 0
+        while True:
+            apagadas = db.execute(_sweep_statement(batch_size)).rowcount
+            db.commit()
+            total += apagadas
+            if apagadas < batch_size:
+                return total
+
+class AsyncIdempotencyService:
+    """Variante assíncrona de IdempotencyService (DATABASE_MODE=async)."""
+
+    @staticmethod
+    async def run(
+        db: AsyncSession,
+        user_id: UUID,
+        chave: Optional[str],
+        request_hash: str,
+        status_code: int,
+        response_model: Type[BaseModel],
+        action: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if chave is None:
+            return await action()
+
+        limite = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        espera = 0.05
+        while True:
+            claimed = (await db.execute(_claim_statement(user_id, chave, request_hash))).first()
+            await db.commit()
+            if claimed:
+                return await AsyncIdempotencyService._execute(db, user_id, chave, status_code, response_model, action)
+
+            row = (await db.execute(_lookup_statement(user_id, chave))).first()
+            await db.rollback()
+            replay = _replay_or_none(row, request_hash)
+            if replay is not None:
+                return replay
+            if time.monotonic() >= limite:
+                raise _timeout()
+            await asyncio.sleep(espera)
+            espera = _backoff(espera)
+
+    @staticmethod
+    async def _execute(db, user_id, chave, status_code, response_model, action) -> Response:
+        try:
+            response = _response_for(await action(), status_code, response_model)
+        except HTTPException as exc:
+            await db.rollback()
+            if exc.status_code >= 500:
+                await AsyncIdempotencyService._release(db, user_id, chave)
+                raise
+            response = _error_response(exc)
+        except Exception:
+            await db.rollback()
+            await AsyncIdempotencyService._release(db, user_id, chave)
+            raise
+
+        await db.execute(_store_statement(user_id, chave, response))
+        await db.commit()
+        return response
+
+    @staticmethod
+    async def _release(db: AsyncSession, user_id: UUID, chave: str) -> None:
+        await db.execute(_release_statement(user_id, chave))
+        await db.commit()
+
+def _sweep_once() -> int:
+    db = SessionLocal()
+    try:
+        return IdempotencyService.sweep(db)
+    finally:
+        db.close()
+
+async def run_sweeper() -> None:
+    """Laço da limpeza periódica de chaves expiradas (iniciado no lifespan da aplicação)."""
+    while True:
+        await asyncio.sleep(settings.IDEMPOTENCY_SWEEP_SECONDS)
+        try:
+            apagadas = await run_in_threadpool(_sweep_once)
+            if apagadas:
+                logger.info("Idempotency-Key: %d chaves expiradas removidas", apagadas)
+        except Exception:
+            logger.exception("Falha na limpeza de chaves de idempotência")
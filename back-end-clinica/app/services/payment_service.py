@@ -1,12 +1,19 @@
 
+from typing import List, Optional, Tuple
 from uuid import UUID
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException
 import random
 from app.models.payment import Payment
 from app.models.appointment import Appointment
+from app.models.schedule import ScheduleSlot
 from app.core.enums import PaymentStatus
 from app.schemas.payment import PaymentCreate
+from app.services.rollup_service import RollupService
+from app.services.audit_service import AuditService
+from app.core.pagination import PageParams, paginate, split_page
 
 class PaymentService:
     @staticmethod
@@ -33,9 +40,54 @@ class PaymentService:
             nsu_fake=nsu
         )
         db.add(payment)
+        RollupService.apply(db, appointment.slot.doctor_id, func.now(), {"pagamentos": 1, "faturamento": data.valor})
         db.commit()
         db.refresh(payment)
+        AuditService.log_payment_created(patient_id, payment.id, data.valor)
         
         return payment
 
+class AsyncPaymentService:
+    """Variante assíncrona de PaymentService (DATABASE_MODE=async)."""
+    
+    @staticmethod
+    async def create_payment(db: AsyncSession, patient_id: UUID, data: PaymentCreate) -> Payment:
+        appointment = await db.get(Appointment, data.appointment_id)
+        if not appointment:
+            raise HTTPException(status_code=404, detail="Consulta não encontrada")
+        
+        existing_payment = (await db.execute(
+            select(Payment.id).where(Payment.appointment_id == data.appointment_id).limit(1)
+        )).first()
+        if existing_payment:
+            raise HTTPException(status_code=400, detail="Esta consulta já possui um pagamento")
+        
+        nsu = f"NSU-{random.randint(100000, 999999)}"
+        
+        payment = Payment(
+            appointment_id=data.appointment_id,
+            patient_id=patient_id,
+            valor=data.valor,
+            status=PaymentStatus.APROVADO,
+            metodo=data.metodo,
+            nsu_fake=nsu
+        )
+        db.add(payment)
+        slot = await db.get(ScheduleSlot, appointment.slot_id)
+        await RollupService.aapply(db, slot.doctor_id, func.now(), {"pagamentos": 1, "faturamento": data.valor})
+        await db.commit()
+        await db.refresh(payment)
+        AuditService.log_payment_created(patient_id, payment.id, data.valor, block=False)
+        
+        return payment
+    
+    @staticmethod
+    async def list_payments(
+        db: AsyncSession, page: PageParams, patient_id: UUID = None
+    ) -> Tuple[List[Payment], Optional[str]]:
+        query = select(Payment)
+        if patient_id:
+            query = query.where(Payment.patient_id == patient_id)
+        result = await db.execute(paginate(query, Payment, page))
+        return split_page(result.scalars().all(), page)
 
@@ -0,0 +1,117 @@
+from typing import Any, Dict, List, Optional
+from datetime import date
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.appointment import Appointment
+from app.models.payment import Payment
+from app.models.schedule import ScheduleSlot
+from app.models.rollup import MonthlyRollup
+from app.core.enums import AppointmentStatus, SlotStatus
+from app.core.periods import Period
+
+def _count_where(condition):
+    return func.count().filter(condition)
+
+class ReportService:
+    """Agregações dos relatórios: o banco devolve apenas contagens e somas."""
+
+    @staticmethod
+    def patient_appointments_summary(
+        db: Session,
+        patient_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        status: Optional[AppointmentStatus] = None
+    ) -> Dict[str, int]:
+        query = db.query(
+            func.count().label("total"),
+            _count_where(Appointment.status == AppointmentStatus.AGENDADA).label("agendadas"),
+            _count_where(Appointment.status == AppointmentStatus.REALIZADA).label("realizadas"),
+            _count_where(Appointment.status == AppointmentStatus.CANCELADA).label("canceladas")
+        ).filter(
+            Appointment.patient_id == patient_id,
+            *Period.days(start_date, end_date).where(Appointment.created_at)
+        )
+
+        if status:
+            query = query.filter(Appointment.status == status)
+
+        return dict(query.one()._mapping)
+
+    @staticmethod
+    def patient_payments_summary(
+        db: Session,
+        patient_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        query = db.query(
+            func.count().label("total"),
+            func.coalesce(func.sum(Payment.valor), 0).label("valor_total")
+        ).filter(
+            Payment.patient_id == patient_id,
+            *Period.days(start_date, end_date).where(Payment.created_at)
+        )
+
+        return dict(query.one()._mapping)
+
+    @staticmethod
+    def doctor_occupancy_summary(
+        db: Session,
+        doctor_id: UUID,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        if not start_date and not end_date:
+            # Sem período: os totais mensais já têm as contagens por status
+            livres, reservados, concluidos, cancelados = (
+                func.coalesce(func.sum(getattr(MonthlyRollup, column)), 0)
+                for column in ("slots_livres", "slots_reservados", "slots_concluidos", "slots_cancelados")
+            )
+            query = db.query(
+                (livres + reservados + concluidos + cancelados).label("total_slots"),
+                livres.label("slots_livres"),
+                reservados.label("slots_reservados"),
+                concluidos.label("slots_concluidos")
+            ).filter(MonthlyRollup.doctor_id == doctor_id)
+        else:
+            query = db.query(
+                func.count().label("total_slots"),
+                _count_where(ScheduleSlot.status == SlotStatus.LIVRE).label("slots_livres"),
+                _count_where(ScheduleSlot.status == SlotStatus.RESERVADO).label("slots_reservados"),
+                _count_where(ScheduleSlot.status == SlotStatus.CONCLUIDO).label("slots_concluidos")
+            ).filter(
+                ScheduleSlot.doctor_id == doctor_id,
+                # Slots que começam no período
+                *Period.days(start_date, end_date).where(ScheduleSlot.inicio)
+            )
+
+        summary = dict(query.one()._mapping)
+        ocupados = summary["slots_reservados"] + summary["slots_concluidos"]
+        summary["taxa_ocupacao"] = (
+            round(ocupados / summary["total_slots"] * 100, 2) if summary["total_slots"] else 0.0
+        )
+        return summary
+
+    @staticmethod
+    def monthly_revenue(db: Session, year: int) -> List[Dict[str, Any]]:
+        # Lê os totais mensais (no máximo 12 linhas por médico), não a tabela de pagamentos
+        rows = db.query(
+            MonthlyRollup.mes,
+            func.sum(MonthlyRollup.pagamentos).label("total"),
+            func.sum(MonthlyRollup.faturamento).label("valor")
+        ).filter(
+            *Period.year(year).where_dates(MonthlyRollup.mes)
+        ).group_by(MonthlyRollup.mes).having(
+            func.sum(MonthlyRollup.pagamentos) > 0
+        ).order_by(MonthlyRollup.mes).all()
+
+        return [
+            {
+                "mes": row.mes.strftime("%Y-%m"),
+                "total_consultas": row.total,
+                "valor_total": row.valor
+            }
+            for row in rows
+        ]
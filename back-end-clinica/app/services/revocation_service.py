@@ -0,0 +1,192 @@
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.config import settings
+from app.core.bloom import BloomFilter
+from app.database import SessionLocal
+from app.models.revoked_token import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+class RevocationList:
+    """
+    Lista de revogação em memória: filtro de Bloom + conjunto exato de `jti`.
+    O caminho comum ("não revogado") é respondido pelo filtro, sem I/O.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._bloom = BloomFilter(settings.REVOCATION_BLOOM_CAPACITY)
+            self._revoked: Dict[str, datetime] = {}
+            self.last_sync = 0.0
+            self.last_rebuild = 0.0
+            self.watermark: Optional[datetime] = None
+            self.bloom_hits = 0
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        with self._lock:
+            if jti not in self._revoked:
+                self._revoked[jti] = expires_at
+                self._bloom.add(jti)
+
+    def contains(self, jti: str) -> bool:
+        if not self._bloom.might_contain(jti):
+            return False
+        with self._lock:
+            self.bloom_hits += 1
+            return jti in self._revoked
+
+    @property
+    def saturated(self) -> bool:
+        """O filtro passou da capacidade: a taxa de falsos positivos começa a subir."""
+        return self._bloom.count > self._bloom.capacity
+
+    def replace(self, entries: Dict[str, datetime], watermark: Optional[datetime]) -> None:
+        """Substitui o conteúdo por um snapshot completo da tabela."""
+        bloom = BloomFilter(max(settings.REVOCATION_BLOOM_CAPACITY, len(entries) * 2))
+        for jti in entries:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._revoked = dict(entries)
+            self.watermark = watermark
+            self.last_rebuild = self.last_sync = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "revoked": len(self._revoked),
+                "bloom_capacity": self._bloom.capacity,
+                "bloom_hits": self.bloom_hits,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+            }
+
+revocation_list = RevocationList()
+
+class RevocationService:
+    @staticmethod
+    def is_revoked(jti: Optional[str]) -> bool:
+        """
+        Verifica se o token foi revogado, só na lista em memória (sem I/O): a carga e a
+        sincronização com a tabela rodam fora das requisições (ver run_revocation_sync).
+        Tokens sem `jti` são anteriores à revogação.
+        """
+        if not jti:
+            return False
+        return revocation_list.contains(jti)
+
+    @staticmethod
+    def sync(db: Session) -> None:
+        """
+        Sincroniza a lista em memória com a tabela: incremental, ou completa (com limpeza
+        dos expirados) a cada REVOCATION_REBUILD_SECONDS ou com o filtro saturado.
+        """
+        rebuild_due = (
+            time.monotonic() - revocation_list.last_rebuild >= settings.REVOCATION_REBUILD_SECONDS
+            or revocation_list.saturated
+        )
+        if rebuild_due:
+            RevocationService.purge_expired(db)
+            RevocationService.rebuild(db)
+        else:
+            RevocationService._pull_new(db)
+
+    @staticmethod
+    def rebuild(db: Session) -> None:
+        """Reconstrói o filtro a partir da tabela, ignorando tokens já expirados."""
+        now = datetime.now(timezone.utc)
+        rows = (
+            db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .filter(RevokedToken.expires_at >= now)
+            .all()
+        )
+        watermark = max((row.revoked_at for row in rows), default=None)
+        revocation_list.replace({row.jti: row.expires_at for row in rows}, watermark)
+
+    @staticmethod
+    def purge_expired(db: Session) -> int:
+        """Remove da tabela os tokens revogados que já expiraram; retorna quantos."""
+        now = datetime.now(timezone.utc)
+        apagados = db.query(RevokedToken).filter(RevokedToken.expires_at < now).delete(synchronize_session=False)
+        db.commit()
+        return apagados
+
+    @staticmethod
+    def _pull_new(db: Session) -> None:
+        query = db.query(RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+        if revocation_list.watermark is not None:
+            # Pequena sobreposição cobre transações que commitaram fora de ordem
+            overlap = timedelta(seconds=settings.REVOCATION_SYNC_SECONDS * 2)
+            query = query.filter(RevokedToken.revoked_at >= revocation_list.watermark - overlap)
+        rows = query.all()
+        for row in rows:
+            revocation_list.add(row.jti, row.expires_at)
+            if revocation_list.watermark is None or row.revoked_at > revocation_list.watermark:
+                revocation_list.watermark = row.revoked_at
+        revocation_list.last_sync = time.monotonic()
+
+    @staticmethod
+    def revoke(db: Session, payload: Dict[str, Any]) -> bool:
+        """
+        Revoga o token descrito pelas claims. Retorna False se ele já estava
+        revogado (ex.: refresh token reutilizado).
+        """
+        jti = payload.get("jti")
+        if not jti:
+            return True
+        expires_at = datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+
+        db.add(RevokedToken(
+            jti=jti,
+            user_id=UUID(payload["sub"]) if payload.get("sub") else None,
+            token_type=payload.get("type", "access"),
+            expires_at=expires_at
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            revocation_list.add(jti, expires_at)
+            return False
+
+        revocation_list.add(jti, expires_at)
+        return True
+
+# Sessões da sincronização em segundo plano (os testes apontam para o banco de teste)
+session_factory = SessionLocal
+
+def load_revocations() -> None:
+    """Carga completa na inicialização do worker, antes de atender requisições."""
+    db = session_factory()
+    try:
+        RevocationService.rebuild(db)
+    finally:
+        db.close()
+
+def _sync_once() -> None:
+    db = session_factory()
+    try:
+        RevocationService.sync(db)
+    finally:
+        db.close()
+
+async def run_revocation_sync() -> None:
+    """Laço da sincronização da lista de revogação (iniciado no lifespan da aplicação)."""
+    while True:
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
+        try:
+            await run_in_threadpool(_sync_once)
+        except Exception:
+            logger.exception("Falha ao sincronizar a lista de tokens revogados")
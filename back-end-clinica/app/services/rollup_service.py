@@ -0,0 +1,107 @@
+from typing import Any, Dict
+from uuid import UUID
+from sqlalchemy import delete, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.models.rollup import MonthlyRollup
+from app.models.schedule import ScheduleSlot
+from app.models.appointment import Appointment
+from app.models.payment import Payment
+from app.core.enums import SlotStatus, AppointmentStatus
+from app.core.periods import local_month
+
+SLOT_COLUMNS = {
+    SlotStatus.LIVRE: "slots_livres",
+    SlotStatus.RESERVADO: "slots_reservados",
+    SlotStatus.CONCLUIDO: "slots_concluidos",
+    SlotStatus.CANCELADO: "slots_cancelados",
+}
+
+APPOINTMENT_COLUMNS = {
+    AppointmentStatus.AGENDADA: "consultas_agendadas",
+    AppointmentStatus.REALIZADA: "consultas_realizadas",
+    AppointmentStatus.CANCELADA: "consultas_canceladas",
+}
+
+COUNTER_COLUMNS = [*SLOT_COLUMNS.values(), *APPOINTMENT_COLUMNS.values(), "pagamentos", "faturamento"]
+
+def transition(columns: Dict[Any, str], old: Any, new: Any) -> Dict[str, int]:
+    """Deltas da mudança de status `old` -> `new` (old=None: criação; new=None: remoção)."""
+    if old == new:
+        return {}
+    deltas = {}
+    if old is not None:
+        deltas[columns[old]] = -1
+    if new is not None:
+        deltas[columns[new]] = 1
+    return deltas
+
+class RollupService:
+    @staticmethod
+    def statement(doctor_id: UUID, ts: Any, deltas: Dict[str, Any]):
+        """UPSERT que soma `deltas` na linha (doctor_id, mês de ts)."""
+        deltas = {column: value for column, value in deltas.items() if value}
+        if not deltas:
+            return None
+        stmt = pg_insert(MonthlyRollup).values(doctor_id=doctor_id, mes=local_month(ts), **deltas)
+        return stmt.on_conflict_do_update(
+            index_elements=[MonthlyRollup.doctor_id, MonthlyRollup.mes],
+            set_={column: getattr(MonthlyRollup, column) + stmt.excluded[column] for column in deltas}
+        )
+
+    @staticmethod
+    def apply(db: Session, doctor_id: UUID, ts: Any, deltas: Dict[str, Any]) -> None:
+        stmt = RollupService.statement(doctor_id, ts, deltas)
+        if stmt is not None:
+            db.execute(stmt)
+
+    @staticmethod
+    async def aapply(db: AsyncSession, doctor_id: UUID, ts: Any, deltas: Dict[str, Any]) -> None:
+        stmt = RollupService.statement(doctor_id, ts, deltas)
+        if stmt is not None:
+            await db.execute(stmt)
+
+    @staticmethod
+    def rebuild(db: Session, commit: bool = True) -> int:
+        """
+        Recalcula todas as linhas a partir das tabelas de origem. O LOCK bloqueia as
+        atualizações incrementais até o commit, para nenhum delta se perder ou duplicar.
+        """
+        db.execute(text("LOCK TABLE monthly_rollups IN EXCLUSIVE MODE"))
+        db.execute(delete(MonthlyRollup))
+
+        def linhas(mes, valores: Dict[str, Any]):
+            colunas = [valores.get(column, literal(0)).label(column) for column in COUNTER_COLUMNS]
+            return select(ScheduleSlot.doctor_id, mes.label("mes"), *colunas)
+
+        slot_mes = local_month(ScheduleSlot.inicio)
+        slots = linhas(slot_mes, {
+            column: func.count().filter(ScheduleSlot.status == status) for status, column in SLOT_COLUMNS.items()
+        }).group_by(ScheduleSlot.doctor_id, slot_mes)
+
+        consulta_mes = local_month(Appointment.created_at)
+        consultas = linhas(consulta_mes, {
+            column: func.count().filter(Appointment.status == status) for status, column in APPOINTMENT_COLUMNS.items()
+        }).select_from(Appointment).join(
+            ScheduleSlot, Appointment.slot_id == ScheduleSlot.id
+        ).group_by(ScheduleSlot.doctor_id, consulta_mes)
+
+        pagamento_mes = local_month(Payment.created_at)
+        pagamentos = linhas(pagamento_mes, {
+            "pagamentos": func.count(), "faturamento": func.sum(Payment.valor)
+        }).select_from(Payment).join(
+            Appointment, Payment.appointment_id == Appointment.id
+        ).join(ScheduleSlot, Appointment.slot_id == ScheduleSlot.id).group_by(ScheduleSlot.doctor_id, pagamento_mes)
+
+        origem = union_all(slots, consultas, pagamentos).subquery("origem")
+        totais = select(
+            origem.c.doctor_id, origem.c.mes, *[func.sum(origem.c[column]) for column in COUNTER_COLUMNS]
+        ).group_by(origem.c.doctor_id, origem.c.mes)
+
+        result = db.execute(
+            MonthlyRollup.__table__.insert().from_select(["doctor_id", "mes", *COUNTER_COLUMNS], totais)
+        )
+        if commit:
+            db.commit()
+        return result.rowcount
@@ -1,29 +1,113 @@
 
-from typing import List
+from bisect import bisect_left
+from itertools import accumulate
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, timedelta
 from app.models.schedule import ScheduleSlot
+from app.models.user import User
+from app.models.profile import DoctorProfile
 from app.core.enums import SlotStatus
-from app.schemas.schedule import ScheduleSlotCreate
+from app.core.periods import clinic_tz
+from app.schemas.schedule import ScheduleSlotCreate, ScheduleSlotResponse, AvailabilityTemplate
+from app.services.rollup_service import RollupService, SLOT_COLUMNS, transition
+
+# Limite de slots gerados por modelo de disponibilidade (uma requisição)
+MAX_SLOTS_POR_MODELO = 5000
+
+# exclusion_violation (ex_slots_doctor_overlap) e unique_violation (ux_slots_doctor_interval)
+_OVERLAP_SQLSTATES = {"23P01", "23505"}
+
+def _is_overlap(exc: IntegrityError) -> bool:
+    return getattr(exc.orig, "pgcode", None) in _OVERLAP_SQLSTATES
+
+def expand_template(template: AvailabilityTemplate) -> List[Tuple[datetime, datetime]]:
+    """Horários (inicio, fim) do modelo, em ordem, no fuso da clínica, pulando as pausas."""
+    tz = clinic_tz()
+    duracao = timedelta(minutes=template.duracao_minutos)
+    passo = duracao + timedelta(minutes=template.intervalo_minutos)
+    intervalos = []
+    dia = template.data_inicio
+    while dia <= template.data_fim:
+        if dia.weekday() in template.dias_semana:
+            # Aritmética no horário de parede; o fuso entra só no fim
+            inicio = datetime.combine(dia, template.hora_inicio)
+            limite = datetime.combine(dia, template.hora_fim)
+            pausas = [(datetime.combine(dia, p.inicio), datetime.combine(dia, p.fim)) for p in template.pausas]
+            while inicio + duracao <= limite:
+                fim = inicio + duracao
+                pausa = next((p for p in pausas if inicio < p[1] and fim > p[0]), None)
+                if pausa:
+                    inicio = pausa[1]
+                    continue
+                intervalos.append((inicio.replace(tzinfo=tz), fim.replace(tzinfo=tz)))
+                if len(intervalos) > MAX_SLOTS_POR_MODELO:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"O modelo gera mais de {MAX_SLOTS_POR_MODELO} slots; divida o período"
+                    )
+                inicio += passo
+        dia += timedelta(days=1)
+    return intervalos
+
+def _overlapping(
+    candidatos: List[Tuple[datetime, datetime]], existentes: List[Tuple[datetime, datetime]]
+) -> set:
+    """Candidatos que se sobrepõem a algum existente (existentes ordenados por início)."""
+    inicios = [inicio for inicio, _ in existentes]
+    # Maior fim entre os existentes que começam até cada posição
+    maior_fim = list(accumulate((fim for _, fim in existentes), max))
+    conflitos = set()
+    for inicio, fim in candidatos:
+        antes = bisect_left(inicios, fim)
+        if antes and maior_fim[antes - 1] > inicio:
+            conflitos.add((inicio, fim))
+    return conflitos
+
+def _available_statement(
+    start: datetime,
+    end: Optional[datetime],
+    especialidade: Optional[str],
+    valor_max: Optional[Decimal],
+    limit: int
+):
+    """
+    Slots LIVRE mais cedo entre todos os médicos ativos. O plano percorre ix_slots_livre_inicio
+    em ordem de início e junta médico/perfil por chave, parando no LIMIT.
+    """
+    query = select(
+        ScheduleSlot.id.label("slot_id"),
+        ScheduleSlot.inicio,
+        ScheduleSlot.fim,
+        User.id.label("doctor_id"),
+        User.nome.label("doctor_nome"),
+        DoctorProfile.especialidade,
+        DoctorProfile.valor_padrao_consulta.label("valor_consulta")
+    ).join(User, User.id == ScheduleSlot.doctor_id).join(
+        DoctorProfile, DoctorProfile.user_id == User.id
+    ).where(
+        ScheduleSlot.status == SlotStatus.LIVRE,
+        ScheduleSlot.inicio >= start,
+        User.ativo == True
+    )
+    if end:
+        query = query.where(ScheduleSlot.inicio < end)
+    if especialidade:
+        query = query.where(func.lower(DoctorProfile.especialidade) == especialidade.lower())
+    if valor_max is not None:
+        query = query.where(DoctorProfile.valor_padrao_consulta <= valor_max)
+    return query.order_by(ScheduleSlot.inicio, ScheduleSlot.id).limit(limit)
 
 class ScheduleService:
     @staticmethod
     def create_slot(db: Session, doctor_id: UUID, data: ScheduleSlotCreate, created_by: UUID) -> ScheduleSlot:
-        # Verifica sobreposição
-        overlapping = db.query(ScheduleSlot).filter(
-            and_(
-                ScheduleSlot.doctor_id == doctor_id,
-                ScheduleSlot.inicio < data.fim,
-                ScheduleSlot.fim > data.inicio
-            )
-        ).first()
-        
-        if overlapping:
-            raise HTTPException(status_code=400, detail="Já existe um slot neste horário")
-        
         slot = ScheduleSlot(
             doctor_id=doctor_id,
             inicio=data.inicio,
@@ -32,6 +116,16 @@ class ScheduleService:
             created_by=created_by
         )
         db.add(slot)
+        try:
+            # Sem SELECT prévio: a constraint ex_slots_doctor_overlap barra a sobreposição,
+            # inclusive entre requisições concorrentes
+            db.flush()
+        except IntegrityError as exc:
+            db.rollback()
+            if _is_overlap(exc):
+                raise HTTPException(status_code=400, detail="Já existe um slot neste horário")
+            raise
+        RollupService.apply(db, doctor_id, data.inicio, transition(SLOT_COLUMNS, None, SlotStatus.LIVRE))
         db.commit()
         db.refresh(slot)
         return slot
@@ -52,6 +146,18 @@ class ScheduleService:
         
         return query.order_by(ScheduleSlot.inicio).all()
     
+    @staticmethod
+    def find_available(
+        db: Session,
+        start: datetime,
+        end: Optional[datetime] = None,
+        especialidade: Optional[str] = None,
+        valor_max: Optional[Decimal] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        rows = db.execute(_available_statement(start, end, especialidade, valor_max, limit)).all()
+        return [dict(row._mapping) for row in rows]
+    
     @staticmethod
     def delete_slot(db: Session, slot_id: UUID) -> None:
         slot = db.query(ScheduleSlot).filter(ScheduleSlot.id == slot_id).first()
@@ -62,6 +168,128 @@ class ScheduleService:
             raise HTTPException(status_code=400, detail="Apenas slots livres podem ser deletados")
         
         db.delete(slot)
+        RollupService.apply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, SlotStatus.LIVRE, None))
         db.commit()
+    
+    @staticmethod
+    def create_slots_from_template(
+        db: Session, doctor_id: UUID, template: AvailabilityTemplate, created_by: UUID
+    ) -> Dict[str, Any]:
+        """
+        Gera os slots de um modelo semanal: uma leitura dos slots existentes na janela,
+        checagem de sobreposição em memória e um único INSERT em lote.
+        """
+        candidatos = expand_template(template)
+        if not candidatos:
+            return {"total_criados": 0, "total_ignorados": 0, "criados": [], "ignorados": []}
+        
+        existentes = db.execute(
+            select(ScheduleSlot.inicio, ScheduleSlot.fim).where(
+                ScheduleSlot.doctor_id == doctor_id,
+                ScheduleSlot.inicio < candidatos[-1][1],
+                ScheduleSlot.fim > candidatos[0][0]
+            ).order_by(ScheduleSlot.inicio)
+        ).all()
+        conflitos = _overlapping(candidatos, [tuple(row) for row in existentes])
+        
+        novos = [
+            {"doctor_id": doctor_id, "inicio": inicio, "fim": fim, "status": SlotStatus.LIVRE, "created_by": created_by}
+            for inicio, fim in candidatos if (inicio, fim) not in conflitos
+        ]
+        criados = []
+        if novos:
+            # executemany com RETURNING (insertmanyvalues: lotes de VALUES em poucos round trips);
+            # ON CONFLICT DO NOTHING (sem alvo) também vale para a constraint de exclusão:
+            # slots sobrepostos criados em paralelo são ignorados, não abortam o lote
+            criados = db.scalars(
+                pg_insert(ScheduleSlot).on_conflict_do_nothing().returning(ScheduleSlot), novos
+            ).all()
+            # Totais mensais: um UPSERT por mês (fuso da clínica) com a contagem do lote
+            por_mes = {}
+            for slot in criados:
+                local = slot.inicio.astimezone(clinic_tz())
+                ts, total = por_mes.get((local.year, local.month), (slot.inicio, 0))
+                por_mes[(local.year, local.month)] = (ts, total + 1)
+            for ts, total in por_mes.values():
+                RollupService.apply(db, doctor_id, ts, {"slots_livres": total})
+        
+        criados_horarios = {(slot.inicio, slot.fim) for slot in criados}
+        resultado = {
+            "total_criados": len(criados),
+            "total_ignorados": len(candidatos) - len(criados),
+            # Serializa antes do commit, que expira os objetos
+            "criados": [ScheduleSlotResponse.model_validate(slot) for slot in criados],
+            "ignorados": [
+                {"inicio": inicio, "fim": fim} for inicio, fim in candidatos if (inicio, fim) not in criados_horarios
+            ],
+        }
+        db.commit()
+        return resultado
 
+class AsyncScheduleService:
+    """Variante assíncrona de ScheduleService (DATABASE_MODE=async)."""
+    
+    @staticmethod
+    async def create_slot(db: AsyncSession, doctor_id: UUID, data: ScheduleSlotCreate, created_by: UUID) -> ScheduleSlot:
+        slot = ScheduleSlot(
+            doctor_id=doctor_id,
+            inicio=data.inicio,
+            fim=data.fim,
+            status=SlotStatus.LIVRE,
+            created_by=created_by
+        )
+        db.add(slot)
+        try:
+            await db.flush()
+        except IntegrityError as exc:
+            await db.rollback()
+            if _is_overlap(exc):
+                raise HTTPException(status_code=400, detail="Já existe um slot neste horário")
+            raise
+        await RollupService.aapply(db, doctor_id, data.inicio, transition(SLOT_COLUMNS, None, SlotStatus.LIVRE))
+        await db.commit()
+        await db.refresh(slot)
+        return slot
+    
+    @staticmethod
+    async def get_doctor_agenda(
+        db: AsyncSession,
+        doctor_id: UUID,
+        start: datetime = None,
+        end: datetime = None
+    ) -> List[ScheduleSlot]:
+        query = select(ScheduleSlot).where(ScheduleSlot.doctor_id == doctor_id)
+        
+        if start:
+            query = query.where(ScheduleSlot.inicio >= start)
+        if end:
+            query = query.where(ScheduleSlot.fim <= end)
+        
+        result = await db.execute(query.order_by(ScheduleSlot.inicio))
+        return list(result.scalars().all())
+    
+    @staticmethod
+    async def find_available(
+        db: AsyncSession,
+        start: datetime,
+        end: Optional[datetime] = None,
+        especialidade: Optional[str] = None,
+        valor_max: Optional[Decimal] = None,
+        limit: int = 20
+    ) -> List[Dict[str, Any]]:
+        result = await db.execute(_available_statement(start, end, especialidade, valor_max, limit))
+        return [dict(row._mapping) for row in result.all()]
+    
+    @staticmethod
+    async def delete_slot(db: AsyncSession, slot_id: UUID) -> None:
+        slot = await db.get(ScheduleSlot, slot_id)
+        if not slot:
+            raise HTTPException(status_code=404, detail="Slot não encontrado")
+        
+        if slot.status != SlotStatus.LIVRE:
+            raise HTTPException(status_code=400, detail="Apenas slots livres podem ser deletados")
+        
+        await db.delete(slot)
+        await RollupService.aapply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, SlotStatus.LIVRE, None))
+        await db.commit()
 
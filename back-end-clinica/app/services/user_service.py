@@ -1,12 +1,14 @@
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from app.models.user import User
 from app.models.profile import DoctorProfile, PatientProfile, AdminProfile
 from app.core.security import get_password_hash, verify_password
+from app.core.cache import user_cache
 from app.core.enums import UserRole
+from app.core.pagination import PageParams, paginate, split_page
 from app.schemas.user import UserCreate, UserUpdate
 
 class UserService:
@@ -52,8 +54,8 @@ class UserService:
         return db.query(User).filter(User.id == user_id).first()
     
     @staticmethod
-    def list_users(db: Session, skip: int = 0, limit: int = 20) -> List[User]:
-        return db.query(User).offset(skip).limit(limit).all()
+    def list_users(db: Session, page: PageParams) -> Tuple[List[User], Optional[str]]:
+        return split_page(paginate(db.query(User), User, page).all(), page)
     
     @staticmethod
     def update_user(db: Session, user_id: UUID, user_data: UserUpdate) -> User:
@@ -71,6 +73,7 @@ class UserService:
             user.ativo = user_data.ativo
         
         db.commit()
+        user_cache.invalidate(str(user_id))
         db.refresh(user)
         return user
     
@@ -81,6 +84,7 @@ class UserService:
             raise HTTPException(status_code=404, detail="Usuário não encontrado")
         db.delete(user)
         db.commit()
+        user_cache.invalidate(str(user_id))
     
     @staticmethod
     def change_password(db: Session, user_id: UUID, old_password: str, new_password: str) -> None:
@@ -93,5 +97,6 @@ class UserService:
         
         user.password_hash = get_password_hash(new_password)
         db.commit()
+        user_cache.invalidate(str(user_id))
 
 
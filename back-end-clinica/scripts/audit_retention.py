@@ -0,0 +1,49 @@
+"""
+Mantém as partições mensais de audit_logs: cria as dos próximos meses e arquiva as antigas.
+
+Meses anteriores a AUDIT_RETENTION_MONTHS são desanexados, exportados para
+AUDIT_ARCHIVE_DIR/audit_logs_AAAA-MM.ndjson.gz e removidos com DROP TABLE, sem
+DELETE linha a linha. Os arquivos continuam legíveis por AuditService.search.
+Agende uma vez por dia (cron) a partir da pasta back-end-clinica:
+
+    python -m scripts.audit_retention                    # cria e arquiva
+    python -m scripts.audit_retention --manter-meses 24  # retenção maior nesta execução
+    python -m scripts.audit_retention --simular          # só lista, não altera nada
+"""
+import argparse
+from app.config import settings
+from app.database import SessionLocal
+from app.services.audit_retention_service import AuditRetentionService, partition_name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cria e arquiva as partições mensais do log de auditoria.")
+    parser.add_argument("--manter-meses", type=int, default=settings.AUDIT_RETENTION_MONTHS,
+                        help="Meses mantidos no banco, incluindo o atual")
+    parser.add_argument("--meses-a-frente", type=int, default=settings.AUDIT_PARTITIONS_AHEAD,
+                        help="Partições criadas antecipadamente")
+    parser.add_argument("--diretorio", default=settings.AUDIT_ARCHIVE_DIR,
+                        help="Pasta dos arquivos NDJSON gzip")
+    parser.add_argument("--simular", action="store_true", help="Lista as partições existentes e sai")
+    args = parser.parse_args()
+    if args.manter_meses < 1:
+        parser.error("--manter-meses deve ser pelo menos 1")
+
+    db = SessionLocal()
+    try:
+        if args.simular:
+            for ano, mes, anexada in AuditRetentionService.partitions(db):
+                print(f"{partition_name(ano, mes)}{'' if anexada else ' (desanexada)'}")
+            return
+
+        for nome in AuditRetentionService.ensure_partitions(db, args.meses_a_frente):
+            print(f"{nome}: criada")
+        for nome, linhas in AuditRetentionService.archive(db, args.manter_meses, args.diretorio):
+            print(f"{nome}: {linhas} linhas arquivadas em {args.diretorio}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Benchmark de GET /audit: latência de uma página em profundidades crescentes, com
+cursor (keyset sobre (created_at, id), como a API) e com OFFSET, para cada filtro.
+
+Gera eventos sintéticos em partições próprias de 2000 (fora do período real),
+dentro de uma transação desfeita ao final; as partições criadas são removidas.
+Requer Postgres. Execute a partir da pasta back-end-clinica:
+
+    python -m scripts.bench_audit --linhas 10000000
+    python -m scripts.bench_audit --linhas 1000000 --profundidades 1 100 10000
+"""
+import argparse
+import statistics
+import time
+from sqlalchemy import select, text
+from app.core.periods import Period
+from app.database import SessionLocal
+from app.models.audit import AuditLog
+from app.services.audit_retention_service import AuditRetentionService, partition_name
+from app.services.audit_service import AuditService
+
+_ANO = 2000
+_ACOES = ["APPOINTMENT_CREATED", "PAYMENT_CREATED", "USER_CREATED", "SLOT_UPDATED", "LOGIN"]
+
+_CRIAR_USUARIOS = text("""
+    INSERT INTO users (nome, email, cpf, password_hash, role, ativo)
+    SELECT 'Bench ' || i, 'bench.audit.' || i || '@bench.local', lpad((90000000000 + i)::text, 11, '0'),
+           'x', 'PACIENTE', true
+    FROM generate_series(1, :usuarios) AS i
+    RETURNING id
+""")
+
+# Eventos do mais novo (g = 0, fim de 2000) para o mais antigo, espalhados pelo ano
+_GERAR_LOTE = text("""
+    INSERT INTO audit_logs (user_id, acao, alvo, payload_json, created_at)
+    SELECT (CAST(:usuarios AS uuid[]))[1 + g % cardinality(CAST(:usuarios AS uuid[]))],
+           (CAST(:acoes AS text[]))[1 + (g / 7) % cardinality(CAST(:acoes AS text[]))],
+           md5(g::text),
+           jsonb_build_object('doctor_id', 'd' || g % 97, 'valor', g % 500),
+           :fim - make_interval(secs => g * :passo)
+    FROM generate_series(:inicio, :fim_lote - 1) AS g
+""")
+
+
+def _tempo_ms(fn, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        fn()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def _gerar(db, linhas, usuarios, lote):
+    ids = [row.id for row in db.execute(_CRIAR_USUARIOS, {"usuarios": usuarios})]
+    fim = Period.year(_ANO).fim
+    passo = 365 * 86400 / linhas
+    for inicio in range(0, linhas, lote):
+        db.execute(_GERAR_LOTE, {
+            "usuarios": [str(id_) for id_ in ids], "acoes": _ACOES, "fim": fim, "passo": passo,
+            "inicio": inicio, "fim_lote": min(inicio + lote, linhas)
+        })
+        print(f"  {min(inicio + lote, linhas)} de {linhas} linhas", flush=True)
+    db.execute(text("ANALYZE audit_logs"))
+    return ids
+
+
+def _pagina(db, filtros, offset, limite):
+    """Página por OFFSET, para comparação (mesmos filtros de AuditService.search)."""
+    query = select(AuditLog.created_at, AuditLog.id)
+    for coluna, valor in filtros.items():
+        if coluna == "payload":
+            query = query.where(AuditLog.payload_json.contains(valor))
+        else:
+            query = query.where(getattr(AuditLog, coluna) == valor)
+    return db.execute(
+        query.order_by(AuditLog.created_at.desc(), AuditLog.id.desc()).offset(offset).limit(limite)
+    ).all()
+
+
+def _cursor(db, filtros, profundidade, limite):
+    """Posição (created_at, id) da última linha da página anterior (fora da medição)."""
+    anterior = _pagina(db, filtros, profundidade * limite - 1, 1)
+    return tuple(anterior[0]) if anterior else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latência por profundidade das páginas de GET /audit.")
+    parser.add_argument("--linhas", type=int, default=10_000_000)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--limite", type=int, default=50, help="Linhas por página")
+    parser.add_argument("--profundidades", type=int, nargs="+", default=[0, 10, 100, 1000, 10000],
+                        help="Páginas puladas antes da medida")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--lote", type=int, default=1_000_000, help="Linhas por INSERT na geração")
+    parser.add_argument("--sem-offset", action="store_true", help="Mede só o cursor (OFFSET profundo é lento)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    criadas = []
+    try:
+        existentes = {(ano, mes) for ano, mes, _ in AuditRetentionService.partitions(db)}
+        db.rollback()
+        for mes in range(1, 13):
+            if (_ANO, mes) not in existentes:
+                AuditRetentionService.create_partition(db, _ANO, mes)
+                criadas.append(partition_name(_ANO, mes))
+
+        print(f"Gerando {args.linhas} eventos de auditoria...")
+        ids = _gerar(db, args.linhas, args.usuarios, args.lote)
+
+        cenarios = {
+            "sem filtro": {},
+            "user_id": {"user_id": ids[0]},
+            "acao": {"acao": "PAYMENT_CREATED"},
+            "payload @>": {"payload": {"doctor_id": "d7"}},
+        }
+        print(f"\n{'filtro':<12} {'página':>8} {'cursor ms':>10} {'offset ms':>10}")
+        for nome, filtros in cenarios.items():
+            for profundidade in args.profundidades:
+                after = _cursor(db, filtros, profundidade, args.limite) if profundidade else None
+                if profundidade and after is None:
+                    print(f"{nome:<12} {profundidade:>8} {'(além do fim)':>21}")
+                    continue
+                cursor_ms = _tempo_ms(lambda: AuditService.search(
+                    db, **filtros, after=after, limit=args.limite, include_archived=False
+                ), args.repeticoes)
+                offset_ms = None if args.sem_offset else _tempo_ms(
+                    lambda: _pagina(db, filtros, profundidade * args.limite, args.limite), args.repeticoes
+                )
+                offset = f"{offset_ms:>10.2f}" if offset_ms is not None else f"{'-':>10}"
+                print(f"{nome:<12} {profundidade:>8} {cursor_ms:>10.2f} {offset}")
+    finally:
+        db.rollback()
+        for nome in criadas:
+            db.execute(text(f"DROP TABLE {nome}"))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
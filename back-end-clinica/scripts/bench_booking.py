@@ -0,0 +1,166 @@
+"""
+Teste de carga da reserva de slots: muitas threads disputando os mesmos
+horários. Compara a reserva atual (UPDATE condicional com SKIP LOCKED, em
+AppointmentService) com a reserva antiga (SELECT ... FOR UPDATE seguido de
+UPDATE) e confere que nenhum slot recebe mais de uma consulta.
+
+Cria um médico, um paciente e os slots de teste, grava de verdade (as threads
+precisam ver os commits umas das outras) e apaga tudo ao final. Requer Postgres.
+
+Execute a partir da pasta back-end-clinica:
+
+    python -m scripts.bench_booking --threads 32 --slots 200 --tentativas 20
+"""
+import argparse
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from app.database import SessionLocal, engine
+from app.models.user import User
+from app.models.schedule import ScheduleSlot
+from app.models.appointment import Appointment
+from app.models.audit import AuditLog
+from app.core.enums import UserRole, SlotStatus, AppointmentStatus
+from app.schemas.appointment import AppointmentCreate
+from app.services.appointment_service import AppointmentService
+from app.services.audit_service import audit_writer
+from app.services.rollup_service import RollupService, SLOT_COLUMNS, APPOINTMENT_COLUMNS, transition
+
+
+def _reservar_for_update(db, patient_id, data: AppointmentCreate):
+    """Reserva como era antes: trava a linha e espera quem chegou primeiro."""
+    slot = db.query(ScheduleSlot).filter(ScheduleSlot.id == data.slot_id).with_for_update().first()
+    if not slot:
+        raise HTTPException(status_code=404, detail="Slot não encontrado")
+    if slot.status != SlotStatus.LIVRE:
+        raise HTTPException(status_code=400, detail="Slot não está disponível")
+    slot.status = SlotStatus.RESERVADO
+    appointment = Appointment(slot_id=slot.id, patient_id=patient_id, status=AppointmentStatus.AGENDADA)
+    db.add(appointment)
+    RollupService.apply(db, slot.doctor_id, slot.inicio, transition(SLOT_COLUMNS, SlotStatus.LIVRE, SlotStatus.RESERVADO))
+    RollupService.apply(db, slot.doctor_id, func.now(), transition(APPOINTMENT_COLUMNS, None, AppointmentStatus.AGENDADA))
+    db.commit()
+    db.refresh(appointment)
+    return appointment
+
+
+MODOS = {
+    "condicional": AppointmentService.create_appointment,
+    "for_update": _reservar_for_update,
+}
+
+
+def _criar_slots(doctor_id, quantidade, rodada):
+    base = datetime(2090, 1, 1, tzinfo=timezone.utc) + timedelta(days=rodada * 365)
+    db = SessionLocal()
+    try:
+        slots = [
+            ScheduleSlot(doctor_id=doctor_id, inicio=base + timedelta(hours=i), fim=base + timedelta(hours=i, minutes=50))
+            for i in range(quantidade)
+        ]
+        db.add_all(slots)
+        db.commit()
+        return [slot.id for slot in slots]
+    finally:
+        db.close()
+
+
+def _rodada(reservar, patient_id, slot_ids, threads, tentativas):
+    latencias = []
+    resultados = {"ok": 0, "ocupado": 0}
+    trava = threading.Lock()
+    barreira = threading.Barrier(threads)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        db = SessionLocal()
+        try:
+            barreira.wait()
+            for _ in range(tentativas):
+                data = AppointmentCreate(slot_id=rng.choice(slot_ids))
+                inicio = time.perf_counter()
+                try:
+                    reservar(db, patient_id, data)
+                    chave = "ok"
+                except HTTPException:
+                    db.rollback()
+                    chave = "ocupado"
+                duracao = time.perf_counter() - inicio
+                with trava:
+                    latencias.append(duracao)
+                    resultados[chave] += 1
+        finally:
+            db.close()
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return resultados, latencias, time.perf_counter() - inicio
+
+
+def _conferir(slot_ids):
+    db = SessionLocal()
+    try:
+        por_slot = db.execute(
+            select(func.count()).select_from(Appointment).where(Appointment.slot_id.in_(slot_ids)).group_by(Appointment.slot_id)
+        ).scalars().all()
+        reservados = db.scalar(
+            select(func.count()).select_from(ScheduleSlot)
+            .where(ScheduleSlot.id.in_(slot_ids), ScheduleSlot.status == SlotStatus.RESERVADO)
+        )
+        return max(por_slot, default=0), sum(por_slot), reservados
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Carga de reservas concorrentes nos mesmos slots.")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--slots", type=int, default=200, help="Slots disputados por rodada")
+    parser.add_argument("--tentativas", type=int, default=20, help="Tentativas de reserva por thread")
+    parser.add_argument("--modos", nargs="+", choices=sorted(MODOS), default=["for_update", "condicional"])
+    args = parser.parse_args()
+
+    if engine.pool.size() < args.threads:
+        print(f"Aviso: pool com {engine.pool.size()} conexões para {args.threads} threads (DB_POOL_SIZE)")
+
+    db = SessionLocal()
+    medico = User(nome="Bench Médico", email="bench.reserva.medico@bench.local", cpf="00000000011",
+                  password_hash="x", role=UserRole.MEDICO, ativo=True)
+    paciente = User(nome="Bench Paciente", email="bench.reserva.paciente@bench.local", cpf="00000000012",
+                    password_hash="x", role=UserRole.PACIENTE, ativo=True)
+    db.add_all([medico, paciente])
+    db.commit()
+    doctor_id, patient_id = medico.id, paciente.id
+
+    try:
+        print(f"{'modo':<12} | {'tentativas':>10} | {'reservas':>8} | {'reservas/s':>10} | {'tentativas/s':>12} | "
+              f"{'p50 (ms)':>8} | {'p95 (ms)':>8} | {'máx/slot':>8}")
+        for rodada, modo in enumerate(args.modos):
+            slot_ids = _criar_slots(doctor_id, args.slots, rodada)
+            resultados, latencias, duracao = _rodada(MODOS[modo], patient_id, slot_ids, args.threads, args.tentativas)
+            maximo, consultas, reservados = _conferir(slot_ids)
+            if maximo > 1 or consultas != reservados or consultas != resultados["ok"]:
+                raise SystemExit(f"{modo}: overbooking ({maximo} por slot, {consultas} consultas, {reservados} reservados)")
+            p50 = statistics.median(latencias) * 1000
+            p95 = statistics.quantiles(latencias, n=20)[-1] * 1000
+            total = len(latencias)
+            print(f"{modo:<12} | {total:>10} | {resultados['ok']:>8} | {resultados['ok'] / duracao:>10.1f} | "
+                  f"{total / duracao:>12.1f} | {p50:>8.1f} | {p95:>8.1f} | {maximo:>8}")
+    finally:
+        audit_writer.flush()
+        db.execute(delete(AuditLog).where(AuditLog.user_id == patient_id))
+        db.execute(delete(Appointment).where(Appointment.patient_id == patient_id))
+        db.execute(delete(ScheduleSlot).where(ScheduleSlot.doctor_id == doctor_id))
+        db.execute(delete(User).where(User.id.in_([doctor_id, patient_id])))
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Compara requisições/s entre DATABASE_MODE=sync e DATABASE_MODE=async com o
+mesmo número de workers do uvicorn. Para cada modo, sobe a API, faz login
+e dispara requisições concorrentes contra uma rota quente.
+
+Execute a partir da pasta back-end-clinica (banco populado, .env configurado):
+
+    python -m scripts.bench_db_mode --email paciente@clinica.com --senha 123456 \\
+        --workers 2 --concorrencia 50 --requisicoes 5000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+import httpx
+
+
+def _esperar_api(base_url: str, timeout: float = 30.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API não respondeu a tempo")
+
+
+async def _carga(base_url: str, rota: str, token: str, concorrencia: int, total: int):
+    latencias = []
+    restantes = iter(range(total))
+    headers = {"Authorization": f"Bearer {token}"}
+    limits = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30.0) as client:
+        async def worker():
+            erros = 0
+            for _ in restantes:
+                inicio = time.perf_counter()
+                resposta = await client.get(rota)
+                latencias.append(time.perf_counter() - inicio)
+                erros += resposta.status_code >= 400
+            return erros
+
+        inicio = time.perf_counter()
+        erros = sum(await asyncio.gather(*(worker() for _ in range(concorrencia))))
+        duracao = time.perf_counter() - inicio
+    return latencias, duracao, erros
+
+
+def medir(modo: str, args) -> dict:
+    base_url = f"http://127.0.0.1:{args.porta}"
+    env = dict(os.environ, DATABASE_MODE=modo)
+    servidor = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.porta),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        _esperar_api(base_url)
+        login = httpx.post(f"{base_url}/api/v1/auth/login", json={"email": args.email, "password": args.senha})
+        login.raise_for_status()
+        token = login.json()["access_token"]
+
+        # Aquecimento (conexões do pool, caches)
+        asyncio.run(_carga(base_url, args.rota, token, args.concorrencia, args.concorrencia * 4))
+        latencias, duracao, erros = asyncio.run(
+            _carga(base_url, args.rota, token, args.concorrencia, args.requisicoes)
+        )
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+    latencias.sort()
+    return {
+        "modo": modo,
+        "req_s": len(latencias) / duracao,
+        "p50_ms": statistics.median(latencias) * 1000,
+        "p99_ms": latencias[int(len(latencias) * 0.99) - 1] * 1000,
+        "erros": erros,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark sync vs. async do acesso ao banco.")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--senha", required=True)
+    parser.add_argument("--rota", default="/api/v1/appointments", help="Rota GET autenticada a ser medida")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--concorrencia", type=int, default=50)
+    parser.add_argument("--requisicoes", type=int, default=5000)
+    parser.add_argument("--porta", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"rota: {args.rota}  workers: {args.workers}  concorrência: {args.concorrencia}")
+    for modo in ("sync", "async"):
+        r = medir(modo, args)
+        print(f"{r['modo']:>5}: {r['req_s']:8.1f} req/s  p50 {r['p50_ms']:7.2f} ms  "
+              f"p99 {r['p99_ms']:7.2f} ms  erros {r['erros']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Microbenchmark de decode_token: validação completa (HMAC + JSON) vs. cache.
+
+Execute a partir da pasta back-end-clinica:
+
+    python -m scripts.bench_decode_token --iteracoes 20000
+"""
+import argparse
+import timeit
+from app.config import settings
+from app.core.cache import token_cache
+from app.core.security import create_access_token, decode_token
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede o custo por requisição de decode_token.")
+    parser.add_argument("--iteracoes", type=int, default=20000)
+    args = parser.parse_args()
+
+    token = create_access_token({"sub": "11111111-1111-1111-1111-111111111111", "role": "ADMIN"})
+
+    def sem_cache():
+        token_cache.clear()
+        decode_token(token)
+
+    # Custo do clear() isolado, descontado da medição sem cache
+    custo_clear = timeit.timeit(token_cache.clear, number=args.iteracoes)
+    tempo_sem_cache = timeit.timeit(sem_cache, number=args.iteracoes) - custo_clear
+
+    token_cache.clear()
+    decode_token(token)
+    tempo_com_cache = timeit.timeit(lambda: decode_token(token), number=args.iteracoes)
+
+    us_sem = tempo_sem_cache / args.iteracoes * 1e6
+    us_com = tempo_com_cache / args.iteracoes * 1e6
+    print(f"algoritmo: {settings.ALGORITHM}  iterações: {args.iteracoes}")
+    print(f"sem cache: {us_sem:8.2f} µs/requisição")
+    print(f"com cache: {us_com:8.2f} µs/requisição")
+    print(f"economia:  {us_sem - us_com:8.2f} µs/requisição ({us_sem / us_com:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark dos relatórios: agregação no Python (carregando todas as linhas,
+como era antes) vs. agregação no banco (ReportService), com volumes crescentes
+de pagamentos e slots sintéticos.
+
+Os dados são gerados com generate_series dentro de uma transação que é
+desfeita ao final: o banco não é alterado. Requer Postgres.
+
+Execute a partir da pasta back-end-clinica:
+
+    python -m scripts.bench_reports --volumes 10000 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.models.payment import Payment
+from app.models.schedule import ScheduleSlot
+from app.core.enums import SlotStatus
+from app.services.report_service import ReportService
+
+_CRIAR_USUARIOS = text("""
+    INSERT INTO users (nome, email, cpf, password_hash, role, ativo)
+    VALUES ('Bench Médico', 'bench.medico@bench.local', '00000000001', 'x', 'MEDICO', true),
+           ('Bench Paciente', 'bench.paciente@bench.local', '00000000002', 'x', 'PACIENTE', true)
+    RETURNING id, role
+""")
+
+# Cada linha da série vira um slot (status alternado) + consulta realizada + pagamento
+_GERAR_LOTE = text("""
+    WITH s AS (
+        INSERT INTO schedule_slots (doctor_id, inicio, fim, status)
+        SELECT :doctor_id,
+               timestamptz '2000-01-01' + g * interval '1 hour',
+               timestamptz '2000-01-01' + g * interval '1 hour' + interval '50 minutes',
+               (ARRAY['LIVRE','RESERVADO','CONCLUIDO']::slot_status[])[1 + g % 3]
+        FROM generate_series(:inicio, :fim - 1) AS g
+        RETURNING id, inicio
+    ), a AS (
+        INSERT INTO appointments (slot_id, patient_id, status, created_at)
+        SELECT id, :patient_id, 'REALIZADA', inicio FROM s
+        RETURNING id, created_at
+    )
+    INSERT INTO payments (appointment_id, patient_id, valor, status, metodo, nsu_fake, created_at)
+    SELECT id, :patient_id, 150.00, 'APROVADO', 'PIX', 'NSU-BENCH', created_at FROM a
+""")
+
+
+def _medir(fn):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = fn()
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracao_ms, pico / 1024 / 1024
+
+
+def _pagamentos_python(db, patient_id):
+    pagamentos = db.query(Payment).filter(Payment.patient_id == patient_id).all()
+    resultado = {"total": len(pagamentos), "valor_total": sum(p.valor for p in pagamentos)}
+    db.expunge_all()
+    return resultado
+
+
+def _ocupacao_python(db, doctor_id):
+    slots = db.query(ScheduleSlot).filter(ScheduleSlot.doctor_id == doctor_id).all()
+    ocupados = sum(1 for s in slots if s.status in (SlotStatus.RESERVADO, SlotStatus.CONCLUIDO))
+    db.expunge_all()
+    return {"total_slots": len(slots), "ocupados": ocupados}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara agregação em Python vs. SQL nos relatórios.")
+    parser.add_argument("--volumes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument(
+        "--sem-python", action="store_true",
+        help="Mede só a agregação SQL (a versão em Python com 1M de linhas usa vários GB de memória)"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        ids = {row.role: row.id for row in db.execute(_CRIAR_USUARIOS)}
+        doctor_id, patient_id = ids["MEDICO"], ids["PACIENTE"]
+
+        gerados = 0
+        print(f"{'linhas':>9} | {'relatório':<10} | {'modo':<6} | {'tempo (ms)':>10} | {'pico memória (MiB)':>18}")
+        for volume in sorted(args.volumes):
+            db.execute(_GERAR_LOTE, {
+                "doctor_id": doctor_id, "patient_id": patient_id, "inicio": gerados, "fim": volume
+            })
+            gerados = volume
+            db.execute(text("ANALYZE schedule_slots; ANALYZE appointments; ANALYZE payments"))
+
+            casos = [
+                ("pagamentos", "sql", lambda: ReportService.patient_payments_summary(db, patient_id)),
+                ("ocupação", "sql", lambda: ReportService.doctor_occupancy_summary(db, doctor_id)),
+            ]
+            if not args.sem_python:
+                casos += [
+                    ("pagamentos", "python", lambda: _pagamentos_python(db, patient_id)),
+                    ("ocupação", "python", lambda: _ocupacao_python(db, doctor_id)),
+                ]
+            for relatorio, modo, fn in casos:
+                _, duracao_ms, pico_mib = _medir(fn)
+                print(f"{volume:>9} | {relatorio:<10} | {modo:<6} | {duracao_ms:>10.1f} | {pico_mib:>18.2f}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
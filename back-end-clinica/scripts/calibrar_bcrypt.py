@@ -0,0 +1,60 @@
+"""
+Calibra o custo do bcrypt para este host.
+
+Mede o tempo de verificação de uma senha para cada custo (rounds) e sugere o
+maior custo cuja mediana fica dentro da latência alvo. Execute a partir da
+pasta back-end-clinica:
+
+    python -m scripts.calibrar_bcrypt --alvo-ms 250
+
+Copie o valor sugerido para BCRYPT_ROUNDS no .env; os hashes existentes são
+atualizados no próximo login de cada usuário.
+"""
+import argparse
+import os
+import statistics
+import time
+from passlib.hash import bcrypt
+
+
+def medir_verificacao(rounds: int, amostras: int) -> float:
+    """Retorna a mediana (ms) de verificação de senha para o custo informado."""
+    senha = "Calibracao@123"
+    hash_ = bcrypt.using(rounds=rounds).hash(senha)
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        bcrypt.verify(senha, hash_)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibra BCRYPT_ROUNDS para a latência alvo de verificação.")
+    parser.add_argument("--alvo-ms", type=float, default=250.0, help="Latência alvo de uma verificação (ms)")
+    parser.add_argument("--min-rounds", type=int, default=10, help="Menor custo aceitável")
+    parser.add_argument("--max-rounds", type=int, default=16, help="Maior custo testado")
+    parser.add_argument("--amostras", type=int, default=5, help="Verificações por custo")
+    args = parser.parse_args()
+
+    nucleos = os.cpu_count() or 1
+    escolhido = args.min_rounds
+
+    print(f"{'rounds':>6} {'mediana_ms':>11} {'login/s/núcleo':>15} {'login/s/host':>13}")
+    for rounds in range(args.min_rounds, args.max_rounds + 1):
+        mediana = medir_verificacao(rounds, args.amostras)
+        por_nucleo = 1000 / mediana if mediana else 0.0
+        print(f"{rounds:>6} {mediana:>11.1f} {por_nucleo:>15.1f} {por_nucleo * nucleos:>13.1f}")
+        if mediana <= args.alvo_ms:
+            escolhido = rounds
+        else:
+            # O custo dobra a cada round: os próximos só ficam mais lentos
+            break
+
+    print()
+    print(f"Sugestão para o .env (alvo {args.alvo_ms:.0f} ms, {nucleos} núcleos):")
+    print(f"BCRYPT_ROUNDS={escolhido}")
+
+
+if __name__ == "__main__":
+    main()
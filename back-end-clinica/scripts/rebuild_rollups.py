@@ -0,0 +1,59 @@
+"""
+Recalcula a tabela monthly_rollups a partir de slots, consultas e pagamentos.
+
+Os totais mensais são mantidos pelos serviços a cada escrita; use este comando
+após cargas feitas direto no banco (scriptPopulaTabelas.sql, importações) ou
+para conferir divergências. Execute a partir da pasta back-end-clinica:
+
+    python -m scripts.rebuild_rollups              # recalcula e grava
+    python -m scripts.rebuild_rollups --verificar  # só compara, não altera nada
+
+As escritas que atualizam os totais aguardam o fim do recálculo (LOCK da tabela).
+"""
+import argparse
+from sqlalchemy import select
+from app.database import SessionLocal
+from app.models.rollup import MonthlyRollup
+from app.services.rollup_service import RollupService, COUNTER_COLUMNS
+
+
+def _snapshot(db):
+    rows = db.execute(select(MonthlyRollup.doctor_id, MonthlyRollup.mes, *[
+        getattr(MonthlyRollup, column) for column in COUNTER_COLUMNS
+    ])).all()
+    return {(row[0], row[1]): tuple(row[2:]) for row in rows}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Recalcula os totais mensais de relatórios e dashboard.")
+    parser.add_argument(
+        "--verificar", action="store_true",
+        help="Compara os totais atuais com o recálculo e desfaz a transação"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        antes = _snapshot(db) if args.verificar else None
+        linhas = RollupService.rebuild(db, commit=not args.verificar)
+        if not args.verificar:
+            print(f"{linhas} linhas (médico, mês) recalculadas")
+            return
+
+        depois = _snapshot(db)
+        divergentes = sorted(
+            chave for chave in antes.keys() | depois.keys()
+            # Linhas zeradas (ex.: slot criado e removido) equivalem a linhas ausentes
+            if any(antes.get(chave, ())) or any(depois.get(chave, ()))
+            if antes.get(chave) != depois.get(chave)
+        )
+        for doctor_id, mes in divergentes:
+            print(f"{doctor_id} {mes:%Y-%m}: atual={antes.get((doctor_id, mes))} recalculado={depois.get((doctor_id, mes))}")
+        print(f"{len(divergentes)} de {len(depois)} linhas divergentes")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
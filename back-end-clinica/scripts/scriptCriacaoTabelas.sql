@@ -1,6 +1,7 @@
 -- Extensões úteis
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS pgcrypto;  -- para crypt() e (em versões antigas) gen_random_uuid()
+CREATE EXTENSION IF NOT EXISTS btree_gist; -- igualdade de UUID em índices GiST (constraint de exclusão)
 
 -- Tipos ENUM
 DO $$ BEGIN
@@ -39,6 +40,12 @@ CREATE TABLE IF NOT EXISTS users (
   updated_at     TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+CREATE INDEX IF NOT EXISTS ix_users_created_at
+  ON users (created_at);
+
+CREATE INDEX IF NOT EXISTS ix_users_role_created_at
+  ON users (role, created_at);
+
 CREATE TRIGGER trg_users_updated_at
 BEFORE UPDATE ON users
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -54,9 +61,18 @@ CREATE TABLE IF NOT EXISTS doctor_profiles (
   crm_crp                 TEXT NOT NULL,
   especialidade           TEXT,
   bio                     TEXT,
-  valor_padrao_consulta   NUMERIC(10,2) NOT NULL DEFAULT 0
+  valor_padrao_consulta   NUMERIC(10,2) NOT NULL DEFAULT 0,
+  updated_at              TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
+-- Versão do perfil público (ETag de GET /doctors/{id}/profile); bancos anteriores ganham a coluna
+ALTER TABLE doctor_profiles ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+DROP TRIGGER IF EXISTS trg_doctor_profiles_updated_at ON doctor_profiles;
+CREATE TRIGGER trg_doctor_profiles_updated_at
+BEFORE UPDATE ON doctor_profiles
+FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
 CREATE TABLE IF NOT EXISTS patient_profiles (
   id               UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
   user_id          UUID NOT NULL UNIQUE REFERENCES users(id) ON DELETE CASCADE,
@@ -81,9 +97,24 @@ CREATE TABLE IF NOT EXISTS schedule_slots (
 CREATE UNIQUE INDEX IF NOT EXISTS ux_slots_doctor_interval
   ON schedule_slots (doctor_id, inicio, fim);
 
+-- Slots do mesmo médico não se sobrepõem ([inicio, fim) semiaberto: encostar é permitido).
+-- O banco garante mesmo com inserções concorrentes; o serviço insere direto e trata a violação
+DO $$ BEGIN
+  ALTER TABLE schedule_slots ADD CONSTRAINT ex_slots_doctor_overlap
+    EXCLUDE USING gist (doctor_id WITH =, tstzrange(inicio, fim) WITH &&);
+EXCEPTION WHEN duplicate_object THEN NULL; END $$;
+
 CREATE INDEX IF NOT EXISTS ix_slots_doctor_inicio
   ON schedule_slots (doctor_id, inicio);
 
+-- KPIs do dashboard (ADMIN) filtram o mês corrente de todos os médicos
+CREATE INDEX IF NOT EXISTS ix_slots_inicio
+  ON schedule_slots (inicio);
+
+-- Próximos horários livres de todos os médicos (GET /agenda/available)
+CREATE INDEX IF NOT EXISTS ix_slots_livre_inicio
+  ON schedule_slots (inicio) WHERE status = 'LIVRE';
+
 CREATE TRIGGER trg_slots_updated_at
 BEFORE UPDATE ON schedule_slots
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -101,6 +132,9 @@ CREATE TABLE IF NOT EXISTS appointments (
 CREATE INDEX IF NOT EXISTS ix_appt_patient
   ON appointments (patient_id, created_at);
 
+CREATE INDEX IF NOT EXISTS ix_appt_created_at
+  ON appointments (created_at);
+
 CREATE TRIGGER trg_appt_updated_at
 BEFORE UPDATE ON appointments
 FOR EACH ROW EXECUTE FUNCTION set_updated_at();
@@ -119,11 +153,109 @@ CREATE TABLE IF NOT EXISTS payments (
 CREATE INDEX IF NOT EXISTS ix_payments_patient_date
   ON payments (patient_id, created_at);
 
+CREATE INDEX IF NOT EXISTS ix_payments_created_at
+  ON payments (created_at);
+
+-- Auditoria particionada por mês de created_at (meia-noite do fuso da clínica).
+-- Partições mensais audit_logs_pAAAAMM: criadas, arquivadas (NDJSON gzip) e removidas
+-- por `python -m scripts.audit_retention`; a DEFAULT recebe o que cair fora delas.
+-- Bancos com a tabela antiga (não particionada) são convertidos abaixo.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'audit_logs' AND relkind = 'r') THEN
+    ALTER TABLE audit_logs RENAME TO audit_logs_legado;
+    ALTER TABLE audit_logs_legado RENAME CONSTRAINT audit_logs_pkey TO audit_logs_legado_pkey;
+  END IF;
+END $$;
+
 CREATE TABLE IF NOT EXISTS audit_logs (
-  id          UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  id          UUID NOT NULL DEFAULT uuid_generate_v4(),
   user_id     UUID REFERENCES users(id) ON DELETE SET NULL,
   acao        TEXT NOT NULL,
   alvo        TEXT,
   payload_json JSONB,
-  created_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+  created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE IF NOT EXISTS audit_logs_default PARTITION OF audit_logs DEFAULT;
+
+-- Um índice por filtro de GET /audit, terminando em (created_at, id): a ordem da
+-- paginação por cursor. Substituem os índices só de created_at e (user_id, created_at).
+DROP INDEX IF EXISTS ix_audit_logs_created_at;
+DROP INDEX IF EXISTS ix_audit_logs_user_created;
+
+CREATE INDEX IF NOT EXISTS ix_audit_logs_created_id
+  ON audit_logs (created_at, id);
+
+CREATE INDEX IF NOT EXISTS ix_audit_logs_user_created_id
+  ON audit_logs (user_id, created_at, id);
+
+CREATE INDEX IF NOT EXISTS ix_audit_logs_acao_created_id
+  ON audit_logs (acao, created_at, id);
+
+CREATE INDEX IF NOT EXISTS ix_audit_logs_alvo_created_id
+  ON audit_logs (alvo, created_at, id);
+
+-- Opcional: filtro por conteúdo do payload (payload_json @> '{...}'). Sem ele o filtro
+-- funciona, mas varre as partições do período; remova se não usar o parâmetro `payload`.
+CREATE INDEX IF NOT EXISTS ix_audit_logs_payload
+  ON audit_logs USING gin (payload_json jsonb_path_ops);
+
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_class WHERE relname = 'audit_logs_legado') THEN
+    -- Vai para a DEFAULT; o audit_retention distribui nas partições mensais
+    INSERT INTO audit_logs (id, user_id, acao, alvo, payload_json, created_at)
+    SELECT id, user_id, acao, alvo, payload_json, created_at FROM audit_logs_legado;
+    DROP TABLE audit_logs_legado;
+  END IF;
+END $$;
+
+-- Tokens revogados (logout e rotação de refresh token), indexados pelo jti do JWT
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+  jti         TEXT PRIMARY KEY,
+  user_id     UUID REFERENCES users(id) ON DELETE CASCADE,
+  token_type  TEXT NOT NULL,
+  expires_at  TIMESTAMPTZ NOT NULL,
+  revoked_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_revoked_tokens_revoked_at
+  ON revoked_tokens (revoked_at);
+
+CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at
+  ON revoked_tokens (expires_at);
+
+-- Respostas de POST /appointments e /payments por Idempotency-Key (por usuário),
+-- repetidas nos retries. status_code nulo = em andamento. Expiradas são apagadas em lotes
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+  user_id        UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  chave          VARCHAR(255) NOT NULL,
+  request_hash   VARCHAR(64) NOT NULL,
+  status_code    INT,
+  response_body  BYTEA,
+  created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+  expires_at     TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (user_id, chave)
+);
+
+CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at
+  ON idempotency_keys (expires_at);
+
+-- Totais por (médico, mês) para relatórios e dashboard, mantidos pelos serviços
+-- na mesma transação das escritas. Recalcule com: python -m scripts.rebuild_rollups
+CREATE TABLE IF NOT EXISTS monthly_rollups (
+  doctor_id            UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+  mes                  DATE NOT NULL,
+  slots_livres         INT NOT NULL DEFAULT 0,
+  slots_reservados     INT NOT NULL DEFAULT 0,
+  slots_concluidos     INT NOT NULL DEFAULT 0,
+  slots_cancelados     INT NOT NULL DEFAULT 0,
+  consultas_agendadas  INT NOT NULL DEFAULT 0,
+  consultas_realizadas INT NOT NULL DEFAULT 0,
+  consultas_canceladas INT NOT NULL DEFAULT 0,
+  pagamentos           INT NOT NULL DEFAULT 0,
+  faturamento          NUMERIC(12,2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (doctor_id, mes)
 );
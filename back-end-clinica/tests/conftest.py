@@ -1,11 +1,18 @@
 
 import pytest
+from contextlib import contextmanager
+from functools import partial
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_read_db
 from app.core.security import get_password_hash
+from app.core.cache import user_cache, token_cache
+from app.core.query_stats import capture_queries
+from app.services import revocation_service
+from app.services.revocation_service import revocation_list
+from app.services.audit_service import audit_writer, write_batch
 from app.models.user import User
 from app.models.profile import PatientProfile, DoctorProfile
 from app.core.enums import UserRole
@@ -14,6 +21,10 @@ from app.core.enums import UserRole
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Eventos de auditoria gravados em lote no banco de teste
+audit_writer.write_batch = partial(write_batch, TestingSessionLocal)
+# Carga e sincronização da lista de revogação também no banco de teste
+revocation_service.session_factory = TestingSessionLocal
 
 @pytest.fixture(scope="function")
 def db():
@@ -23,8 +34,36 @@ def db():
         yield db
     finally:
         db.close()
+        audit_writer.flush()
         Base.metadata.drop_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    user_cache.clear()
+    token_cache.clear()
+    revocation_list.clear()
+    yield
+    user_cache.clear()
+    token_cache.clear()
+    revocation_list.clear()
+
+@pytest.fixture
+def query_budget():
+    """
+    Limite de statements SQL para um trecho do teste:
+
+        with query_budget(3):
+            client.get(...)
+    """
+    @contextmanager
+    def _budget(max_queries: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} queries executadas (limite {max_queries}):\n{stats.report()}"
+        )
+    return _budget
+
 @pytest.fixture(scope="function")
 def client(db):
     def override_get_db():
@@ -34,6 +73,7 @@ def client(db):
             db.close()
     
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     with TestClient(app) as test_client:
         yield test_client
 
@@ -1,5 +1,6 @@
 
 from datetime import datetime, timedelta
+import pytest
 
 def test_create_appointment_atomic(client, test_patient, test_doctor, db):
     # Cria um slot
@@ -37,3 +38,58 @@ def test_create_appointment_atomic(client, test_patient, test_doctor, db):
     assert slot.status == SlotStatus.RESERVADO
 
 
+
+def test_concurrent_booking_never_overbooks(db, test_doctor, test_patient):
+    """Carga de reservas concorrentes em poucos slots: no máximo uma consulta por slot."""
+    import random
+    from concurrent.futures import ThreadPoolExecutor
+    from fastapi import HTTPException
+    from sqlalchemy import func, select
+    from tests.conftest import TestingSessionLocal
+    from app.models.schedule import ScheduleSlot
+    from app.models.appointment import Appointment
+    from app.core.enums import SlotStatus
+    from app.schemas.appointment import AppointmentCreate
+    from app.services.appointment_service import AppointmentService
+
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("Concorrência real depende do Postgres")
+
+    base = datetime(2030, 7, 1, 12)
+    slots = [
+        ScheduleSlot(doctor_id=test_doctor.id, inicio=base + timedelta(hours=i), fim=base + timedelta(hours=i, minutes=50))
+        for i in range(5)
+    ]
+    db.add_all(slots)
+    db.commit()
+    slot_ids = [slot.id for slot in slots]
+    patient_id = test_patient.id
+
+    def reservar(seed):
+        session = TestingSessionLocal()
+        resultados = []
+        try:
+            for slot_id in random.Random(seed).sample(slot_ids, len(slot_ids)):
+                try:
+                    AppointmentService.create_appointment(session, patient_id, AppointmentCreate(slot_id=slot_id))
+                    resultados.append(201)
+                except HTTPException as exc:
+                    session.rollback()
+                    resultados.append(exc.status_code)
+        finally:
+            session.close()
+        return resultados
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        resultados = [r for lote in pool.map(reservar, range(16)) for r in lote]
+
+    assert resultados.count(201) == len(slot_ids)
+    assert set(resultados) == {201, 400}
+
+    db.expire_all()
+    por_slot = db.execute(
+        select(Appointment.slot_id, func.count()).group_by(Appointment.slot_id)
+    ).all()
+    assert sorted(count for _, count in por_slot) == [1] * len(slot_ids)
+    reservados = db.scalar(select(func.count()).select_from(ScheduleSlot).where(ScheduleSlot.status == SlotStatus.RESERVADO))
+    assert reservados == len(slot_ids)
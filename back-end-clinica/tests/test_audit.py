@@ -0,0 +1,235 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+def _writer(write_batch, **options):
+    from app.core.audit_writer import AuditWriter
+
+    defaults = dict(max_queue=1000, batch_size=500, flush_ms=50, overflow="drop", spill_path=None)
+    return AuditWriter(write_batch, **{**defaults, **options})
+
+def _event(i):
+    return {"user_id": None, "acao": "TESTE", "alvo": str(i), "payload_json": None, "created_at": datetime.now(timezone.utc)}
+
+def test_writer_batches_and_flushes_on_stop():
+    """Eventos saem em lotes de até batch_size; stop grava o que ficou na fila."""
+    lotes = []
+    writer = _writer(lambda events: lotes.append(len(events)), max_queue=5000, flush_ms=1000)
+
+    for i in range(1200):
+        writer.submit(_event(i))
+    writer.stop()
+
+    assert sum(lotes) == 1200
+    assert max(lotes) <= 500 and len(lotes) <= 4
+    stats = writer.stats()
+    assert stats["written"] == 1200 and stats["queue_depth"] == 0 and stats["dropped"] == 0
+
+def test_writer_overflow_drop_and_spill(tmp_path):
+    """Fila cheia: "drop" descarta; "spill" vai para o arquivo e é regravado quando a fila esvazia."""
+    for overflow in ("drop", "spill"):
+        gravados = []
+        liberado, ocupado = threading.Event(), threading.Event()
+
+        def write_batch(events):
+            ocupado.set()
+            liberado.wait(5)
+            gravados.extend(event["alvo"] for event in events)
+
+        spill_path = str(tmp_path / f"{overflow}.jsonl")
+        writer = _writer(write_batch, max_queue=2, batch_size=1, overflow=overflow, spill_path=spill_path)
+        writer.submit(_event(0))
+        assert ocupado.wait(5)  # a thread está presa gravando o primeiro evento
+        for i in range(1, 6):
+            writer.submit(_event(i))
+        liberado.set()
+        assert writer.flush()
+
+        if overflow == "drop":
+            assert writer.stats()["dropped"] == 3
+            assert sorted(gravados) == ["0", "1", "2"]
+        else:
+            assert writer.stats()["spilled"] == 3
+            limite = time.monotonic() + 5
+            while len(gravados) < 6 and time.monotonic() < limite:
+                time.sleep(0.05)
+            assert sorted(gravados) == ["0", "1", "2", "3", "4", "5"]
+        writer.stop()
+
+def test_booking_audit_event_written_in_background(client, db, test_patient, test_doctor):
+    from sqlalchemy import select
+    from app.models.audit import AuditLog
+    from app.models.schedule import ScheduleSlot
+    from app.services.audit_service import audit_writer
+
+    inicio = datetime(2030, 9, 2, 12, tzinfo=timezone.utc)
+    slot = ScheduleSlot(doctor_id=test_doctor.id, inicio=inicio, fim=inicio + timedelta(minutes=50))
+    db.add(slot)
+    db.commit()
+    slot_id, patient_id = slot.id, test_patient.id
+
+    token = client.post("/api/v1/auth/login", json={"email": "paciente@test.com", "password": "Test@123"}).json()["access_token"]
+    response = client.post("/api/v1/appointments", json={"slot_id": str(slot_id)}, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 201
+
+    assert audit_writer.flush()
+    log = db.execute(select(AuditLog.user_id, AuditLog.acao, AuditLog.alvo)).one()
+    assert tuple(log) == (patient_id, "APPOINTMENT_CREATED", response.json()["id"])
+
+def test_retention_archives_old_partitions_and_search_reads_both(db, tmp_path):
+    import pytest
+    from sqlalchemy import text
+    from app.core.periods import Period, clinic_now
+    from app.models.audit import AuditLog
+    from app.services.audit_retention_service import AuditRetentionService, archived_months, partition_name
+    from app.services.audit_service import AuditService
+
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("Particionamento depende do Postgres")
+
+    agora = clinic_now()
+    antigo = Period.month(agora.year - 2, agora.month).inicio + timedelta(days=3)
+    db.add_all([AuditLog(acao="ANTIGO", alvo=str(i), created_at=antigo + timedelta(minutes=i)) for i in range(3)])
+    db.add(AuditLog(acao="RECENTE", alvo="0", created_at=agora))
+    db.commit()
+
+    # As linhas caíram na DEFAULT; ensure_partitions cria o mês delas e as move
+    criadas = AuditRetentionService.ensure_partitions(db, meses_a_frente=1)
+    assert partition_name(antigo.year, antigo.month) in criadas
+    assert partition_name(agora.year, agora.month) in criadas
+    assert db.scalar(text("SELECT count(*) FROM audit_logs_default")) == 0
+    db.rollback()
+
+    arquivadas = AuditRetentionService.archive(db, manter_meses=1, directory=str(tmp_path))
+    assert arquivadas == [(partition_name(antigo.year, antigo.month), 3)]
+    assert archived_months(str(tmp_path)) == [(antigo.year, antigo.month)]
+    assert (antigo.year, antigo.month) not in {(a, m) for a, m, _ in AuditRetentionService.partitions(db)}
+    assert db.scalar(text("SELECT count(*) FROM audit_logs")) == 1
+
+    eventos = AuditService.search(db, limit=10, directory=str(tmp_path))
+    assert [(e["acao"], e["alvo"]) for e in eventos] == [("RECENTE", "0"), ("ANTIGO", "2"), ("ANTIGO", "1"), ("ANTIGO", "0")]
+    assert eventos[1]["created_at"] == antigo + timedelta(minutes=2)
+    assert len(AuditService.search(db, Period.month(antigo.year, antigo.month), acao="ANTIGO", limit=2, directory=str(tmp_path))) == 2
+
+def test_audit_endpoint_filters_and_walks_pages_by_cursor(client, db, test_patient):
+    from app.core.enums import UserRole
+    from app.core.security import get_password_hash
+    from app.models.audit import AuditLog
+    from app.models.user import User
+
+    db.add(User(nome="Admin", email="admin@test.com", cpf="33333333333",
+                password_hash=get_password_hash("Test@123"), role=UserRole.ADMIN, ativo=True))
+    base = datetime(2030, 3, 10, 12, tzinfo=timezone.utc)
+    patient_id = test_patient.id
+    # Pares com o mesmo created_at: o desempate é pelo id
+    db.add_all([
+        AuditLog(user_id=patient_id, acao="APPOINTMENT_CREATED", alvo=f"a{i}",
+                 payload_json={"doctor_id": f"d{i % 2}"}, created_at=base + timedelta(minutes=i // 2))
+        for i in range(7)
+    ])
+    db.add(AuditLog(acao="USER_CREATED", alvo="u0", payload_json={"role": "MEDICO"}, created_at=base))
+    db.commit()
+
+    login = lambda email: client.post("/api/v1/auth/login", json={"email": email, "password": "Test@123"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {login('admin@test.com')}"}
+    assert client.get("/api/v1/audit", headers={"Authorization": f"Bearer {login('paciente@test.com')}"}).status_code == 403
+
+    seen, params = [], {"user_id": str(patient_id), "limit": 3}
+    while True:
+        response = client.get("/api/v1/audit", params=params, headers=headers)
+        assert response.status_code == 200
+        seen += [event["alvo"] for event in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params = {**params, "cursor": cursor}
+    assert sorted(seen) == [f"a{i}" for i in range(7)] and len(set(seen)) == 7
+    assert seen[0] == "a6"
+
+    get = lambda **params: [e["alvo"] for e in client.get("/api/v1/audit", params=params, headers=headers).json()]
+    assert get(acao="USER_CREATED") == ["u0"]
+    assert get(alvo="a3") == ["a3"]
+    assert sorted(get(payload='{"doctor_id": "d1"}')) == ["a1", "a3", "a5"]
+    assert get(start_date="2030-03-11") == []
+    assert client.get("/api/v1/audit", params={"payload": "[1]"}, headers=headers).status_code == 400
+
+def test_writer_thread_survives_unexpected_errors(monkeypatch):
+    """Um erro fora do write_batch não mata a thread: o que está na fila ainda é gravado."""
+    gravados = []
+    writer = _writer(lambda events: gravados.extend(event["alvo"] for event in events), flush_ms=20)
+    next_batch, falhas = writer._next_batch, []
+
+    def next_batch_com_falha():
+        if not falhas:
+            falhas.append(1)
+            raise RuntimeError("falha inesperada")
+        return next_batch()
+
+    monkeypatch.setattr(writer, "_next_batch", next_batch_com_falha)
+    writer.submit(_event(0))
+    assert writer.flush()
+    writer.stop()
+    assert falhas and gravados == ["0"]
+
+def test_spill_replay_runs_once_and_resumes_after_partial_failure(tmp_path):
+    """Dois writers no mesmo arquivo não regravam os mesmos eventos; lote que falha não repete os anteriores."""
+    import json
+
+    spill_path = str(tmp_path / "spill.jsonl")
+    with open(spill_path, "w", encoding="utf-8") as spill:
+        for i in range(5):
+            spill.write(json.dumps(_event(i), default=str) + "\n")
+
+    gravados, chamadas, lento = [], [], threading.Event()
+
+    def write_batch(events):
+        chamadas.append(len(events))
+        if len(chamadas) == 2:
+            raise RuntimeError("banco indisponível")
+        lento.wait(0.2)  # segura o primeiro writer dentro da regravação
+        gravados.extend(event["alvo"] for event in events)
+
+    writers = [_writer(write_batch, batch_size=2, spill_path=spill_path) for _ in range(2)]
+    threads = [threading.Thread(target=writer._replay_spill) for writer in writers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert gravados == ["0", "1"]  # o segundo lote falhou e só um writer regravou
+
+    writers[0]._replay_spill()
+    assert gravados == ["0", "1", "2", "3", "4"]
+    assert not (tmp_path / "spill.jsonl.replay").exists()
+
+def test_nonblocking_submit_spills_instead_of_waiting(tmp_path):
+    """Modo "block" com block=False (serviços assíncronos): fila cheia transborda na hora, sem esperar."""
+    liberado, ocupado = threading.Event(), threading.Event()
+
+    def write_batch(events):
+        ocupado.set()
+        liberado.wait(5)
+
+    writer = _writer(write_batch, max_queue=1, batch_size=1, overflow="block", block_seconds=5,
+                     spill_path=str(tmp_path / "spill.jsonl"))
+    writer.submit(_event(0))
+    assert ocupado.wait(5)
+    writer.submit(_event(1))  # ocupa a fila
+
+    inicio = time.monotonic()
+    writer.submit(_event(2), block=False)
+    assert time.monotonic() - inicio < 1
+    assert writer.stats()["spilled"] == 1
+    liberado.set()
+    writer.stop()
+
+def test_write_batch_accepts_events_without_user(db):
+    """Lote só com eventos de sistema (user_id None): a coluna do VALUES continua uuid."""
+    from functools import partial
+    from sqlalchemy import select
+    from app.models.audit import AuditLog
+    from app.services.audit_service import write_batch
+    from tests.conftest import TestingSessionLocal
+
+    partial(write_batch, TestingSessionLocal)([_event(0), _event(1)])
+    assert sorted(db.scalars(select(AuditLog.alvo)).all()) == ["0", "1"]
+    assert db.scalars(select(AuditLog.user_id)).all() == [None, None]
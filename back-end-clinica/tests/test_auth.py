@@ -37,3 +37,136 @@ def test_login_wrong_password(client, test_patient):
     assert response.status_code == 401
 
 
+
+def test_current_user_cache_and_invalidation(client, test_patient, db):
+    from app.core.cache import user_cache
+    from app.services.user_service import UserService
+    from app.schemas.user import UserUpdate
+    
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+    assert user_cache.stats()["hits"] >= 1
+    
+    # Desativar o usuário invalida o cache: o token deixa de ser aceito
+    UserService.update_user(db, test_patient.id, UserUpdate(ativo=False))
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+
+def test_login_rejected_when_hash_executor_overloaded(client, test_patient, monkeypatch):
+    import threading
+    from app.core.hashing import hash_executor
+    
+    # Simula o executor de bcrypt sem vagas (workers e fila ocupados)
+    full = threading.BoundedSemaphore(1)
+    full.acquire()
+    monkeypatch.setattr(hash_executor, "_slots", full)
+    
+    response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert hash_executor.stats()["rejected"] >= 1
+
+def test_login_rehashes_outdated_bcrypt_cost(client, test_patient, db):
+    from passlib.hash import bcrypt
+    from app.config import settings
+    from app.models.user import User
+    
+    # Hash com custo 4 e prefixo $2a$, como o gen_salt('bf') do pgcrypto
+    test_patient.password_hash = bcrypt.using(rounds=4, ident="2a").hash("Test@123")
+    db.commit()
+    
+    response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    assert response.status_code == 200
+    
+    user = db.query(User).filter(User.email == "paciente@test.com").first()
+    assert bcrypt.from_string(user.password_hash).rounds == settings.BCRYPT_ROUNDS
+    assert bcrypt.verify("Test@123", user.password_hash)
+
+def test_logout_revokes_access_token(client, test_patient):
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    
+    assert client.post("/api/v1/auth/logout", headers=headers).status_code == 204
+    
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revogado"
+
+def test_refresh_token_rotation(client, test_patient):
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    old_refresh = login_response.json()["refresh_token"]
+    
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": old_refresh})
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != old_refresh
+    
+    # Reutilizar o refresh token antigo é recusado
+    response = client.post("/api/v1/auth/refresh", json={"refresh_token": old_refresh})
+    assert response.status_code == 401
+
+def test_revocation_from_other_worker_applies_after_sync(client, db, test_patient):
+    """A requisição só consulta a memória; a revogação de outro worker chega pela sincronização."""
+    from datetime import datetime, timedelta, timezone
+    from app.core.security import decode_token
+    from app.models.revoked_token import RevokedToken
+    from app.services.revocation_service import _sync_once, revocation_list
+
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    token = login_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    payload = decode_token(token)
+
+    agora = datetime.now(timezone.utc)
+    db.add_all([
+        RevokedToken(
+            jti=payload["jti"], user_id=test_patient.id, token_type="access",
+            expires_at=datetime.fromtimestamp(payload["exp"], tz=timezone.utc)
+        ),
+        RevokedToken(jti="expirado", token_type="access", expires_at=agora - timedelta(minutes=1)),
+    ])
+    db.commit()
+    assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+    _sync_once()
+    response = client.get("/api/v1/auth/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revogado"
+
+    # A reconstrução completa (em segundo plano) remove os expirados da tabela
+    revocation_list.last_rebuild = 0.0
+    _sync_once()
+    db.expire_all()
+    assert db.query(RevokedToken).filter(RevokedToken.jti == "expirado").first() is None
+    assert revocation_list.contains(payload["jti"])
+
+def test_decode_token_cache():
+    from app.core.cache import token_cache
+    from app.core.security import create_access_token, decode_token
+    
+    token = create_access_token({"sub": "11111111-1111-1111-1111-111111111111", "role": "ADMIN"})
+    assert decode_token(token) == decode_token(token)
+    assert token_cache.stats()["hits"] == 1
+    
+    # Token adulterado não aproveita o cache e segue inválido
+    assert decode_token(token[:-2] + "xx") is None
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from app.services.rollup_service import RollupService
+
+def _login(client, email):
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": "Test@123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_dashboard_kpis_by_role(client, test_patient, test_doctor, db, query_budget):
+    """KPIs por papel: uma consulta de KPIs + uma para os próximos atendimentos."""
+    from app.models.schedule import ScheduleSlot
+    from app.models.appointment import Appointment
+    from app.models.payment import Payment
+    from app.core.enums import SlotStatus, AppointmentStatus
+    
+    agora = datetime.now()
+    for i, status in enumerate([SlotStatus.RESERVADO, SlotStatus.RESERVADO, SlotStatus.LIVRE]):
+        slot = ScheduleSlot(
+            doctor_id=test_doctor.id,
+            inicio=agora + timedelta(minutes=10 * (i + 1)),
+            fim=agora + timedelta(minutes=10 * (i + 1) + 5),
+            status=status
+        )
+        db.add(slot)
+        db.flush()
+        if status == SlotStatus.RESERVADO:
+            appointment = Appointment(slot_id=slot.id, patient_id=test_patient.id, status=AppointmentStatus.AGENDADA)
+            db.add(appointment)
+            db.flush()
+            if i == 0:
+                db.add(Payment(
+                    appointment_id=appointment.id,
+                    patient_id=test_patient.id,
+                    valor=Decimal("100.00"),
+                    metodo="PIX",
+                    nsu_fake="NSU-1"
+                ))
+    db.commit()
+    RollupService.rebuild(db)
+    
+    medico = _login(client, "medico@test.com")
+    client.get("/api/v1/dashboard/kpis", headers=medico)
+    with query_budget(2):
+        response = client.get("/api/v1/dashboard/kpis", headers=medico)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_consultas_mes"] == 2
+    assert Decimal(str(data["faturamento_mes"])) == Decimal("100.00")
+    assert data["taxa_ocupacao"] == 66.67
+    assert data["total_usuarios_ativos"] == 1
+    assert [a["paciente"] for a in data["proximos_atendimentos"]] == ["Paciente Teste"] * 2
+    
+    paciente = _login(client, "paciente@test.com")
+    data = client.get("/api/v1/dashboard/kpis", headers=paciente).json()
+    assert data["total_consultas_mes"] == 2
+    assert data["taxa_ocupacao"] == 0.0
+    assert data["total_usuarios_ativos"] == 1
+    assert data["proximos_atendimentos"][0]["medico"] == "Médico Teste"
@@ -0,0 +1,156 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app import database
+from app.config import settings
+from app.core import slow_query
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.pool import InstrumentedQueuePool, install_idle_pre_ping, pool_stats
+from app.core.replica import ReplicaHealth
+
+def _engine(**kwargs):
+    return create_engine(
+        "sqlite://",
+        poolclass=InstrumentedQueuePool,
+        connect_args={"check_same_thread": False},
+        **kwargs
+    )
+
+def test_pool_counts_checkout_timeouts():
+    """Checkout sem conexão livre até o timeout é contado nas métricas"""
+    engine = _engine(pool_size=1, max_overflow=0, pool_timeout=0.05)
+    held = engine.connect()
+    try:
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        stats = pool_stats(engine)
+        assert stats["checked_out"] == 1
+        assert stats["checkout_timeouts"] == 1
+        assert stats["checkouts"] == 1
+    finally:
+        held.close()
+        engine.dispose()
+
+def test_idle_pre_ping_only_pings_idle_connections():
+    """Pre-ping "idle": conexões reaproveitadas logo em seguida não são testadas"""
+    engine = _engine(pool_size=1, max_overflow=0)
+    install_idle_pre_ping(engine, idle_seconds=3600)
+    try:
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        assert pool_stats(engine)["pings"] == 0
+        
+        engine.pool.metrics.reset()
+        install_idle_pre_ping(engine, idle_seconds=0)
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        assert pool_stats(engine)["pings"] == 1
+    finally:
+        engine.dispose()
+
+def test_read_db_uses_replica_and_falls_back_to_primary(monkeypatch):
+    """get_read_db usa a réplica saudável e volta ao primário se ela cair ou atrasar"""
+    replica = create_engine("sqlite://")
+    health = ReplicaHealth(replica, max_lag_seconds=10, check_seconds=0)
+    monkeypatch.setattr(database, "replica_health", health)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=replica))
+    
+    def read_bind():
+        gen = database.get_read_db()
+        session = next(gen)
+        gen.close()
+        return session.get_bind()
+    
+    assert read_bind() is replica
+    assert health.lag_seconds == 0
+    
+    monkeypatch.setattr(health, "measure_lag", lambda: 30.0)
+    assert read_bind() is database.engine
+    
+    def unavailable():
+        raise ConnectionError("réplica fora do ar")
+    monkeypatch.setattr(health, "measure_lag", unavailable)
+    assert read_bind() is database.engine
+    assert health.stats()["fallbacks"] == 2
+    assert health.stats()["last_error"] == "réplica fora do ar"
+
+def test_query_stats_middleware_headers_and_repeat_warning(monkeypatch, caplog):
+    """Middleware devolve a contagem de statements e avisa sobre statements repetidos"""
+    engine = create_engine("sqlite://")
+    api = FastAPI()
+    
+    @api.get("/n-mais-um")
+    def n_plus_one():
+        with engine.connect() as conn:
+            for i in range(3):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {}
+    
+    monkeypatch.setattr(settings, "QUERY_STATS_REPEAT_THRESHOLD", 2)
+    with TestClient(QueryStatsMiddleware(api)) as client:
+        response = client.get("/n-mais-um")
+    
+    assert response.headers["x-db-queries"] == "3"
+    assert float(response.headers["x-db-time-ms"]) >= 0
+    assert "Possível N+1 em GET /n-mais-um" in caplog.text
+
+def test_slow_query_log_redacts_parameters(monkeypatch, caplog):
+    """Query lenta é registrada com SQL normalizado, rota e parâmetros sem dados pessoais"""
+    import logging
+    monkeypatch.setattr(slow_query, "logger", logging.getLogger("tests.slow_query"))
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.000001)
+    engine = create_engine("sqlite://")
+    
+    token = slow_query.current_route.set("GET /api/v1/users")
+    try:
+        with engine.connect() as conn:
+            conn.execute(
+                text("SELECT  :email,\n :cpf, :ativo WHERE 1 IN (:a, :b, :c)"),
+                {"email": "ana@clinica.com", "cpf": "123.456.789-09", "ativo": True, "a": 1, "b": 2, "c": 3}
+            )
+    finally:
+        slow_query.current_route.reset(token)
+    
+    assert "rota=GET /api/v1/users" in caplog.text
+    assert "IN (...)" in caplog.text
+    assert "ana@clinica.com" not in caplog.text
+    assert "123.456.789-09" not in caplog.text
+    assert "params=['***', '***', True, 1, 2, 3]" in caplog.text
+    
+    # Parâmetros nomeados (psycopg2): mascarados também pelo nome da coluna
+    assert slow_query.redact_parameters({"nome_1": "Ana Souza", "status_1": "AGENDADA"}) == {
+        "nome_1": "***", "status_1": "AGENDADA"
+    }
+
+def test_slow_query_log_masks_text_without_known_name(db, monkeypatch, caplog):
+    """Parâmetros posicionais (asyncpg) e de nome genérico (param_1 no VALUES da auditoria) não vazam texto"""
+    import logging
+    from datetime import datetime, timezone
+    from functools import partial
+    from app.services.audit_service import write_batch
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(slow_query, "logger", logging.getLogger("tests.slow_query"))
+    monkeypatch.setattr(settings, "SLOW_QUERY_MS", 0.000001)
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", False)
+
+    with caplog.at_level(logging.WARNING, logger="tests.slow_query"):
+        partial(write_batch, TestingSessionLocal)([{
+            "user_id": None, "acao": "PAYMENT_CREATED", "alvo": "Maria da Silva",
+            "payload_json": {"telefone": "11 98888-7777"}, "created_at": datetime.now(timezone.utc)
+        }])
+
+    assert "INSERT INTO audit_logs" in caplog.text
+    assert "Maria da Silva" not in caplog.text
+    assert "98888-7777" not in caplog.text
+    assert "<str 14>" in caplog.text
+
+    # Posicionais: só enums e valores não textuais ficam legíveis
+    assert slow_query.redact_parameters(("Ana Souza", "Rua A, 10", "AGENDADA", 7)) == ["<str 9>", "<str 9>", "AGENDADA", 7]
+    assert slow_query.redact_parameters({"param_1": "Ana Souza", "status_1": "AGENDADA"}) == {
+        "param_1": "<str 9>", "status_1": "AGENDADA"
+    }
@@ -0,0 +1,47 @@
+def test_doctor_endpoints_answer_304_from_validators(client, db, test_doctor, query_budget):
+    """ETag/Last-Modified nas rotas públicas; If-None-Match válido recebe 304 com uma consulta só."""
+    doctor_id = test_doctor.id
+    for url in ("/api/v1/doctors", f"/api/v1/doctors/{doctor_id}", f"/api/v1/doctors/{doctor_id}/profile"):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag, last_modified = response.headers["ETag"], response.headers.get("Last-Modified")
+        assert response.headers["Cache-Control"].startswith("public")
+
+        with query_budget(1):
+            cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["ETag"] == etag
+        if last_modified:
+            assert client.get(url, headers={"If-Modified-Since": last_modified}).status_code == 304
+        assert client.get(url, headers={"If-None-Match": 'W/"outra-versao"'}).status_code == 200
+
+    # Alterar o perfil troca a versão do perfil
+    url = f"/api/v1/doctors/{doctor_id}/profile"
+    etag = client.get(url).headers["ETag"]
+    medico = client.post("/api/v1/auth/login", json={"email": "medico@test.com", "password": "Test@123"}).json()["access_token"]
+    assert client.put("/api/v1/profiles/doctor/me", json={"bio": "Nova bio"}, headers={"Authorization": f"Bearer {medico}"}).status_code == 200
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["bio"] == "Nova bio"
+    assert response.headers["ETag"] != etag
+
+    assert client.get("/api/v1/doctors/00000000-0000-0000-0000-000000000000", headers={"If-None-Match": etag}).status_code == 404
+
+def test_doctor_list_etag_changes_when_a_doctor_is_deleted(client, db, test_doctor):
+    """A listagem valida só por ETag: remover um médico que não é o mais recente também invalida."""
+    from app.core.enums import UserRole
+    from app.models.user import User
+
+    db.add(User(nome="Outro Médico", email="outro@test.com", cpf="44444444444",
+                password_hash="x", role=UserRole.MEDICO, ativo=True))
+    db.commit()
+
+    response = client.get("/api/v1/doctors")
+    assert "Last-Modified" not in response.headers
+    etag = response.headers["ETag"]
+
+    db.query(User).filter(User.email == "medico@test.com").delete()
+    db.commit()
+    response = client.get("/api/v1/doctors", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and len(response.json()) == 1
+    # If-Modified-Since sozinho não produz 304 na listagem
+    assert client.get("/api/v1/doctors", headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"}).status_code == 200
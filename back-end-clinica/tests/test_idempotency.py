@@ -0,0 +1,105 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+def _login(client, email):
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": "Test@123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def _free_slot(db, doctor_id, hora=0):
+    from app.models.schedule import ScheduleSlot
+
+    inicio = datetime(2030, 8, 1, 12, tzinfo=timezone.utc) + timedelta(hours=hora)
+    slot = ScheduleSlot(doctor_id=doctor_id, inicio=inicio, fim=inicio + timedelta(minutes=50))
+    db.add(slot)
+    db.commit()
+    return slot.id
+
+def test_retry_with_same_key_replays_first_response(client, db, test_patient, test_doctor):
+    """Retry com a mesma chave: mesma resposta byte a byte, sem reservar de novo."""
+    from sqlalchemy import func, select
+    from app.models.appointment import Appointment
+
+    doctor_id = test_doctor.id
+    slot_id = _free_slot(db, doctor_id)
+    headers = {**_login(client, "paciente@test.com"), "Idempotency-Key": "reserva-1"}
+    body = {"slot_id": str(slot_id)}
+
+    primeira = client.post("/api/v1/appointments", json=body, headers=headers)
+    retry = client.post("/api/v1/appointments", json=body, headers=headers)
+    assert primeira.status_code == retry.status_code == 201
+    assert retry.content == primeira.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in primeira.headers
+    assert db.scalar(select(func.count()).select_from(Appointment)) == 1
+
+    # Sem chave, o comportamento é o de sempre: o slot já está reservado
+    sem_chave = client.post("/api/v1/appointments", json=body, headers={"Authorization": headers["Authorization"]})
+    assert sem_chave.status_code == 400
+
+    # Erros 4xx também são guardados e repetidos
+    headers["Idempotency-Key"] = "reserva-2"
+    erro = client.post("/api/v1/appointments", json=body, headers=headers)
+    assert erro.status_code == 400
+    assert client.post("/api/v1/appointments", json=body, headers=headers).content == erro.content
+
+    # Mesma chave com outro corpo é rejeitada
+    outro = {"slot_id": str(_free_slot(db, doctor_id, hora=1))}
+    assert client.post("/api/v1/appointments", json=outro, headers=headers).status_code == 422
+
+def test_concurrent_duplicates_wait_for_first(db, test_patient, test_doctor):
+    """Duplicatas simultâneas: uma executa, as demais recebem a mesma resposta."""
+    from fastapi import HTTPException
+    from tests.conftest import TestingSessionLocal
+    from app.schemas.appointment import AppointmentCreate, AppointmentResponse
+    from app.services.appointment_service import AppointmentService
+    from app.services.idempotency_service import IdempotencyService, request_fingerprint
+
+    data = AppointmentCreate(slot_id=_free_slot(db, test_doctor.id))
+    patient_id = test_patient.id
+    request_hash = request_fingerprint("POST /appointments", data)
+    tentativas = 6
+    barrier = threading.Barrier(tentativas)
+    execucoes = []
+
+    def reservar():
+        session = TestingSessionLocal()
+        try:
+            def action():
+                execucoes.append(1)
+                return AppointmentService.create_appointment(session, patient_id, data)
+
+            barrier.wait()
+            response = IdempotencyService.run(
+                session, patient_id, "chave-concorrente", request_hash, 201, AppointmentResponse, action
+            )
+            return response.status_code, response.body
+        except HTTPException as exc:
+            return exc.status_code, None
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=tentativas) as pool:
+        resultados = list(pool.map(lambda _: reservar(), range(tentativas)))
+
+    assert len(execucoes) == 1
+    assert {status for status, _ in resultados} == {201}
+    assert len({body for _, body in resultados}) == 1
+
+def test_sweep_removes_expired_keys_in_batches(db, test_patient):
+    from sqlalchemy import func, select
+    from app.models.idempotency import IdempotencyKey
+    from app.services.idempotency_service import IdempotencyService
+
+    agora = datetime.now(timezone.utc)
+    for i in range(7):
+        db.add(IdempotencyKey(
+            user_id=test_patient.id, chave=f"k{i}", request_hash="x", status_code=201, response_body=b"{}",
+            expires_at=agora + timedelta(hours=-1 if i < 5 else 1)
+        ))
+    db.commit()
+
+    assert IdempotencyService.sweep(db, batch_size=2) == 5
+    restantes = db.scalars(select(IdempotencyKey.chave).order_by(IdempotencyKey.chave)).all()
+    assert restantes == ["k5", "k6"]
+    assert db.scalar(select(func.count()).select_from(IdempotencyKey)) == 2
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+
+def _create_doctors(db, count):
+    from app.models.user import User
+    from app.core.enums import UserRole
+
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        db.add(User(
+            nome=f"Médico {i}",
+            email=f"medico{i}@test.com",
+            cpf=f"{i:011d}",
+            password_hash="x",
+            role=UserRole.MEDICO,
+            ativo=True,
+            # Pares com o mesmo created_at: o desempate é pelo id
+            created_at=base + timedelta(minutes=i // 2)
+        ))
+    db.commit()
+
+def test_cursor_pagination_walks_all_rows_once(client, db):
+    """Percorre a lista por cursor: sem repetir nem pular linhas, mesmo com created_at empatado."""
+    _create_doctors(db, 7)
+
+    first_page = client.get("/api/v1/doctors", params={"limit": 3})
+    assert first_page.status_code == 200
+    # Sem cursor a primeira página é a mesma do modo offset
+    assert first_page.json() == client.get("/api/v1/doctors", params={"limit": 3, "skip": 0}).json()
+
+    seen, response = [], first_page
+    while True:
+        seen += [doctor["id"] for doctor in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get("/api/v1/doctors", params={"limit": 3, "cursor": cursor})
+        assert response.status_code == 200
+
+    assert len(seen) == len(set(seen)) == 7
+
+    # Offset continua disponível e na mesma ordem
+    offset_ids = [d["id"] for d in client.get("/api/v1/doctors", params={"limit": 3, "skip": 3}).json()]
+    assert offset_ids == seen[3:6]
+
+def test_cursor_pagination_rejects_invalid_params(client, db):
+    _create_doctors(db, 2)
+    cursor = client.get("/api/v1/doctors", params={"limit": 1}).headers["X-Next-Cursor"]
+
+    assert client.get("/api/v1/doctors", params={"cursor": "nao-e-um-cursor"}).status_code == 400
+    assert client.get("/api/v1/doctors", params={"cursor": cursor, "skip": 1}).status_code == 400
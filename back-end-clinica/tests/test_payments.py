@@ -45,6 +45,41 @@ def test_payment_always_approved(client, test_patient, test_doctor, db):
     assert response.json()["status"] == "APROVADO"
     assert "nsu_fake" in response.json()
 
+def test_list_payments_claims_only_mode(client, test_patient, monkeypatch):
+    from app.config import settings
+    from app.core.cache import user_cache
+    
+    monkeypatch.setattr(settings, "AUTH_CLAIMS_ONLY", True)
+    
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    token = login_response.json()["access_token"]
+    
+    response = client.get(
+        "/api/v1/payments",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    
+    assert response.status_code == 200
+    # Autorizado apenas pelas claims: o usuário não foi carregado
+    assert user_cache.stats()["misses"] == 0
+
+def test_list_payments_query_budget(client, test_patient, query_budget):
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    token = login_response.json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/api/v1/payments", headers=headers)
+    
+    # Com usuário em cache e lista de revogação sincronizada, só a listagem vai ao banco
+    with query_budget(1):
+        response = client.get("/api/v1/payments", headers=headers)
+    assert response.status_code == 200
+
 
 # alembic.ini (exemplo básico)
 
@@ -0,0 +1,85 @@
+from contextlib import contextmanager
+from datetime import date, datetime
+from uuid import uuid4
+import pytest
+from sqlalchemy import event
+
+def test_period_bounds_in_clinic_timezone(monkeypatch):
+    """Dias, meses e anos viram intervalos semiabertos à meia-noite do fuso da clínica."""
+    from app.config import settings
+    from app.core.periods import Period
+
+    monkeypatch.setattr(settings, "CLINIC_TIMEZONE", "America/Sao_Paulo")
+
+    periodo = Period.days(date(2024, 3, 1), date(2024, 3, 31))
+    assert periodo.inicio.isoformat() == "2024-03-01T00:00:00-03:00"
+    assert periodo.fim.isoformat() == "2024-04-01T00:00:00-03:00"
+
+    assert Period.month(2024, 12) == Period(periodo.inicio.replace(month=12), periodo.inicio.replace(year=2025, month=1))
+    assert Period.year(2024).fim.date() == date(2025, 1, 1)
+    assert Period.days(None, None).where(object()) == []
+
+    # 01:30 UTC do dia 1º ainda é o mês anterior em São Paulo
+    assert Period.month_of(datetime.fromisoformat("2024-04-01T01:30:00+00:00")) == Period.month(2024, 3)
+
+@contextmanager
+def _capture_statements(db):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(db.bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield executed
+    finally:
+        event.remove(db.bind, "before_cursor_execute", before_cursor_execute)
+
+def _plans(db, executed):
+    """Planos (EXPLAIN) dos statements capturados, com seq scan desencorajado."""
+    conn = db.connection()
+    conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plans = [
+        "\n".join(row[0] for row in conn.exec_driver_sql("EXPLAIN " + statement, parameters))
+        for statement, parameters in executed
+    ]
+    db.rollback()
+    return plans
+
+def _assert_range_on_index(plan, index, column):
+    assert index in plan, plan
+    conds = [line for line in plan.splitlines() if "Index Cond" in line]
+    assert any(column in line for line in conds), plan
+
+def test_report_filters_use_indexes(db):
+    """Filtros de período comparam a coluna diretamente: o intervalo vira Index Cond."""
+    from app.services.report_service import ReportService
+    from app.services.dashboard_service import DashboardService
+    from app.core.enums import UserRole
+
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("EXPLAIN depende do Postgres")
+
+    user_id = uuid4()
+    inicio, fim = date(2024, 1, 1), date(2024, 1, 31)
+    casos = [
+        (lambda: ReportService.patient_payments_summary(db, user_id, inicio, fim),
+         [("ix_payments_patient_date", "created_at")]),
+        (lambda: ReportService.patient_appointments_summary(db, user_id, inicio, fim),
+         [("ix_appt_patient", "created_at")]),
+        (lambda: ReportService.doctor_occupancy_summary(db, user_id, inicio, fim),
+         [("ix_slots_doctor_inicio", "inicio")]),
+    ]
+    for executar, indices in casos:
+        with _capture_statements(db) as executed:
+            executar()
+        [plan] = _plans(db, executed)
+        for index, column in indices:
+            _assert_range_on_index(plan, index, column)
+
+    # Dashboard do paciente: consultas e pagamentos do mês pelos índices compostos
+    with _capture_statements(db) as executed:
+        DashboardService.get_kpis(db, UserRole.PACIENTE, user_id, datetime(2024, 1, 15))
+    kpis_plan = _plans(db, executed[:1])[0]
+    _assert_range_on_index(kpis_plan, "ix_appt_patient", "created_at")
+    _assert_range_on_index(kpis_plan, "ix_payments_patient_date", "created_at")
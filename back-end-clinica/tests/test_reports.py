@@ -1,5 +1,6 @@
 
 from datetime import datetime, timedelta
+from app.services.rollup_service import RollupService, COUNTER_COLUMNS
 
 def test_patient_appointments_report(client, test_patient, test_doctor, db):
     """Testa relatório de consultas do paciente."""
@@ -58,6 +59,8 @@ def test_doctor_occupancy_report(client, test_doctor, db):
         )
         db.add(slot)
     db.commit()
+    # Carga direta no banco: recalcula os totais mensais
+    RollupService.rebuild(db)
     
     # Login do médico
     login_response = client.post("/api/v1/auth/login", json={
@@ -80,3 +83,90 @@ def test_doctor_occupancy_report(client, test_doctor, db):
     assert data["taxa_ocupacao"] == 60.0
 
 
+
+def test_patient_payments_report_aggregates_in_sql(client, test_patient, test_doctor, db, query_budget):
+    """Testa relatório de pagamentos do paciente (soma e contagem feitas no banco)."""
+    from decimal import Decimal
+    from app.models.schedule import ScheduleSlot
+    from app.models.appointment import Appointment
+    from app.models.payment import Payment
+    from app.core.enums import SlotStatus, AppointmentStatus
+    
+    for i, valor in enumerate([Decimal("150.00"), Decimal("200.50")]):
+        slot = ScheduleSlot(
+            doctor_id=test_doctor.id,
+            inicio=datetime.now() - timedelta(days=i + 1),
+            fim=datetime.now() - timedelta(days=i + 1, hours=-1),
+            status=SlotStatus.CONCLUIDO
+        )
+        db.add(slot)
+        db.flush()
+        appointment = Appointment(slot_id=slot.id, patient_id=test_patient.id, status=AppointmentStatus.REALIZADA)
+        db.add(appointment)
+        db.flush()
+        db.add(Payment(
+            appointment_id=appointment.id,
+            patient_id=test_patient.id,
+            valor=valor,
+            metodo="PIX",
+            nsu_fake=f"NSU-{i}"
+        ))
+    db.commit()
+    
+    login_response = client.post("/api/v1/auth/login", json={
+        "email": "paciente@test.com",
+        "password": "Test@123"
+    })
+    headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+    client.get("/api/v1/reports/patient/payments", headers=headers)
+    
+    with query_budget(1):
+        response = client.get("/api/v1/reports/patient/payments", headers=headers)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert Decimal(str(data["valor_total"])) == Decimal("350.50")
+
+def test_rollups_follow_api_writes(client, test_patient, test_doctor, db):
+    """Totais mensais mantidos pelas escritas da API batem com o recálculo completo."""
+    from decimal import Decimal
+    from sqlalchemy import select
+    from app.models.rollup import MonthlyRollup
+    
+    def snapshot():
+        rows = db.execute(select(MonthlyRollup)).scalars().all()
+        return {
+            (row.doctor_id, row.mes): tuple(getattr(row, c) for c in COUNTER_COLUMNS)
+            for row in rows if any(getattr(row, c) for c in COUNTER_COLUMNS)
+        }
+    
+    def login(email):
+        response = client.post("/api/v1/auth/login", json={"email": email, "password": "Test@123"})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    
+    medico, paciente = login("medico@test.com"), login("paciente@test.com")
+    amanha = datetime.now() + timedelta(days=1)
+    slot_ids = []
+    for i in range(4):
+        response = client.post(f"/api/v1/doctors/{test_doctor.id}/agenda/slots", json={
+            "inicio": (amanha + timedelta(days=40 * i)).isoformat(),
+            "fim": (amanha + timedelta(days=40 * i, hours=1)).isoformat()
+        }, headers=medico)
+        assert response.status_code == 201
+        slot_ids.append(response.json()["id"])
+    
+    consultas = [
+        client.post("/api/v1/appointments", json={"slot_id": slot_id}, headers=paciente).json()["id"]
+        for slot_id in slot_ids[:3]
+    ]
+    client.post("/api/v1/payments", json={"appointment_id": consultas[0], "valor": "180.00"}, headers=paciente)
+    client.patch(f"/api/v1/appointments/{consultas[0]}/status", json={"status": "REALIZADA"}, headers=medico)
+    client.patch(f"/api/v1/appointments/{consultas[1]}/status", json={"status": "CANCELADA"}, headers=medico)
+    assert client.delete(f"/api/v1/agenda/slots/{slot_ids[3]}", headers=medico).status_code == 204
+    
+    incremental = snapshot()
+    assert sum(row[COUNTER_COLUMNS.index("faturamento")] for row in incremental.values()) == Decimal("180.00")
+    RollupService.rebuild(db)
+    assert snapshot() == incremental
+
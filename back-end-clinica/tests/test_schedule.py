@@ -0,0 +1,147 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from uuid import UUID
+from app.core.periods import clinic_tz
+
+def _login(client, email):
+    response = client.post("/api/v1/auth/login", json={"email": email, "password": "Test@123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_template_creates_slots_in_bulk_and_skips_conflicts(client, test_doctor, test_patient, query_budget):
+    """Modelo semanal: pausas respeitadas, conflitos ignorados e inserção em lote."""
+    medico = _login(client, "medico@test.com")
+    url = f"/api/v1/doctors/{test_doctor.id}/agenda"
+
+    # Slot já existente na segunda, 09:15 (sobrepõe o horário das 09:00)
+    response = client.post(f"{url}/slots", json={
+        "inicio": "2030-03-04T09:15:00-03:00", "fim": "2030-03-04T09:45:00-03:00"
+    }, headers=medico)
+    assert response.status_code == 201
+
+    template = {
+        "data_inicio": "2030-03-04",  # segunda
+        "data_fim": "2030-03-15",
+        "dias_semana": [0, 2],  # segunda e quarta
+        "hora_inicio": "08:00",
+        "hora_fim": "12:00",
+        "duracao_minutos": 50,
+        "intervalo_minutos": 10,
+        "pausas": [{"inicio": "10:00", "fim": "10:30"}]
+    }
+    with query_budget(5):
+        response = client.post(f"{url}/templates", json=template, headers=medico)
+
+    assert response.status_code == 201
+    data = response.json()
+    # 08:00, 09:00 e 10:30 (pausa às 10:00) em 4 dias; 09:00 da primeira segunda conflita
+    assert data["total_criados"] == 11
+    assert data["total_ignorados"] == 1
+    assert datetime.fromisoformat(data["ignorados"][0]["inicio"]) == datetime.fromisoformat("2030-03-04T09:00:00-03:00")
+    horarios = sorted({
+        datetime.fromisoformat(slot["inicio"]).astimezone(clinic_tz()).strftime("%H:%M") for slot in data["criados"]
+    })
+    assert horarios == ["08:00", "09:00", "10:30"]
+
+    # Reaplicar o mesmo modelo não duplica nada
+    data = client.post(f"{url}/templates", json=template, headers=medico).json()
+    assert data["total_criados"] == 0
+    assert data["total_ignorados"] == 12
+
+    paciente = _login(client, "paciente@test.com")
+    assert client.post(f"{url}/templates", json=template, headers=paciente).status_code == 403
+
+@pytest.fixture
+def slot_overlap_constraint(db):
+    """A constraint de exclusão (criada pelo create_all a partir do modelo) só existe no Postgres."""
+    if db.bind.dialect.name != "postgresql":
+        pytest.skip("Constraint de exclusão depende do Postgres")
+
+def test_concurrent_overlapping_slots_only_one_wins(db, test_doctor, slot_overlap_constraint):
+    """Inserções paralelas sobrepostas: o banco aceita uma e as demais viram 400."""
+    from tests.conftest import TestingSessionLocal
+    from app.services.schedule_service import ScheduleService
+    from app.schemas.schedule import ScheduleSlotCreate
+
+    doctor_id = test_doctor.id
+    base = datetime(2030, 5, 6, 12, tzinfo=timezone.utc)
+    tentativas = 8
+    barrier = threading.Barrier(tentativas)
+
+    def criar(inicio, fim):
+        session = TestingSessionLocal()
+        try:
+            barrier.wait()
+            ScheduleService.create_slot(session, doctor_id, ScheduleSlotCreate(inicio=inicio, fim=fim), doctor_id)
+            return 201
+        except HTTPException as exc:
+            return exc.status_code
+        finally:
+            session.close()
+
+    # Todos se sobrepõem entre si (deslocados de 5 em 5 minutos, 50 minutos cada)
+    with ThreadPoolExecutor(max_workers=tentativas) as pool:
+        resultados = list(pool.map(
+            lambda i: criar(base + timedelta(minutes=5 * i), base + timedelta(minutes=5 * i + 50)),
+            range(tentativas)
+        ))
+    assert sorted(resultados) == [201] + [400] * (tentativas - 1)
+
+    # Intervalos semiabertos: um slot que começa no fim do outro não conflita
+    barrier = threading.Barrier(1)
+    assert criar(base + timedelta(minutes=85), base + timedelta(minutes=135)) == 201
+
+def test_available_slots_across_doctors(client, db, test_doctor, query_budget):
+    """Horários livres de todos os médicos ativos numa única consulta, do mais cedo ao mais tarde."""
+    from decimal import Decimal
+    from app.models.user import User
+    from app.models.profile import DoctorProfile
+    from app.models.schedule import ScheduleSlot
+    from app.core.enums import UserRole, SlotStatus
+
+    test_doctor.doctor_profile.especialidade = "Psicologia Clínica"
+    outros = []
+    for i, (ativo, valor) in enumerate([(True, Decimal("120.00")), (False, Decimal("90.00"))]):
+        medico = User(
+            nome=f"Outro Médico {i}", email=f"outro{i}@test.com", cpf=f"3333333333{i}",
+            password_hash="x", role=UserRole.MEDICO, ativo=ativo
+        )
+        medico.doctor_profile = DoctorProfile(crm_crp=f"CRP {i}", especialidade="Neuropsicologia", valor_padrao_consulta=valor)
+        db.add(medico)
+        outros.append(medico)
+    db.flush()
+
+    base = datetime(2030, 6, 3, 12, tzinfo=timezone.utc)
+    slots = [
+        (test_doctor, 3, SlotStatus.LIVRE),
+        (test_doctor, 0, SlotStatus.RESERVADO),
+        (outros[0], 1, SlotStatus.LIVRE),
+        (outros[0], 5, SlotStatus.LIVRE),
+        (outros[1], 0, SlotStatus.LIVRE),  # médico inativo
+    ]
+    for medico, hora, status in slots:
+        db.add(ScheduleSlot(
+            doctor_id=medico.id, inicio=base + timedelta(hours=hora),
+            fim=base + timedelta(hours=hora, minutes=50), status=status
+        ))
+    db.commit()
+    nomes = {test_doctor.id: test_doctor.nome, outros[0].id: outros[0].nome}
+
+    def buscar(**params):
+        response = client.get("/api/v1/agenda/available", params={"start": "2030-06-01", **params})
+        assert response.status_code == 200
+        return [(nomes.get(UUID(s["doctor_id"])), datetime.fromisoformat(s["inicio"]) - base) for s in response.json()]
+
+    with query_budget(1):
+        todos = buscar()
+    assert todos == [
+        ("Outro Médico 0", timedelta(hours=1)),
+        ("Médico Teste", timedelta(hours=3)),
+        ("Outro Médico 0", timedelta(hours=5)),
+    ]
+    assert buscar(limit=2) == todos[:2]
+    assert buscar(especialidade="psicologia clínica") == [("Médico Teste", timedelta(hours=3))]
+    assert buscar(valor_max="150") == [todos[0], todos[2]]
+    assert buscar(end="2030-06-03T14:00:00+00:00") == todos[:1]